@@ -0,0 +1,185 @@
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .loading import REVIEW_PLAN, HOTEL_PLAN, RESTAURANT_PLAN, GUIDE_SUMMARY_PLAN
+from typing import List, Optional, Dict
+from datetime import date
+
+# Async read paths for the public catalog routes.
+# Async sessions cannot lazy-load, so every relationship touched by
+# to_dict() is loaded up front with the plans from loading.py.
+
+# Destination reads
+async def get_destinations(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Destination]:
+    # SQL: SELECT * FROM destinations LIMIT ? OFFSET ?
+    result = await db.execute(select(models.Destination).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_destination_by_id(db: AsyncSession, destination_id: str) -> Optional[models.Destination]:
+    # SQL: SELECT * FROM destinations WHERE destination_id = ? LIMIT 1
+    result = await db.execute(
+        select(models.Destination).filter(models.Destination.destination_id == destination_id).limit(1)
+    )
+    return result.scalars().first()
+
+# Review reads
+async def get_reviews_by_destination(db: AsyncSession, destination_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
+    """Get reviews for a specific destination"""
+    # SQL: SELECT * FROM reviews WHERE destination_id = ? LIMIT ? OFFSET ?; SELECT * FROM users WHERE id IN (...)
+    result = await db.execute(
+        select(models.Review)
+        .options(*REVIEW_PLAN)
+        .filter(models.Review.destination_id == destination_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return [review.to_dict() for review in result.scalars().all()]
+
+# Destination-wise hotel, restaurant and guide reads
+async def get_hotels_by_destination(db: AsyncSession, destination_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
+    """Get hotels by specific destination"""
+    # SQL: SELECT * FROM hotels WHERE destination_id = ? LIMIT ? OFFSET ?; SELECT * FROM destinations WHERE id IN (...)
+    result = await db.execute(
+        select(models.Hotel)
+        .options(*HOTEL_PLAN)
+        .filter(models.Hotel.destination_id == destination_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return [hotel.to_dict() for hotel in result.scalars().all()]
+
+async def get_restaurants_by_destination(db: AsyncSession, destination_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
+    """Get restaurants by specific destination"""
+    # SQL: SELECT * FROM restaurants WHERE destination_id = ? LIMIT ? OFFSET ?; SELECT * FROM destinations WHERE id IN (...)
+    result = await db.execute(
+        select(models.Restaurant)
+        .options(*RESTAURANT_PLAN)
+        .filter(models.Restaurant.destination_id == destination_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return [restaurant.to_dict() for restaurant in result.scalars().all()]
+
+async def get_guides_by_destination(db: AsyncSession, destination_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
+    """Get guides by specific destination"""
+    # SQL: SELECT * FROM guides WHERE destination_id = ? LIMIT ? OFFSET ?; SELECT * FROM users WHERE id IN (...)
+    result = await db.execute(
+        select(models.Guide)
+        .options(*GUIDE_SUMMARY_PLAN)
+        .filter(models.Guide.destination_id == destination_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    guide_list = []
+    for guide in result.scalars().all():
+        guide_list.append({
+            "id": guide.id,
+            "name": guide.user.name if guide.user else "Unknown",
+            "specialty": guide.specialties or "Local Tours",
+            "experience": f"{guide.experience_years} years" if guide.experience_years else "Experience not specified",
+            "rating": float(guide.rating) if guide.rating else 0.0,
+            "user": {
+                "name": guide.user.name if guide.user else "Unknown",
+                "email": guide.user.email if guide.user else ""
+            }
+        })
+    return guide_list
+
+# Room availability search
+AVAILABILITY_SORTS = ("price_asc", "price_desc")
+
+async def search_destination_availability(
+    db: AsyncSession,
+    destination_id: str,
+    check_in: date,
+    check_out: date,
+    guests: int = 1,
+    sort: str = "price_asc",
+    skip: int = 0,
+    limit: int = 20
+) -> List[Dict]:
+    """Every hotel room type in a destination with a free room on each night of [check_in, check_out)"""
+    nights = (check_out - check_in).days
+    availability = models.RoomAvailability
+    room_type = models.HotelRoomType
+    total_price = func.sum(availability.price_per_night).label("total_price")
+    # A room type qualifies when all of its nights in the range have a free room,
+    # i.e. the count of such nights equals the length of the stay
+    # SQL: SELECT hotels.id, hotels.name, ..., room_availability.room_type, hotel_room_types.max_guests, MIN(available_rooms), MIN(price_per_night), SUM(price_per_night) FROM room_availability JOIN hotels ON ... JOIN destinations ON ... JOIN hotel_room_types ON hotel_id = ... AND room_type_name = room_type WHERE destinations.destination_id = ? AND max_guests >= ? AND date >= ? AND date < ? AND available_rooms > 0 GROUP BY hotels.id, room_type HAVING COUNT(*) = ? ORDER BY total_price LIMIT ? OFFSET ?
+    stmt = (
+        select(
+            models.Hotel.id.label("hotel_id"),
+            models.Hotel.name.label("hotel_name"),
+            models.Hotel.city,
+            models.Hotel.rating,
+            models.Hotel.image,
+            availability.room_type,
+            room_type.max_guests,
+            func.min(availability.available_rooms).label("rooms_available"),
+            func.min(availability.price_per_night).label("min_price_per_night"),
+            total_price
+        )
+        .join(models.Hotel, models.Hotel.id == availability.hotel_id)
+        .join(models.Destination, models.Destination.id == models.Hotel.destination_id)
+        .join(room_type, and_(room_type.hotel_id == availability.hotel_id, room_type.room_type_name == availability.room_type))
+        .filter(
+            models.Destination.destination_id == destination_id,
+            models.Hotel.is_active == True,
+            room_type.is_active == True,
+            room_type.max_guests >= guests,
+            availability.date >= check_in,
+            availability.date < check_out,
+            availability.available_rooms > 0
+        )
+        .group_by(
+            models.Hotel.id, models.Hotel.name, models.Hotel.city, models.Hotel.rating, models.Hotel.image,
+            availability.room_type, room_type.max_guests
+        )
+        .having(func.count(availability.date) == nights)
+        .order_by(total_price.desc() if sort == "price_desc" else total_price.asc(), models.Hotel.id, availability.room_type)
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [
+        {
+            "hotel_id": row.hotel_id,
+            "hotel_name": row.hotel_name,
+            "city": row.city,
+            "rating": row.rating,
+            "image": row.image,
+            "room_type": row.room_type,
+            "max_guests": row.max_guests,
+            "nights": nights,
+            "rooms_available": row.rooms_available,
+            "min_price_per_night": row.min_price_per_night,
+            "total_price": row.total_price
+        }
+        for row in result
+    ]
+
+async def add_hotel_details(db: AsyncSession, matches: List[Dict]) -> List[Dict]:
+    """Fill in hotel name, city, rating and image for inventory_engine.search matches"""
+    if not matches:
+        return []
+    # SQL: SELECT id, name, city, rating, image FROM hotels WHERE id IN (...) AND is_active = TRUE
+    result = await db.execute(
+        select(models.Hotel.id, models.Hotel.name, models.Hotel.city, models.Hotel.rating, models.Hotel.image).filter(
+            models.Hotel.id.in_({match["hotel_id"] for match in matches}),
+            models.Hotel.is_active == True
+        )
+    )
+    hotels = {row.id: row for row in result}
+    # A hotel deactivated since the engine loaded drops out until its reload
+    return [
+        {
+            "hotel_id": match["hotel_id"],
+            "hotel_name": hotels[match["hotel_id"]].name,
+            "city": hotels[match["hotel_id"]].city,
+            "rating": hotels[match["hotel_id"]].rating,
+            "image": hotels[match["hotel_id"]].image,
+            **{key: value for key, value in match.items() if key != "hotel_id"}
+        }
+        for match in matches
+        if match["hotel_id"] in hotels
+    ]
@@ -0,0 +1,67 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Callable, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# In-process booking events.
+# Events are queued on the session and dispatched only after the transaction
+# commits, so subscribers (waitlists, statistics, notifications) never see a
+# change that was rolled back. Subscribers run on the committing thread and
+# should hand anything slow off to their own worker.
+
+class BookingCancelled:
+    """A booking moved to 'cancelled' and its nights were returned to inventory"""
+
+    __slots__ = ("booking_id", "hotel_id", "traveler_id", "room_type", "check_in_date", "check_out_date", "nights_restored")
+
+    def __init__(self, booking_id, hotel_id, traveler_id, room_type, check_in_date, check_out_date, nights_restored):
+        self.booking_id = booking_id
+        self.hotel_id = hotel_id
+        self.traveler_id = traveler_id
+        self.room_type = room_type
+        self.check_in_date = check_in_date
+        self.check_out_date = check_out_date
+        self.nights_restored = nights_restored
+
+    def to_dict(self):
+        return {
+            "event": "booking_cancelled",
+            "booking_id": self.booking_id,
+            "hotel_id": self.hotel_id,
+            "traveler_id": self.traveler_id,
+            "room_type": self.room_type,
+            "check_in_date": self.check_in_date.isoformat(),
+            "check_out_date": self.check_out_date.isoformat(),
+            "nights_restored": self.nights_restored
+        }
+
+_subscribers: List[Callable] = []
+
+def subscribe(handler: Callable) -> Callable:
+    """Call handler(event) for every committed booking event (usable as a decorator)"""
+    _subscribers.append(handler)
+    return handler
+
+def unsubscribe(handler: Callable):
+    if handler in _subscribers:
+        _subscribers.remove(handler)
+
+def publish_after_commit(db: Session, booking_event):
+    """Queue booking_event on db; it is dispatched if and when the transaction commits"""
+    db.info.setdefault("booking_events", []).append(booking_event)
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_booking_events(session):
+    for booking_event in session.info.pop("booking_events", ()):
+        logger.info("Booking event: %s", booking_event.to_dict())
+        for handler in list(_subscribers):
+            try:
+                handler(booking_event)
+            except Exception:
+                logger.exception("Booking event subscriber %r failed", handler)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_booking_events(session):
+    session.info.pop("booking_events", None)
@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from . import models, reservations, booking_events, inventory_engine
+from .database import SessionLocal
+from .metrics import metrics
+import anyio.to_thread
+import asyncio
+import logging
+import os
+import threading
+
+# Booking holds.
+# A new booking is 'pending' and holds its rooms until hold_expires_at. It
+# keeps them for good once it moves on (confirmed, checked in); otherwise the
+# sweeper cancels it after expiry and returns its nights to room_availability,
+# a batch of bookings per statement. Bookings created before holds existed
+# have no expiry and are never swept.
+
+load_dotenv()
+
+BOOKING_HOLD_TTL = float(os.getenv("BOOKING_HOLD_TTL", "900"))
+BOOKING_HOLD_SWEEP_INTERVAL = float(os.getenv("BOOKING_HOLD_SWEEP_INTERVAL", "30"))
+BOOKING_HOLD_SWEEP_BATCH = int(os.getenv("BOOKING_HOLD_SWEEP_BATCH", "500"))
+
+logger = logging.getLogger(__name__)
+
+class HoldExpired(ValueError):
+    """A pending booking's hold lapsed before it was confirmed"""
+    pass
+
+class HoldEnded(ValueError):
+    """The booking already left 'pending', so there is no hold to go back to"""
+    pass
+
+class HoldStats:
+    """Hold counters for /metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.confirmed = 0
+        self.expired = 0
+        self.nights_released = 0
+        self.sweeps = 0
+        # Pending bookings with a live hold, as of the last sweep
+        self.active: Optional[int] = None
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def render(self) -> List[str]:
+        lines = [
+            "# HELP booking_holds_created_total Bookings created with a hold on their rooms",
+            "# TYPE booking_holds_created_total counter",
+            f"booking_holds_created_total {self.created}",
+            "# HELP booking_holds_confirmed_total Held bookings that left 'pending' before expiring",
+            "# TYPE booking_holds_confirmed_total counter",
+            f"booking_holds_confirmed_total {self.confirmed}",
+            "# HELP booking_holds_expired_total Held bookings cancelled by the sweeper",
+            "# TYPE booking_holds_expired_total counter",
+            f"booking_holds_expired_total {self.expired}",
+            "# HELP booking_holds_nights_released_total Room-nights returned to inventory by the sweeper",
+            "# TYPE booking_holds_nights_released_total counter",
+            f"booking_holds_nights_released_total {self.nights_released}",
+        ]
+        if self.active is not None:
+            lines += [
+                "# HELP booking_holds_active Pending bookings holding rooms (as of the last sweep)",
+                "# TYPE booking_holds_active gauge",
+                f"booking_holds_active {self.active}",
+            ]
+        return lines
+
+hold_stats = HoldStats()
+metrics.add_collector(hold_stats.render)
+
+def hold_expiry(now: Optional[datetime] = None) -> datetime:
+    """Expiry for a hold starting now (naive UTC, like the column)"""
+    return (now or datetime.utcnow()) + timedelta(seconds=BOOKING_HOLD_TTL)
+
+def end_hold(db: Session, booking_id: int) -> bool:
+    """Keep a pending booking's rooms for good; False if its hold has already expired.
+
+    The guard makes this and the sweeper mutually exclusive: whichever
+    updates the booking first wins. Does not commit.
+    """
+    booking = models.HotelBooking
+    # SQL: UPDATE hotel_bookings SET hold_expires_at = NULL WHERE booking_id = ? AND booking_status = 'pending' AND (hold_expires_at IS NULL OR hold_expires_at > ?)
+    result = db.execute(
+        update(booking)
+        .where(
+            booking.booking_id == booking_id,
+            booking.booking_status == 'pending',
+            or_(booking.hold_expires_at.is_(None), booking.hold_expires_at > datetime.utcnow())
+        )
+        .values(hold_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def expire_holds(db: Session, now: Optional[datetime] = None, batch: int = BOOKING_HOLD_SWEEP_BATCH) -> int:
+    """Cancel one batch of expired holds and release their nights; returns the bookings cancelled"""
+    now = now or datetime.utcnow()
+    booking = models.HotelBooking
+    try:
+        # Locked rows are skipped, so sweepers in several workers take disjoint batches
+        # and a booking being confirmed right now is left alone
+        # SQL: SELECT booking_id, hotel_id, traveler_id, room_type, check_in_date, check_out_date FROM hotel_bookings WHERE booking_status = 'pending' AND hold_expires_at <= ? ORDER BY hold_expires_at LIMIT ? FOR UPDATE SKIP LOCKED
+        expired = db.query(
+            booking.booking_id, booking.hotel_id, booking.traveler_id, booking.room_type, booking.check_in_date, booking.check_out_date
+        ).filter(
+            booking.booking_status == 'pending',
+            booking.hold_expires_at <= now
+        ).order_by(booking.hold_expires_at).limit(batch).with_for_update(skip_locked=True).all()
+        if not expired:
+            db.rollback()
+            return 0
+
+        # SQL: UPDATE hotel_bookings SET booking_status = 'cancelled' WHERE booking_id IN (...) AND booking_status = 'pending' AND hold_expires_at <= ?
+        cancelled = db.execute(
+            update(booking)
+            .where(
+                booking.booking_id.in_([held.booking_id for held in expired]),
+                booking.booking_status == 'pending',
+                booking.hold_expires_at <= now
+            )
+            .values(booking_status='cancelled')
+            .execution_options(synchronize_session=False)
+        )
+        if cancelled.rowcount != len(expired):
+            # A booking changed after the SELECT (databases without FOR UPDATE);
+            # leave the whole batch to the next sweep rather than release nights it still holds
+            db.rollback()
+            return 0
+
+        # SQL: UPDATE room_availability SET available_rooms = LEAST(available_rooms + (SELECT COUNT(*) ...), total_rooms) WHERE hotel_id IN (...) AND date >= ? AND date < ? AND EXISTS (...)
+        nights = reservations.release_bookings(db, expired)
+        for held in expired:
+            inventory_engine.stage(db, "release", held.hotel_id, held.room_type, held.check_in_date, held.check_out_date, 1)
+            booking_events.publish_after_commit(db, booking_events.BookingCancelled(
+                held.booking_id, held.hotel_id, held.traveler_id, held.room_type,
+                held.check_in_date, held.check_out_date, (held.check_out_date - held.check_in_date).days
+            ))
+        db.commit()
+        hold_stats.add(expired=len(expired), nights_released=nights)
+        return len(expired)
+    except Exception:
+        db.rollback()
+        raise
+
+def count_active_holds(db: Session, now: Optional[datetime] = None) -> int:
+    booking = models.HotelBooking
+    # SQL: SELECT COUNT(*) FROM hotel_bookings WHERE booking_status = 'pending' AND hold_expires_at > ?
+    return db.query(func.count(booking.booking_id)).filter(
+        booking.booking_status == 'pending',
+        booking.hold_expires_at > (now or datetime.utcnow())
+    ).scalar()
+
+def sweep_expired_holds() -> int:
+    """Expire holds batch by batch until none are due; returns the bookings cancelled"""
+    db = SessionLocal()
+    total = 0
+    try:
+        now = datetime.utcnow()
+        while True:
+            expired = expire_holds(db, now)
+            total += expired
+            if expired < BOOKING_HOLD_SWEEP_BATCH:
+                break
+        hold_stats.active = count_active_holds(db, now)
+        hold_stats.add(sweeps=1)
+        if total:
+            logger.info("Released %d expired booking holds", total)
+    except Exception as e:
+        logger.warning("Failed to sweep expired booking holds: %s", e)
+    finally:
+        db.close()
+    return total
+
+async def run_hold_sweeper():
+    """Background loop releasing expired holds every BOOKING_HOLD_SWEEP_INTERVAL"""
+    while True:
+        await asyncio.sleep(BOOKING_HOLD_SWEEP_INTERVAL)
+        await anyio.to_thread.run_sync(sweep_expired_holds)
@@ -2,10 +2,18 @@ from sqlalchemy.orm import Session
 from . import models, schemas
 from typing import List, Optional, Dict
 import json
-from datetime import datetime
-from sqlalchemy import text, func, or_
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import case, select, text, true, func, or_, update
+from .schema_registry import schema_registry
+from .principal_cache import principal_cache
+from . import dashboard_stats, loading, reservations, booking_events, inventory_engine, quotes, booking_holds
+from . import password_hashing
+import logging
 import re
 
+logger = logging.getLogger(__name__)
+
 # User CRUD operations with authentication
 # Get user by ID
 def get_user(db: Session, user_id: int) -> Optional[models.User]:
@@ -46,13 +54,7 @@ def create_user(db: Session, user: schemas.UserCreate) -> models.User:
     db.commit()
     db.refresh(db_user)
     
-    # Update admin statistics after creating user
-    try:
-        update_admin_statistics(db)
-        print(f"✅ Admin statistics updated after creating user: {user.email}")
-    except Exception as e:
-        print(f"⚠️ Warning: Failed to update admin statistics: {e}")
-    
+    # Admin statistics pick this user up from the commit via stats_aggregator
     return db_user
 
 # Authenticate user with email and password
@@ -64,8 +66,21 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[models
         return None
     if not user.verify_password(password):
         return None
+    rehash_password_if_needed(db, user, password)
     return user
 
+def rehash_password_if_needed(db: Session, user, password: str):
+    """Upgrade a verified password's hash when BCRYPT_ROUNDS has changed"""
+    if not password_hashing.needs_rehash(user.password_hash):
+        return
+    try:
+        user.set_password(password)
+        # SQL: UPDATE users SET password_hash = ? WHERE id = ?
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Failed to rehash password for user %s: %s", user.id, e)
+
 # Update user
 def update_user(db: Session, user_id: int, user: schemas.UserUpdate) -> Optional[models.User]:
     # SQL: SELECT * FROM users WHERE id = ? LIMIT 1
@@ -77,20 +92,21 @@ def update_user(db: Session, user_id: int, user: schemas.UserUpdate) -> Optional
         # SQL: UPDATE users SET field1 = ?, field2 = ?, ... WHERE id = ?
         db.commit()
         db.refresh(db_user)
+        principal_cache.invalidate_user(user_id)
     return db_user
 
 def delete_user(db: Session, user_id: int) -> bool:
-    print(f"🗑️ CRUD: Attempting to delete user {user_id}")
+    logger.debug("Attempting to delete user %s", user_id)
     
     # SQL: SELECT * FROM users WHERE id = ? LIMIT 1
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if db_user:
-        print(f"✅ CRUD: User {user_id} found, proceeding with deletion")
-        print(f"   User details: {db_user.name} ({db_user.email}) - {db_user.role}")
+        logger.debug("User %s found, proceeding with deletion", user_id)
+        logger.debug("User details: %s (%s) - %s", db_user.name, db_user.email, db_user.role)
         
         try:
             # First, manually delete related records to avoid constraint issues
-            print(f"   🔧 Cleaning up related records...")
+            logger.debug("Cleaning up related records...")
             
             # Delete from user_management table first (this is causing the constraint issue)
             try:
@@ -101,9 +117,9 @@ def delete_user(db: Session, user_id: int) -> bool:
                 for record in user_management_records:
                     # SQL: DELETE FROM user_management WHERE id = ?
                     db.delete(record)
-                    print(f"      ✅ Deleted user_management record {record.id}")
+                    logger.info("Deleted user_management record %s", record.id)
             except Exception as e:
-                print(f"      ⚠️ Could not delete user_management records: {e}")
+                logger.warning("Could not delete user_management records: %s", e)
                 # Try to handle this differently
             
             # Delete from admin_activity_log if this user was an admin
@@ -116,25 +132,26 @@ def delete_user(db: Session, user_id: int) -> bool:
                     for log in admin_logs:
                         # SQL: DELETE FROM admin_activity_log WHERE id = ?
                         db.delete(log)
-                        print(f"      ✅ Deleted admin activity log {log.id}")
+                        logger.info("Deleted admin activity log %s", log.id)
             except Exception as e:
-                print(f"      ⚠️ Could not delete admin activity logs: {e}")
+                logger.warning("Could not delete admin activity logs: %s", e)
             
             # Now try to delete the user
-            print(f"   🗑️ Attempting to delete user...")
+            logger.debug("Attempting to delete user...")
             # SQL: DELETE FROM users WHERE id = ?
             db.delete(db_user)
             db.commit()
-            print(f"✅ CRUD: User {user_id} deleted successfully from database")
+            principal_cache.invalidate_user(user_id)
+            logger.info("User %s deleted successfully from database", user_id)
             return True
             
         except Exception as e:
-            print(f"❌ CRUD: Error deleting user {user_id}: {e}")
+            logger.error("Error deleting user %s: %s", user_id, e)
             db.rollback()
             
             # If there are still constraint issues, try a different approach
             try:
-                print(f"   🔧 Trying alternative deletion method...")
+                logger.debug("Trying alternative deletion method...")
                 
                 # Set user as inactive instead of deleting (soft delete)
                 # SQL: UPDATE users SET status = 'deleted', email = ?, name = ?, phone = NULL WHERE id = ?
@@ -144,45 +161,26 @@ def delete_user(db: Session, user_id: int) -> bool:
                 db_user.phone = None
                 
                 db.commit()
-                print(f"✅ CRUD: User {user_id} marked as deleted (soft delete)")
+                principal_cache.invalidate_user(user_id)
+                logger.info("User %s marked as deleted (soft delete)", user_id)
                 return True
                 
             except Exception as soft_delete_error:
-                print(f"❌ CRUD: Soft delete also failed: {soft_delete_error}")
+                logger.error("Soft delete also failed: %s", soft_delete_error)
                 db.rollback()
                 return False
     else:
-        print(f"❌ CRUD: User {user_id} not found in database")
+        logger.warning("User %s not found in database", user_id)
         return False
 
 # Admin Statistics CRUD operations
 def get_user_statistics(db: Session) -> dict:
     """Get detailed user statistics for admin dashboard"""
-    # TEMPORARY: Use old method until user management system is fully set up
     try:
-        # SQL: SELECT COUNT(*) FROM users
-        total_users = db.query(models.User).count()
-        # SQL: SELECT COUNT(*) FROM users WHERE role = 'traveler'
-        travelers = db.query(models.User).filter(models.User.role == "traveler").count()
-        # SQL: SELECT COUNT(*) FROM users WHERE role = 'guide'
-        guides = db.query(models.User).filter(models.User.role == "guide").count()
-        # SQL: SELECT COUNT(*) FROM users WHERE role = 'restaurant_owner'
-        restaurant_owners = db.query(models.User).filter(models.User.role == "restaurant_owner").count()
-        # SQL: SELECT COUNT(*) FROM users WHERE role = 'hotel_owner'
-        hotel_owners = db.query(models.User).filter(models.User.role == "hotel_owner").count()
-        # SQL: SELECT COUNT(*) FROM users WHERE role = 'admin'
-        admins = db.query(models.User).filter(models.User.role == "admin").count()
-        
-        return {
-            "total_users": total_users,
-            "travelers": travelers,
-            "guides": guides,
-            "restaurant_owners": restaurant_owners,
-            "hotel_owners": hotel_owners,
-            "admins": admins
-        }
+        # SQL: SELECT role, COUNT(id) FROM users GROUP BY role
+        return dashboard_stats.get_role_counts(db)
     except Exception as e:
-        print(f"Error getting user statistics: {e}")
+        logger.error("Error getting user statistics: %s", e)
         return {
             "total_users": 0,
             "travelers": 0,
@@ -196,36 +194,20 @@ def get_admin_statistics(db: Session) -> dict:
     """Get comprehensive admin statistics"""
     user_stats = get_user_statistics(db)
     
-    # Get destination statistics
-    # SQL: SELECT COUNT(*) FROM destinations
-    destinations = db.query(models.Destination).count()
-    
-    # Get blog post statistics
-    # SQL: SELECT COUNT(*) FROM blog_posts
-    blog_posts = db.query(models.BlogPost).count()
-    
-    # Get rating statistics
-    # SQL: SELECT rating FROM destinations
-    destination_ratings = db.query(models.Destination.rating).all()
-    # SQL: SELECT COUNT(*) FROM reviews
-    total_reviews = db.query(models.Review).count()
-    
-    if destination_ratings:
-        average_rating = sum([rating[0] for rating in destination_ratings if rating[0] is not None]) / len(destination_ratings)
-    else:
-        average_rating = 0.0
+    # SQL: SELECT (SELECT COUNT(*) FROM destinations), (SELECT COUNT(*) FROM blog_posts), (SELECT COALESCE(AVG(rating), 0) FROM destinations), (SELECT COUNT(*) FROM reviews)
+    totals = dashboard_stats.get_content_totals(db)
     
     return {
         "users": user_stats,
-        "destinations": destinations,
-        "blog_posts": blog_posts,
-        "average_rating": round(average_rating, 1),
-        "total_reviews": total_reviews
+        "destinations": totals["total_destinations"],
+        "blog_posts": totals["total_blog_posts"],
+        "average_rating": round(totals["average_rating"], 1),
+        "total_reviews": totals["total_reviews"]
     }
 
 def get_dashboard_overview(db: Session) -> dict:
     """Get complete dashboard overview with recent data"""
-    statistics = get_admin_statistics(db)
+    statistics, _ = dashboard_stats.statistics_snapshot.get(db)
     
     # TEMPORARY: Use old method until user management system is fully set up
     try:
@@ -233,7 +215,7 @@ def get_dashboard_overview(db: Session) -> dict:
         # SQL: SELECT * FROM users ORDER BY created_at DESC LIMIT 5
         recent_users = db.query(models.User).order_by(models.User.created_at.desc()).limit(5).all()
     except Exception as e:
-        print(f"Error getting recent users: {e}")
+        logger.error("Error getting recent users: %s", e)
         recent_users = []
     
     # Get recent destinations (last 5)
@@ -254,7 +236,7 @@ def get_dashboard_overview(db: Session) -> dict:
     return {
         "statistics": statistics,
         "recent_users": [user.to_dict() for user in recent_users],
-        "recent_destinations": recent_destinations,
+        "recent_destinations": [destination.to_dict() for destination in recent_destinations],
         "recent_blog_posts": recent_blog_posts,
         "system_health": system_health
     }
@@ -272,6 +254,7 @@ def authenticate_admin_user(db: Session, email: str, password: str):
         return None
     if not admin_user.verify_password(password):
         return None
+    rehash_password_if_needed(db, admin_user, password)
     return admin_user
 
 def get_admin_statistics_from_table(db: Session):
@@ -288,76 +271,28 @@ def get_admin_statistics_from_table(db: Session):
             db.refresh(stats)
         return stats
     except Exception as e:
-        print(f"Admin statistics table not available: {e}")
+        logger.warning("Admin statistics table not available: %s", e)
         # Fallback to calculated stats
         return None
 
 def update_admin_statistics(db: Session):
     """Update admin statistics table with current data"""
     try:
-        # Get current counts
-        user_stats = get_user_statistics(db)
-        # SQL: SELECT COUNT(*) FROM destinations
-        destinations = db.query(models.Destination).count()
-        # SQL: SELECT COUNT(*) FROM blog_posts
-        blog_posts = db.query(models.BlogPost).count()
-        
-        # Calculate average rating
-        # SQL: SELECT rating FROM destinations
-        destination_ratings = db.query(models.Destination.rating).all()
-        if destination_ratings:
-            average_rating = sum([rating[0] for rating in destination_ratings if rating[0] is not None]) / len(destination_ratings)
-        else:
-            average_rating = 0.0
-        
-        # SQL: SELECT COUNT(*) FROM reviews
-        total_reviews = db.query(models.Review).count()
+        # Get current counts in two round-trips
+        # SQL: SELECT role, COUNT(id) FROM users GROUP BY role; SELECT (SELECT COUNT(*) FROM destinations), ...
+        current = dashboard_stats.compute_statistics(db)
         
         # Try to update admin_statistics table if it exists
         try:
-            # SQL: SELECT * FROM admin_statistics LIMIT 1
-            admin_stats = db.query(models.AdminStatistics).first()
-            if not admin_stats:
-                # SQL: INSERT INTO admin_statistics (default_values) VALUES (?)
-                admin_stats = models.AdminStatistics()
-                db.add(admin_stats)
-            
-            # Update the statistics
-            # SQL: UPDATE admin_statistics SET total_users = ?, travelers = ?, guides = ?, restaurant_owners = ?, hotel_owners = ?, admins = ?, total_destinations = ?, total_blog_posts = ?, average_rating = ?, total_reviews = ? WHERE id = ?
-            admin_stats.total_users = user_stats["total_users"]
-            admin_stats.travelers = user_stats["travelers"]
-            admin_stats.guides = user_stats["guides"]
-            admin_stats.restaurant_owners = user_stats["restaurant_owners"]
-            admin_stats.hotel_owners = user_stats["hotel_owners"]
-            admin_stats.admins = user_stats["admins"]
-            admin_stats.total_destinations = destinations
-            admin_stats.total_blog_posts = blog_posts
-            admin_stats.average_rating = average_rating
-            admin_stats.total_reviews = total_reviews
-            
-            db.commit()
-            db.refresh(admin_stats)
-            return admin_stats
-            
+            # SQL: SELECT * FROM admin_statistics LIMIT 1; UPDATE admin_statistics SET total_users = ?, ..., total_reviews = ? WHERE id = ?
+            return dashboard_stats.store_statistics(db, current)
         except Exception as e:
-            print(f"Admin statistics table update failed: {e}")
+            logger.error("Admin statistics table update failed: %s", e)
             # Return calculated stats instead
-            return {
-                "total_users": user_stats["total_users"],
-                "travelers": user_stats["travelers"],
-                "guides": user_stats["guides"],
-                "restaurant_owners": user_stats["restaurant_owners"],
-                "hotel_owners": user_stats["hotel_owners"],
-                "admins": user_stats["admins"],
-                "total_destinations": destinations,
-                "total_blog_posts": blog_posts,
-                "average_rating": average_rating,
-                "total_reviews": total_reviews,
-                "last_updated": datetime.utcnow().isoformat()
-            }
+            return current
         
     except Exception as e:
-        print(f"Error updating admin statistics: {e}")
+        logger.error("Error updating admin statistics: %s", e)
         return None
 
 def log_admin_activity(db: Session, admin_id: int, action: str, details: str = None):
@@ -374,7 +309,7 @@ def log_admin_activity(db: Session, admin_id: int, action: str, details: str = N
         db.refresh(activity_log)
         return activity_log
     except Exception as e:
-        print(f"Admin activity logging not available: {e}")
+        logger.warning("Admin activity logging not available: %s", e)
         return None
 
 # Destination CRUD operations
@@ -428,71 +363,64 @@ def get_review(db: Session, review_id: int) -> Optional[models.Review]:
 def get_reviews_by_destination(db: Session, destination_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
     """Get reviews for a specific destination"""
     try:
-        print(f"🔍 CRUD: Getting reviews for destination {destination_id}")
+        logger.debug("Getting reviews for destination %s", destination_id)
         
         # First, let's check if the destination exists
         # SQL: SELECT * FROM destinations WHERE id = ? LIMIT 1
         destination = db.query(models.Destination).filter(models.Destination.id == destination_id).first()
         if destination:
-            print(f"📍 CRUD: Destination found: {destination.name} (ID: {destination.id})")
+            logger.debug("Destination found: %s (ID: %s)", destination.name, destination.id)
         else:
-            print(f"⚠️ CRUD: Destination not found with ID: {destination_id}")
+            logger.warning("Destination not found with ID: %s", destination_id)
         
         # SQL: SELECT * FROM reviews WHERE destination_id = ? LIMIT ? OFFSET ?
-        reviews = db.query(models.Review).filter(models.Review.destination_id == destination_id).offset(skip).limit(limit).all()
-        print(f"✅ CRUD: Found {len(reviews)} reviews for destination {destination_id}")
-        
-        # Debug: Print raw review objects
-        for i, review in enumerate(reviews):
-            print(f"🔍 CRUD: Review {i+1}: ID={review.id}, Rating={review.rating}, Comment='{review.comment}'")
-        
-        # Convert to dictionary format for API response
-        review_list = []
-        for review in reviews:
-            try:
-                review_dict = review.to_dict()
-                review_list.append(review_dict)
-                print(f"✅ CRUD: Successfully converted review {review.id} to dict")
-            except Exception as e:
-                print(f"⚠️ CRUD: Error processing review {review.id}: {e}")
-                # Add basic review info if to_dict fails
-                review_list.append({
-                    "id": review.id,  # Frontend expects 'id'
-                    "review_id": review.id,  # Keep original field too
-                    "destination_id": review.destination_id,
-                    "user_id": review.user_id,
-                    "rating": float(review.rating) if review.rating else 0.0,
-                    "comment": review.comment,
-                    "created_at": review.created_at.isoformat() if review.created_at else None,
-                    "user": {
-                        "id": review.user.id if review.user else None,
-                        "name": review.user.name if review.user else "Anonymous",
-                        "email": review.user.email if review.user else ""
-                    } if review.user else None
-                })
-        
-        print(f"📊 CRUD: Returning {len(review_list)} reviews")
-        return review_list
+        reviews = db.query(models.Review).options(*loading.REVIEW_PLAN).filter(models.Review.destination_id == destination_id).offset(skip).limit(limit).all()
+        logger.debug("Found %s reviews for destination %s", len(reviews), destination_id)
         
+        # Debug: Log raw review objects
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, review in enumerate(reviews):
+                logger.debug("Review %s: ID=%s, Rating=%s, Comment='%s'", i+1, review.id, review.rating, review.comment)
     except Exception as e:
-        print(f"❌ CRUD: Error getting reviews by destination: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting reviews by destination: %s", e)
         return []
+    
+    # Serialized outside the try so the lazy-load guard's error is not swallowed
+    review_list = loading.serialize_rows(db, reviews, models.Review.to_dict, _basic_review_dict)
+    logger.debug("Returning %s reviews", len(review_list))
+    return review_list
+
+def _basic_review_dict(review: models.Review) -> dict:
+    """Review fields without to_dict(), for rows it fails on"""
+    return {
+        "id": review.id,  # Frontend expects 'id'
+        "review_id": review.id,  # Keep original field too
+        "destination_id": review.destination_id,
+        "user_id": review.user_id,
+        "rating": float(review.rating) if review.rating else 0.0,
+        "comment": review.comment,
+        "created_at": review.created_at.isoformat() if review.created_at else None,
+        "user": {
+            "id": review.user.id if review.user else None,
+            "name": review.user.name if review.user else "Anonymous",
+            "email": review.user.email if review.user else ""
+        } if review.user else None
+    }
 
 def create_review(db: Session, review: schemas.ReviewCreate, user_id: int, destination_id: int) -> models.Review:
-    print(f"🔧 CRUD: Creating review with data: {review.dict()}")
-    print(f"🔧 CRUD: User ID: {user_id}, Destination ID: {destination_id}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Creating review with data: %s", review.dict())
+    logger.debug("User ID: %s, Destination ID: %s", user_id, destination_id)
     
     # SQL: INSERT INTO reviews (rating, comment, user_id, destination_id, created_at) VALUES (?, ?, ?, ?, ?)
     db_review = models.Review(**review.dict(), user_id=user_id, destination_id=destination_id)
-    print(f"🔧 CRUD: Review object created: {db_review.id}")
+    logger.debug("Review object created: %s", db_review.id)
     
     db.add(db_review)
     db.commit()
     db.refresh(db_review)
     
-    print(f"🔧 CRUD: Review saved to database with ID: {db_review.id}")
+    logger.debug("Review saved to database with ID: %s", db_review.id)
     return db_review
 
 def update_review(db: Session, review_id: int, review: schemas.ReviewUpdate) -> Optional[models.Review]:
@@ -640,7 +568,7 @@ def delete_item(db: Session, item_id: int) -> bool:
 # Restaurant CRUD operations
 def get_restaurant(db: Session, restaurant_id: int) -> Optional[dict]:
     # SQL: SELECT * FROM restaurants WHERE id = ? LIMIT 1
-    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
+    restaurant = db.query(models.Restaurant).options(*loading.RESTAURANT_PLAN).filter(models.Restaurant.id == restaurant_id).first()
     return restaurant.to_dict() if restaurant else None
 
 def get_restaurant_model(db: Session, restaurant_id: int) -> Optional[models.Restaurant]:
@@ -649,14 +577,14 @@ def get_restaurant_model(db: Session, restaurant_id: int) -> Optional[models.Res
     return db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
 
 def get_restaurants(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
-    # SQL: SELECT * FROM restaurants LIMIT ? OFFSET ?
-    restaurants = db.query(models.Restaurant).offset(skip).limit(limit).all()
-    return [restaurant.to_dict() for restaurant in restaurants]
+    # SQL: SELECT * FROM restaurants LIMIT ? OFFSET ?; SELECT * FROM destinations WHERE id IN (...)
+    restaurants = db.query(models.Restaurant).options(*loading.RESTAURANT_PLAN).offset(skip).limit(limit).all()
+    return loading.serialize(db, restaurants)
 
 def get_restaurants_by_owner(db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[dict]:
-    # SQL: SELECT * FROM restaurants WHERE owner_id = ? LIMIT ? OFFSET ?
-    restaurants = db.query(models.Restaurant).filter(models.Restaurant.owner_id == owner_id).offset(skip).limit(limit).all()
-    return [restaurant.to_dict() for restaurant in restaurants]
+    # SQL: SELECT * FROM restaurants WHERE owner_id = ? LIMIT ? OFFSET ?; SELECT * FROM destinations WHERE id IN (...)
+    restaurants = db.query(models.Restaurant).options(*loading.RESTAURANT_PLAN).filter(models.Restaurant.owner_id == owner_id).offset(skip).limit(limit).all()
+    return loading.serialize(db, restaurants)
 
 def get_restaurants_by_owner_with_filters(
     db: Session, 
@@ -667,11 +595,11 @@ def get_restaurants_by_owner_with_filters(
     price_range: Optional[str] = None
 ) -> List[dict]:
     """Get restaurants by owner with search and filtering"""
-    print(f"🔍 CRUD: Getting restaurants for owner_id: {owner_id}")
-    print(f"🔍 CRUD: Filters - search: {search}, destination_id: {destination_id}, cuisine_type: {cuisine_type}, price_range: {price_range}")
+    logger.debug("Getting restaurants for owner_id: %s", owner_id)
+    logger.debug("Filters - search: %s, destination_id: %s, cuisine_type: %s, price_range: %s", search, destination_id, cuisine_type, price_range)
     
     # SQL: SELECT * FROM restaurants WHERE owner_id = ? [AND additional filters]
-    query = db.query(models.Restaurant).filter(models.Restaurant.owner_id == owner_id)
+    query = db.query(models.Restaurant).options(*loading.RESTAURANT_PLAN).filter(models.Restaurant.owner_id == owner_id)
     
     # Apply search filter
     if search:
@@ -701,12 +629,12 @@ def get_restaurants_by_owner_with_filters(
         query = query.filter(models.Restaurant.price_range == price_range)
     
     restaurants = query.all()
-    print(f"✅ CRUD: Found {len(restaurants)} restaurants before to_dict conversion")
+    logger.debug("Found %s restaurants before to_dict conversion", len(restaurants))
     
     # Convert to dictionaries
-    restaurant_dicts = [restaurant.to_dict() for restaurant in restaurants]
-    print(f"✅ CRUD: Converted {len(restaurant_dicts)} restaurants to dictionaries")
-    print(f"📊 CRUD: First restaurant dict: {restaurant_dicts[0] if restaurant_dicts else 'None'}")
+    restaurant_dicts = loading.serialize(db, restaurants)
+    logger.debug("Converted %s restaurants to dictionaries", len(restaurant_dicts))
+    logger.debug("First restaurant dict: %s", restaurant_dicts[0] if restaurant_dicts else 'None')
     
     return restaurant_dicts
 
@@ -744,20 +672,21 @@ def delete_restaurant(db: Session, restaurant_id: int) -> bool:
 # Hotel CRUD operations
 def get_hotel(db: Session, hotel_id: int) -> Optional[models.Hotel]:
     # SQL: SELECT * FROM hotels WHERE id = ? LIMIT 1
-    return db.query(models.Hotel).filter(models.Hotel.id == hotel_id).first()
+    return db.query(models.Hotel).options(*loading.HOTEL_PLAN).filter(models.Hotel.id == hotel_id).first()
 
 def get_hotels(db: Session, skip: int = 0, limit: int = 100) -> List[models.Hotel]:
-    # SQL: SELECT * FROM hotels LIMIT ? OFFSET ?
-    return db.query(models.Hotel).offset(skip).limit(limit).all()
+    # SQL: SELECT * FROM hotels LIMIT ? OFFSET ?; SELECT * FROM destinations WHERE id IN (...)
+    return db.query(models.Hotel).options(*loading.HOTEL_PLAN).offset(skip).limit(limit).all()
 
 def get_hotels_by_owner(db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[models.Hotel]:
-    # SQL: SELECT * FROM hotels WHERE owner_id = ? LIMIT ? OFFSET ?
-    return db.query(models.Hotel).filter(models.Hotel.owner_id == owner_id).offset(skip).limit(limit).all()
+    # SQL: SELECT * FROM hotels WHERE owner_id = ? LIMIT ? OFFSET ?; SELECT * FROM destinations WHERE id IN (...)
+    return db.query(models.Hotel).options(*loading.HOTEL_PLAN).filter(models.Hotel.owner_id == owner_id).offset(skip).limit(limit).all()
 
 def create_hotel(db: Session, hotel: schemas.HotelCreate, owner_id: int) -> models.Hotel:
     """Create a new hotel with detailed logging"""
-    print(f"🏗️ CRUD: Creating hotel for owner_id: {owner_id}")
-    print(f"📋 Hotel data: {hotel.dict()}")
+    logger.debug("Creating hotel for owner_id: %s", owner_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Hotel data: %s", hotel.dict())
     
     try:
         # Validate destination_id exists
@@ -765,37 +694,36 @@ def create_hotel(db: Session, hotel: schemas.HotelCreate, owner_id: int) -> mode
             # SQL: SELECT * FROM destinations WHERE id = ? LIMIT 1
             destination = db.query(models.Destination).filter(models.Destination.id == hotel.destination_id).first()
             if not destination:
-                print(f"❌ CRUD: Destination ID {hotel.destination_id} not found")
+                logger.warning("Destination ID %s not found", hotel.destination_id)
                 raise ValueError(f"Destination ID {hotel.destination_id} not found")
-            print(f"✅ CRUD: Destination found: {destination.name}")
+            logger.debug("Destination found: %s", destination.name)
         
         # Create hotel object
         hotel_data = hotel.dict()
-        print(f"🏨 CRUD: Creating hotel with data: {hotel_data}")
+        logger.debug("Creating hotel with data: %s", hotel_data)
         
         # SQL: INSERT INTO hotels (name, description, address, city, country, phone, email, website, image, rating, reviews, price_range, amenities, room_types, owner_id, destination_id, is_active, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         db_hotel = models.Hotel(**hotel_data, owner_id=owner_id)
-        print(f"🏨 CRUD: Hotel object created: {db_hotel.name}")
+        logger.debug("Hotel object created: %s", db_hotel.name)
         
         # Add to database
         db.add(db_hotel)
-        print("💾 CRUD: Hotel added to session")
+        logger.debug("Hotel added to session")
         
         # Commit changes
         db.commit()
-        print("✅ CRUD: Database commit successful")
+        logger.debug("Database commit successful")
         
         # Refresh to get the ID
         db.refresh(db_hotel)
-        print(f"🔄 CRUD: Hotel refreshed, ID: {db_hotel.id}")
+        logger.debug("Hotel refreshed, ID: %s", db_hotel.id)
         
         return db_hotel
         
     except Exception as e:
-        print(f"❌ CRUD: Error in create_hotel: {str(e)}")
-        print(f"❌ CRUD: Error type: {type(e)}")
+        logger.exception("Error in create_hotel: %s", e)
         db.rollback()
-        print("🔄 CRUD: Database rollback performed")
+        logger.debug("Database rollback performed")
         raise e
 
 def update_hotel(db: Session, hotel_id: int, hotel: schemas.HotelUpdate) -> Optional[models.Hotel]:
@@ -824,212 +752,168 @@ def delete_hotel(db: Session, hotel_id: int) -> bool:
 def get_hotels_by_destination(db: Session, destination_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
     """Get hotels by specific destination"""
     try:
-        print(f"🔍 CRUD: Getting hotels for destination {destination_id}")
+        logger.debug("Getting hotels for destination %s", destination_id)
         
         # First check if the hotels table has destination_id field
-        from sqlalchemy import inspect
-        inspector = inspect(db.bind)
-        
-        if 'hotels' not in inspector.get_table_names():
-            print("❌ CRUD: Hotels table does not exist")
+        if not schema_registry.has_table(db.get_bind(), 'hotels'):
+            logger.warning("Hotels table does not exist")
             return []
         
-        hotel_columns = inspector.get_columns('hotels')
-        column_names = [col['name'] for col in hotel_columns]
-        print(f"🔍 CRUD: Hotels table columns: {column_names}")
-        
-        if 'destination_id' not in column_names:
-            print("❌ CRUD: destination_id field not found in hotels table")
+        if not schema_registry.has_column(db.get_bind(), 'hotels', 'destination_id'):
+            logger.warning("destination_id field not found in hotels table")
             # Try to get all hotels if destination_id doesn't exist
             # SQL: SELECT * FROM hotels LIMIT ? OFFSET ?
-            hotels = db.query(models.Hotel).offset(skip).limit(limit).all()
+            hotels = db.query(models.Hotel).options(*loading.HOTEL_PLAN).offset(skip).limit(limit).all()
         else:
             # SQL: SELECT * FROM hotels WHERE destination_id = ? LIMIT ? OFFSET ?
-            hotels = db.query(models.Hotel).filter(models.Hotel.destination_id == destination_id).offset(skip).limit(limit).all()
-        
-        print(f"✅ CRUD: Found {len(hotels)} hotels for destination {destination_id}")
-        
-        # Convert to dictionary format for API response
-        hotel_list = []
-        for hotel in hotels:
-            try:
-                hotel_dict = hotel.to_dict()
-                hotel_list.append(hotel_dict)
-            except Exception as e:
-                print(f"⚠️ CRUD: Error processing hotel {hotel.id}: {e}")
-                # Add basic hotel info if to_dict fails
-                hotel_list.append({
-                    "id": hotel.id,
-                    "name": hotel.name,
-                    "owner_id": hotel.owner_id,
-                    "destination_id": hotel.destination_id,
-                    "description": hotel.description,
-                    "address": hotel.address,
-                    "city": hotel.city,
-                    "country": hotel.country,
-                    "phone": hotel.phone,
-                    "email": hotel.email,
-                    "website": hotel.website,
-                    "image": hotel.image,
-                    "rating": float(hotel.rating) if hotel.rating else 0.0,
-                    "reviews": hotel.reviews,
-                    "price_range": hotel.price_range,
-                    "amenities": hotel.amenities,
-                    "room_types": hotel.room_types,
-                    "is_active": hotel.is_active,
-                    "created_at": hotel.created_at.isoformat() if hotel.created_at else None,
-                    "updated_at": hotel.updated_at.isoformat() if hotel.updated_at else None
-                })
-        
-        return hotel_list
+            hotels = db.query(models.Hotel).options(*loading.HOTEL_PLAN).filter(models.Hotel.destination_id == destination_id).offset(skip).limit(limit).all()
         
+        logger.debug("Found %s hotels for destination %s", len(hotels), destination_id)
     except Exception as e:
-        print(f"❌ CRUD: Error getting hotels by destination: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting hotels by destination: %s", e)
         return []
+    
+    # Serialized outside the try so the lazy-load guard's error is not swallowed
+    return loading.serialize_rows(db, hotels, models.Hotel.to_dict, _basic_hotel_dict)
+
+def _basic_hotel_dict(hotel: models.Hotel) -> dict:
+    """Hotel fields without to_dict(), for rows it fails on"""
+    return {
+        "id": hotel.id,
+        "name": hotel.name,
+        "owner_id": hotel.owner_id,
+        "destination_id": hotel.destination_id,
+        "description": hotel.description,
+        "address": hotel.address,
+        "city": hotel.city,
+        "country": hotel.country,
+        "phone": hotel.phone,
+        "email": hotel.email,
+        "website": hotel.website,
+        "image": hotel.image,
+        "rating": float(hotel.rating) if hotel.rating else 0.0,
+        "reviews": hotel.reviews,
+        "price_range": hotel.price_range,
+        "amenities": hotel.amenities,
+        "room_types": hotel.room_types,
+        "is_active": hotel.is_active,
+        "created_at": hotel.created_at.isoformat() if hotel.created_at else None,
+        "updated_at": hotel.updated_at.isoformat() if hotel.updated_at else None
+    }
 
 def get_restaurants_by_destination(db: Session, destination_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
     """Get restaurants by specific destination"""
     try:
-        print(f"🔍 CRUD: Getting restaurants for destination {destination_id}")
+        logger.debug("Getting restaurants for destination %s", destination_id)
         
         # First check if the restaurants table has destination_id field
-        from sqlalchemy import inspect
-        inspector = inspect(db.bind)
-        
-        if 'restaurants' not in inspector.get_table_names():
-            print("❌ CRUD: Restaurants table does not exist")
+        if not schema_registry.has_table(db.get_bind(), 'restaurants'):
+            logger.warning("Restaurants table does not exist")
             return []
         
-        restaurant_columns = inspector.get_columns('restaurants')
-        column_names = [col['name'] for col in restaurant_columns]
-        print(f"🔍 CRUD: Restaurants table columns: {column_names}")
-        
-        if 'destination_id' not in column_names:
-            print("❌ CRUD: destination_id field not found in restaurants table")
+        if not schema_registry.has_column(db.get_bind(), 'restaurants', 'destination_id'):
+            logger.warning("destination_id field not found in restaurants table")
             # Try to get all restaurants if destination_id doesn't exist
             # SQL: SELECT * FROM restaurants LIMIT ? OFFSET ?
-            restaurants = db.query(models.Restaurant).offset(skip).limit(limit).all()
+            restaurants = db.query(models.Restaurant).options(*loading.RESTAURANT_PLAN).offset(skip).limit(limit).all()
         else:
             # SQL: SELECT * FROM restaurants WHERE destination_id = ? LIMIT ? OFFSET ?
-            restaurants = db.query(models.Restaurant).filter(models.Restaurant.destination_id == destination_id).offset(skip).limit(limit).all()
-        
-        print(f"✅ CRUD: Found {len(restaurants)} restaurants for destination {destination_id}")
-        
-        # Convert to dictionary format for API response
-        restaurant_list = []
-        for restaurant in restaurants:
-            try:
-                restaurant_dict = restaurant.to_dict()
-                restaurant_list.append(restaurant_dict)
-            except Exception as e:
-                print(f"⚠️ CRUD: Error processing restaurant {restaurant.id}: {e}")
-                # Add basic restaurant info if to_dict fails
-                restaurant_list.append({
-                    "id": restaurant.id,
-                    "name": restaurant.name,
-                    "owner_id": restaurant.owner_id,
-                    "destination_id": restaurant.destination_id,
-                    "description": restaurant.description,
-                    "cuisine_type": restaurant.cuisine_type,
-                    "address": restaurant.address,
-                    "phone": restaurant.phone,
-                    "website": restaurant.website,
-                    "image": restaurant.image,
-                    "menu_image": restaurant.menu_image,
-                    "rating": float(restaurant.rating) if restaurant.rating else 0.0,
-                    "reviews": restaurant.reviews,
-                    "price_range": restaurant.price_range,
-                    "is_active": restaurant.is_active,
-                    "created_at": restaurant.created_at.isoformat() if restaurant.created_at else None,
-                    "updated_at": restaurant.updated_at.isoformat() if restaurant.updated_at else None
-                })
-        
-        return restaurant_list
+            restaurants = db.query(models.Restaurant).options(*loading.RESTAURANT_PLAN).filter(models.Restaurant.destination_id == destination_id).offset(skip).limit(limit).all()
         
+        logger.debug("Found %s restaurants for destination %s", len(restaurants), destination_id)
     except Exception as e:
-        print(f"❌ CRUD: Error getting restaurants by destination: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting restaurants by destination: %s", e)
         return []
+    
+    # Serialized outside the try so the lazy-load guard's error is not swallowed
+    return loading.serialize_rows(db, restaurants, models.Restaurant.to_dict, _basic_restaurant_dict)
+
+def _basic_restaurant_dict(restaurant: models.Restaurant) -> dict:
+    """Restaurant fields without to_dict(), for rows it fails on"""
+    return {
+        "id": restaurant.id,
+        "name": restaurant.name,
+        "owner_id": restaurant.owner_id,
+        "destination_id": restaurant.destination_id,
+        "description": restaurant.description,
+        "cuisine_type": restaurant.cuisine_type,
+        "address": restaurant.address,
+        "phone": restaurant.phone,
+        "website": restaurant.website,
+        "image": restaurant.image,
+        "menu_image": restaurant.menu_image,
+        "rating": float(restaurant.rating) if restaurant.rating else 0.0,
+        "reviews": restaurant.reviews,
+        "price_range": restaurant.price_range,
+        "is_active": restaurant.is_active,
+        "created_at": restaurant.created_at.isoformat() if restaurant.created_at else None,
+        "updated_at": restaurant.updated_at.isoformat() if restaurant.updated_at else None
+    }
 
 def get_guides_by_destination(db: Session, destination_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
     """Get guides by specific destination"""
     try:
-        print(f"🔍 CRUD: Getting guides for destination {destination_id}")
+        logger.debug("Getting guides for destination %s", destination_id)
         
         # First check if the guides table has destination_id field
-        from sqlalchemy import inspect
-        inspector = inspect(db.bind)
-        
-        if 'guides' not in inspector.get_table_names():
-            print("❌ CRUD: Guides table does not exist")
+        if not schema_registry.has_table(db.get_bind(), 'guides'):
+            logger.warning("Guides table does not exist")
             return []
         
-        guide_columns = inspector.get_columns('guides')
-        column_names = [col['name'] for col in guide_columns]
-        print(f"🔍 CRUD: Guides table columns: {column_names}")
-        
-        if 'destination_id' not in column_names:
-            print("❌ CRUD: destination_id field not found in guides table")
+        if not schema_registry.has_column(db.get_bind(), 'guides', 'destination_id'):
+            logger.warning("destination_id field not found in guides table")
             # Try to get all guides if destination_id doesn't exist
             # SQL: SELECT * FROM guides LIMIT ? OFFSET ?
-            guides = db.query(models.Guide).offset(skip).limit(limit).all()
+            guides = db.query(models.Guide).options(*loading.GUIDE_SUMMARY_PLAN).offset(skip).limit(limit).all()
         else:
             # SQL: SELECT * FROM guides WHERE destination_id = ? LIMIT ? OFFSET ?
-            guides = db.query(models.Guide).filter(models.Guide.destination_id == destination_id).offset(skip).limit(limit).all()
-        
-        print(f"✅ CRUD: Found {len(guides)} guides for destination {destination_id}")
-        
-        # Convert to dictionary format for API response
-        guide_list = []
-        for guide in guides:
-            try:
-                guide_dict = {
-                    "id": guide.id,
-                    "name": getattr(guide.user, 'name', None) if guide.user else "Unknown",
-                    "specialty": getattr(guide, 'specialties', None) or "Local Tours",
-                    "experience": f"{getattr(guide, 'experience_years', 0)} years" if getattr(guide, 'experience_years', None) else "Experience not specified",
-                    "rating": float(getattr(guide, 'rating', 0)) if getattr(guide, 'rating', None) else 0.0,
-                    "user": {
-                        "name": getattr(guide.user, 'name', None) if guide.user else "Unknown",
-                        "email": getattr(guide.user, 'email', None) if guide.user else ""
-                    }
-                }
-                guide_list.append(guide_dict)
-            except Exception as e:
-                print(f"⚠️ CRUD: Error processing guide {guide.id}: {e}")
-                # Add basic guide info if processing fails
-                guide_list.append({
-                    "id": guide.id,
-                    "name": "Guide",
-                    "specialty": "Local Tours",
-                    "experience": "Experience not specified",
-                    "rating": 0.0,
-                    "user": {
-                        "name": "Guide",
-                        "email": ""
-                    }
-                })
-        
-        return guide_list
+            guides = db.query(models.Guide).options(*loading.GUIDE_SUMMARY_PLAN).filter(models.Guide.destination_id == destination_id).offset(skip).limit(limit).all()
         
+        logger.debug("Found %s guides for destination %s", len(guides), destination_id)
     except Exception as e:
-        print(f"❌ CRUD: Error getting guides by destination: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting guides by destination: %s", e)
         return []
+    
+    # Serialized outside the try so the lazy-load guard's error is not swallowed
+    return loading.serialize_rows(db, guides, _guide_summary_dict, _basic_guide_dict)
+
+def _guide_summary_dict(guide: models.Guide) -> dict:
+    """Guide card for destination pages; needs GUIDE_SUMMARY_PLAN"""
+    return {
+        "id": guide.id,
+        "name": getattr(guide.user, 'name', None) if guide.user else "Unknown",
+        "specialty": getattr(guide, 'specialties', None) or "Local Tours",
+        "experience": f"{getattr(guide, 'experience_years', 0)} years" if getattr(guide, 'experience_years', None) else "Experience not specified",
+        "rating": float(getattr(guide, 'rating', 0)) if getattr(guide, 'rating', None) else 0.0,
+        "user": {
+            "name": getattr(guide.user, 'name', None) if guide.user else "Unknown",
+            "email": getattr(guide.user, 'email', None) if guide.user else ""
+        }
+    }
+
+def _basic_guide_dict(guide: models.Guide) -> dict:
+    """Placeholder guide card for rows _guide_summary_dict fails on"""
+    return {
+        "id": guide.id,
+        "name": "Guide",
+        "specialty": "Local Tours",
+        "experience": "Experience not specified",
+        "rating": 0.0,
+        "user": {
+            "name": "Guide",
+            "email": ""
+        }
+    }
 
 def get_hotels_by_owner_with_destinations(db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[models.Hotel]:
     """Get hotels by owner with destination information"""
-    # SQL: SELECT * FROM hotels WHERE owner_id = ? LIMIT ? OFFSET ?
-    return db.query(models.Hotel).filter(models.Hotel.owner_id == owner_id).offset(skip).limit(limit).all()
+    # SQL: SELECT * FROM hotels WHERE owner_id = ? LIMIT ? OFFSET ?; SELECT * FROM destinations WHERE id IN (...)
+    return db.query(models.Hotel).options(*loading.HOTEL_PLAN).filter(models.Hotel.owner_id == owner_id).offset(skip).limit(limit).all()
 
 def search_hotels_by_owner(db: Session, owner_id: int, search_term: str = None, destination_id: int = None, price_range: str = None) -> List[models.Hotel]:
     """Search hotels by owner with filters"""
     # SQL: SELECT * FROM hotels WHERE owner_id = ? [AND additional filters]
-    query = db.query(models.Hotel).filter(models.Hotel.owner_id == owner_id)
+    query = db.query(models.Hotel).options(*loading.HOTEL_PLAN).filter(models.Hotel.owner_id == owner_id)
     
     if search_term:
         # SQL: AND (name ILIKE ? OR description ILIKE ?)
@@ -1103,6 +987,8 @@ def get_user_management_data(db: Session) -> List[Dict]:
     # TEMPORARY: Use simple fallback until user management system is fully set up
     try:
         # Try to use the stored procedure first
+        if not schema_registry.has_procedure(db.get_bind(), "GetUserManagementData"):
+            raise LookupError("GetUserManagementData procedure is not installed")
         # SQL: CALL GetUserManagementData()
         result = db.execute(text("CALL GetUserManagementData()"))
         data = result.fetchall()
@@ -1125,7 +1011,7 @@ def get_user_management_data(db: Session) -> List[Dict]:
         
         return users
     except Exception as e:
-        print(f"User management system not ready, using fallback: {e}")
+        logger.warning("User management system not ready, using fallback: %s", e)
         # Fallback: Get basic user data directly
         try:
             # SQL: SELECT * FROM users
@@ -1146,11 +1032,13 @@ def get_user_management_data(db: Session) -> List[Dict]:
                 })
             return user_list
         except Exception as fallback_error:
-            print(f"Fallback method also failed: {fallback_error}")
+            logger.error("Fallback method also failed: %s", fallback_error)
             return []
 
 def update_user_status(db: Session, user_id: int, status: str, admin_id: int, admin_notes: str = None) -> Dict:
     """Update user status using stored procedure"""
+    if not schema_registry.has_procedure(db.get_bind(), "UpdateUserStatus"):
+        raise ValueError("Failed to update user status: UpdateUserStatus procedure is not installed")
     try:
         # Use the stored procedure
         # SQL: CALL UpdateUserStatus(?, ?, ?, ?)
@@ -1159,11 +1047,12 @@ def update_user_status(db: Session, user_id: int, status: str, admin_id: int, ad
             {"user_id": user_id, "status": status, "admin_id": admin_id, "admin_notes": admin_notes}
         )
         db.commit()
+        principal_cache.invalidate_user(user_id)
         
         return {"message": "User status updated successfully", "status": status}
     except Exception as e:
         db.rollback()
-        print(f"Error updating user status: {e}")
+        logger.error("Error updating user status: %s", e)
         raise ValueError(f"Failed to update user status: {str(e)}")
 
 def get_user_management_by_user_id(db: Session, user_id: int):
@@ -1175,24 +1064,24 @@ def get_user_management_by_user_id(db: Session, user_id: int):
 def get_guide(db: Session, guide_id: int) -> Optional[dict]:
     """Get guide by ID"""
     # SQL: SELECT * FROM guides WHERE id = ? LIMIT 1
-    guide = db.query(models.Guide).filter(models.Guide.id == guide_id).first()
+    guide = db.query(models.Guide).options(*loading.GUIDE_PLAN).filter(models.Guide.id == guide_id).first()
     if guide:
-        return guide.to_dict()
+        return loading.serialize_guides(db, [guide])[0]
     return None
 
 def get_guide_by_user_id(db: Session, user_id: int) -> Optional[dict]:
     """Get guide by user ID"""
     # SQL: SELECT * FROM guides WHERE user_id = ? LIMIT 1
-    guide = db.query(models.Guide).filter(models.Guide.user_id == user_id).first()
+    guide = db.query(models.Guide).options(*loading.GUIDE_PLAN).filter(models.Guide.user_id == user_id).first()
     if guide:
-        return guide.to_dict()
+        return loading.serialize_guides(db, [guide])[0]
     return None
 
 def get_guides(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
     """Get all guides with pagination"""
-    # SQL: SELECT * FROM guides LIMIT ? OFFSET ?
-    guides = db.query(models.Guide).offset(skip).limit(limit).all()
-    return [guide.to_dict() for guide in guides]
+    # SQL: SELECT * FROM guides LIMIT ? OFFSET ?; SELECT * FROM users/destinations/guide_reviews WHERE ... IN (...)
+    guides = db.query(models.Guide).options(*loading.GUIDE_PLAN).offset(skip).limit(limit).all()
+    return loading.serialize_guides(db, guides)
 
 def create_guide(db: Session, guide: schemas.GuideCreate) -> dict:
     """Create new guide profile"""
@@ -1232,11 +1121,11 @@ def delete_guide(db: Session, guide_id: int) -> bool:
 # Guide Review CRUD operations
 def get_guide_reviews(db: Session, guide_id: int, skip: int = 0, limit: int = 100) -> List[dict]:
     """Get reviews for a guide"""
-    # SQL: SELECT * FROM guide_reviews WHERE guide_id = ? LIMIT ? OFFSET ?
-    reviews = db.query(models.GuideReview).filter(
+    # SQL: SELECT * FROM guide_reviews WHERE guide_id = ? LIMIT ? OFFSET ?; SELECT * FROM users WHERE id IN (...)
+    reviews = db.query(models.GuideReview).options(*loading.GUIDE_REVIEW_PLAN).filter(
         models.GuideReview.guide_id == guide_id
     ).offset(skip).limit(limit).all()
-    return [review.to_dict() for review in reviews]
+    return loading.serialize(db, reviews)
 
 def create_guide_review(db: Session, review: schemas.GuideReviewCreate) -> dict:
     """Create new guide review"""
@@ -1277,7 +1166,7 @@ def create_hotel_room_type(db: Session, room_type_data: dict) -> Dict:
         return room_type.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error creating hotel room type: {e}")
+        logger.error("Error creating hotel room type: %s", e)
         raise
 
 def get_hotel_room_types(db: Session, hotel_id: int) -> List[Dict]:
@@ -1290,7 +1179,7 @@ def get_hotel_room_types(db: Session, hotel_id: int) -> List[Dict]:
         ).all()
         return [room_type.to_dict() for room_type in room_types]
     except Exception as e:
-        print(f"❌ Error getting hotel room types: {e}")
+        logger.error("Error getting hotel room types: %s", e)
         return []
 
 def update_hotel_room_type(db: Session, room_type_id: int, update_data: dict) -> Dict:
@@ -1308,10 +1197,11 @@ def update_hotel_room_type(db: Session, room_type_id: int, update_data: dict) ->
         # SQL: UPDATE hotel_room_types SET field1 = ?, field2 = ?, ... WHERE room_type_id = ?
         db.commit()
         db.refresh(room_type)
+        quotes.quote_cache.invalidate_hotel(room_type.hotel_id)
         return room_type.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error updating hotel room type: {e}")
+        logger.error("Error updating hotel room type: %s", e)
         raise
 
 def create_room_availability(db: Session, availability_data: dict) -> Dict:
@@ -1322,10 +1212,118 @@ def create_room_availability(db: Session, availability_data: dict) -> Dict:
         db.add(availability)
         db.commit()
         db.refresh(availability)
+        quotes.quote_cache.invalidate_hotel(availability.hotel_id)
         return availability.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error creating room availability: {e}")
+        logger.error("Error creating room availability: %s", e)
+        raise
+
+# Rows per multi-row INSERT in bulk inventory upserts
+INVENTORY_UPSERT_BATCH = 1000
+# Largest calendar accepted in one bulk request
+MAX_INVENTORY_ROWS = 50000
+
+def _inventory_rows(hotel_id: int, inventory_range: schemas.RoomInventoryRange) -> List[dict]:
+    """One room_availability row per night of the range (end_date inclusive)"""
+    start = datetime.strptime(inventory_range.start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(inventory_range.end_date, '%Y-%m-%d').date()
+    if end < start:
+        raise ValueError(f"end_date must not be before start_date for {inventory_range.room_type}")
+    if inventory_range.total_rooms < 0:
+        raise ValueError("total_rooms must not be negative")
+    if inventory_range.weekday_prices is not None:
+        if len(inventory_range.weekday_prices) != 7:
+            raise ValueError("weekday_prices needs 7 prices, Monday to Sunday")
+        prices = [Decimal(str(price)) for price in inventory_range.weekday_prices]
+    elif inventory_range.price_per_night is not None:
+        prices = [Decimal(str(inventory_range.price_per_night))] * 7
+    else:
+        raise ValueError("Either price_per_night or weekday_prices is required")
+    if (end - start).days + 1 > MAX_INVENTORY_ROWS:
+        raise ValueError(f"At most {MAX_INVENTORY_ROWS} nights per request")
+    
+    rows = []
+    night = start
+    while night <= end:
+        rows.append({
+            "hotel_id": hotel_id,
+            "room_type": inventory_range.room_type,
+            "date": night,
+            "total_rooms": inventory_range.total_rooms,
+            "available_rooms": inventory_range.total_rooms,
+            "price_per_night": prices[night.weekday()]
+        })
+        night += timedelta(days=1)
+    return rows
+
+def _inventory_upsert(dialect_name: str, rows: List[dict]):
+    """Multi-row INSERT that updates existing (hotel_id, room_type, date) rows instead of failing.
+    Existing rows keep their booked rooms: available_rooms moves by the change in total_rooms."""
+    availability = models.RoomAvailability
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(availability).values(rows)
+        new_available = availability.available_rooms + stmt.inserted.total_rooms - availability.total_rooms
+        # MySQL applies the assignments left to right, so available_rooms must be
+        # computed before total_rooms is overwritten
+        return stmt.on_duplicate_key_update([
+            ("available_rooms", case((new_available < 0, 0), else_=new_available)),
+            ("total_rooms", stmt.inserted.total_rooms),
+            ("price_per_night", stmt.inserted.price_per_night),
+        ])
+    if dialect_name in ("sqlite", "postgresql"):
+        from importlib import import_module
+        insert = import_module(f"sqlalchemy.dialects.{dialect_name}").insert
+        stmt = insert(availability).values(rows)
+        new_available = availability.available_rooms + stmt.excluded.total_rooms - availability.total_rooms
+        return stmt.on_conflict_do_update(
+            index_elements=["hotel_id", "room_type", "date"],
+            set_={
+                "available_rooms": case((new_available < 0, 0), else_=new_available),
+                "total_rooms": stmt.excluded.total_rooms,
+                "price_per_night": stmt.excluded.price_per_night,
+            }
+        )
+    raise ValueError(f"Bulk inventory upsert is not supported on {dialect_name}")
+
+def bulk_upsert_room_availability(db: Session, hotel_id: int, ranges: List[schemas.RoomInventoryRange]) -> Dict:
+    """Create or update a hotel's room_availability calendar for many nights in one transaction"""
+    try:
+        # Later ranges win where ranges overlap
+        rows_by_key = {}
+        for inventory_range in ranges:
+            for row in _inventory_rows(hotel_id, inventory_range):
+                rows_by_key[(row["room_type"], row["date"])] = row
+        if len(rows_by_key) > MAX_INVENTORY_ROWS:
+            raise ValueError(f"At most {MAX_INVENTORY_ROWS} nights per request")
+        if not rows_by_key:
+            return {"inserted": 0, "updated": 0}
+        
+        # Count the nights that already exist so the result can split inserts from updates
+        # (affected-row counts from upserts are not portable across drivers)
+        # SQL: SELECT room_type, date FROM room_availability WHERE hotel_id = ? AND room_type IN (...) AND date >= ? AND date <= ?
+        dates = [date for _, date in rows_by_key]
+        existing = db.query(models.RoomAvailability.room_type, models.RoomAvailability.date).filter(
+            models.RoomAvailability.hotel_id == hotel_id,
+            models.RoomAvailability.room_type.in_({room_type for room_type, _ in rows_by_key}),
+            models.RoomAvailability.date >= min(dates),
+            models.RoomAvailability.date <= max(dates)
+        ).all()
+        updated = sum(1 for room_type, date in existing if (room_type, date) in rows_by_key)
+        
+        rows = list(rows_by_key.values())
+        dialect_name = db.get_bind().dialect.name
+        for batch_start in range(0, len(rows), INVENTORY_UPSERT_BATCH):
+            # SQL: INSERT INTO room_availability (hotel_id, room_type, date, total_rooms, available_rooms, price_per_night) VALUES (...), (...), ... ON DUPLICATE KEY UPDATE available_rooms = GREATEST(available_rooms + VALUES(total_rooms) - total_rooms, 0), total_rooms = VALUES(total_rooms), price_per_night = VALUES(price_per_night)
+            db.execute(_inventory_upsert(dialect_name, rows[batch_start:batch_start + INVENTORY_UPSERT_BATCH]))
+        inventory_engine.stage(db, "upsert_nights", hotel_id, rows)
+        db.commit()
+        quotes.quote_cache.invalidate_hotel(hotel_id)
+        return {"inserted": len(rows) - updated, "updated": updated}
+    except Exception as e:
+        db.rollback()
+        logger.error("Error upserting room inventory: %s", e)
         raise
 
 def get_room_availability(db: Session, hotel_id: int, room_type: str, start_date: str, end_date: str) -> List[Dict]:
@@ -1340,7 +1338,7 @@ def get_room_availability(db: Session, hotel_id: int, room_type: str, start_date
         ).all()
         return [avail.to_dict() for avail in availability]
     except Exception as e:
-        print(f"❌ Error getting room availability: {e}")
+        logger.error("Error getting room availability: %s", e)
         return []
 
 def update_room_availability(db: Session, availability_id: int, update_data: dict) -> Dict:
@@ -1358,21 +1356,21 @@ def update_room_availability(db: Session, availability_id: int, update_data: dic
         # SQL: UPDATE room_availability SET field1 = ?, field2 = ?, ... WHERE availability_id = ?
         db.commit()
         db.refresh(availability)
+        quotes.quote_cache.invalidate_hotel(availability.hotel_id)
         return availability.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error updating room availability: {e}")
+        logger.error("Error updating room availability: %s", e)
         raise
 
 def create_hotel_booking(db: Session, booking_data: dict) -> Dict:
-    """Create a new hotel booking"""
+    """Create a new hotel booking, reserving a room on every night of the stay in the same transaction"""
     try:
         # Calculate total price based on dates and room type
-        from datetime import datetime, timedelta
         check_in = datetime.strptime(booking_data['check_in_date'], '%Y-%m-%d').date()
         check_out = datetime.strptime(booking_data['check_out_date'], '%Y-%m-%d').date()
         
-        # Get room type price
+        # Get room type base price
         # SQL: SELECT * FROM hotel_room_types WHERE hotel_id = ? AND room_type_name = ? LIMIT 1
         room_type = db.query(models.HotelRoomType).filter(
             models.HotelRoomType.hotel_id == booking_data['hotel_id'],
@@ -1382,41 +1380,33 @@ def create_hotel_booking(db: Session, booking_data: dict) -> Dict:
         if not room_type:
             raise ValueError("Room type not found")
         
-        # Calculate number of nights
-        nights = (check_out - check_in).days
-        total_price = room_type.base_price_per_night * nights
+        # Lock every night of the stay, verify capacity and decrement them all at once
+        # SQL: SELECT * FROM room_availability WHERE hotel_id = ? AND room_type = ? AND date >= ? AND date < ? ORDER BY date FOR UPDATE; UPDATE room_availability SET available_rooms = available_rooms - 1 WHERE hotel_id = ? AND room_type = ? AND date >= ? AND date < ? AND available_rooms >= 1
+        nights = reservations.reserve_nights(db, booking_data['hotel_id'], booking_data['room_type'], check_in, check_out)
         
-        # Add total price to booking data
-        booking_data['total_price'] = total_price
+        # Charge each night's own rate, read from the rows locked above
+        quote = quotes.price_stay(
+            booking_data['hotel_id'], booking_data['room_type'], check_in, check_out,
+            room_type.base_price_per_night, {night.date: night.price_per_night for night in nights}
+        )
+        booking_data['total_price'] = quote.total_price
+        booking_data['check_in_date'] = check_in
+        booking_data['check_out_date'] = check_out
+        # The rooms are only held until confirmation or expiry
+        booking_data['hold_expires_at'] = booking_holds.hold_expiry()
         
         # Create booking
-        # SQL: INSERT INTO hotel_bookings (hotel_id, traveler_id, room_type, check_in_date, check_out_date, total_price, booking_status, guest_name, guest_email, guest_phone, special_requests, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        # SQL: INSERT INTO hotel_bookings (hotel_id, traveler_id, room_type, check_in_date, check_out_date, total_price, booking_status, hold_expires_at, guest_name, guest_email, guest_phone, special_requests, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         booking = models.HotelBooking(**booking_data)
         db.add(booking)
         db.commit()
+        booking_holds.hold_stats.add(created=1)
         db.refresh(booking)
         
-        # Update room availability
-        current_date = check_in
-        while current_date < check_out:
-            # SQL: SELECT * FROM room_availability WHERE hotel_id = ? AND room_type = ? AND date = ? LIMIT 1
-            availability = db.query(models.RoomAvailability).filter(
-                models.RoomAvailability.hotel_id == booking_data['hotel_id'],
-                models.RoomAvailability.room_type == booking_data['room_type'],
-                models.RoomAvailability.date == current_date
-            ).first()
-            
-            if availability and availability.available_rooms > 0:
-                # SQL: UPDATE room_availability SET available_rooms = available_rooms - 1 WHERE availability_id = ?
-                availability.available_rooms -= 1
-                db.commit()
-            
-            current_date += timedelta(days=1)
-        
         return booking.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error creating hotel booking: {e}")
+        logger.error("Error creating hotel booking: %s", e)
         raise
 
 def get_hotel_bookings_by_traveler(db: Session, traveler_id: int) -> List[Dict]:
@@ -1426,7 +1416,7 @@ def get_hotel_bookings_by_traveler(db: Session, traveler_id: int) -> List[Dict]:
         bookings = db.query(models.HotelBooking).filter(models.HotelBooking.traveler_id == traveler_id).all()
         return [booking.to_dict() for booking in bookings]
     except Exception as e:
-        print(f"❌ Error getting hotel bookings by traveler: {e}")
+        logger.error("Error getting hotel bookings by traveler: %s", e)
         return []
 
 def get_hotel_bookings_by_hotel(db: Session, hotel_id: int) -> List[Dict]:
@@ -1436,69 +1426,89 @@ def get_hotel_bookings_by_hotel(db: Session, hotel_id: int) -> List[Dict]:
         bookings = db.query(models.HotelBooking).filter(models.HotelBooking.hotel_id == hotel_id).all()
         return [booking.to_dict() for booking in bookings]
     except Exception as e:
-        print(f"❌ Error getting hotel bookings by hotel: {e}")
+        logger.error("Error getting hotel bookings by hotel: %s", e)
         return []
 
 def update_hotel_booking(db: Session, booking_id: int, update_data: dict) -> Dict:
     """Update a hotel booking"""
     try:
-        # SQL: SELECT * FROM hotel_bookings WHERE booking_id = ? LIMIT 1
-        booking = db.query(models.HotelBooking).filter(models.HotelBooking.booking_id == booking_id).first()
+        # Locked so a concurrent cancellation or hold sweep cannot slip in between the checks and the UPDATE
+        # SQL: SELECT * FROM hotel_bookings WHERE booking_id = ? LIMIT 1 FOR UPDATE
+        booking = db.query(models.HotelBooking).filter(models.HotelBooking.booking_id == booking_id).with_for_update().first()
         if not booking:
             return None
         
+        status = update_data.get('booking_status') or booking.booking_status
+        # A cancelled booking's nights were already returned, so it cannot be revived
+        if booking.booking_status == 'cancelled' and status != 'cancelled':
+            raise reservations.BookingClosed("The booking is cancelled and its rooms were released; make a new booking")
+        # Only new bookings get a hold; a pending row without one would never be swept
+        if booking.booking_status != 'pending' and status == 'pending':
+            raise booking_holds.HoldEnded("The booking is no longer pending and cannot be moved back to pending")
+        
+        # Leaving 'pending' keeps the held rooms for good, unless the sweeper got there first
+        ends_hold = booking.booking_status == 'pending' and status not in ('pending', 'cancelled')
+        if ends_hold and not booking_holds.end_hold(db, booking_id):
+            raise booking_holds.HoldExpired("The booking hold has expired and its rooms were released")
+        
         for key, value in update_data.items():
-            if hasattr(booking, key):
+            if key != 'booking_status' and hasattr(booking, key):
                 setattr(booking, key, value)
+        if status == 'cancelled':
+            # Same transition as POST /bookings/{id}/cancel, so the nights are released exactly once
+            _cancel_booking(db, booking)
+        else:
+            booking.booking_status = status
         
         # SQL: UPDATE hotel_bookings SET field1 = ?, field2 = ?, ... WHERE booking_id = ?
         db.commit()
+        if ends_hold:
+            booking_holds.hold_stats.add(confirmed=1)
         db.refresh(booking)
         return booking.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error updating hotel booking: {e}")
+        logger.error("Error updating hotel booking: %s", e)
         raise
 
+def _cancel_booking(db: Session, booking: models.HotelBooking) -> bool:
+    """Move a booking to 'cancelled' and restore its nights; False if it already was. Does not commit."""
+    # Only the request that actually moves the booking to 'cancelled' restores its nights,
+    # so repeated or concurrent cancellations never add the rooms back twice
+    # SQL: UPDATE hotel_bookings SET booking_status = 'cancelled', hold_expires_at = NULL WHERE booking_id = ? AND booking_status != 'cancelled'
+    transition = db.execute(
+        update(models.HotelBooking)
+        .where(models.HotelBooking.booking_id == booking.booking_id, models.HotelBooking.booking_status != 'cancelled')
+        .values(booking_status='cancelled', hold_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    if not transition.rowcount:
+        return False
+    
+    # Restore every night of the stay at once
+    # SQL: UPDATE room_availability SET available_rooms = available_rooms + 1 WHERE hotel_id = ? AND room_type = ? AND date >= ? AND date < ? AND available_rooms + 1 <= total_rooms
+    restored = reservations.release_nights(db, booking.hotel_id, booking.room_type, booking.check_in_date, booking.check_out_date)
+    booking_events.publish_after_commit(db, booking_events.BookingCancelled(
+        booking.booking_id, booking.hotel_id, booking.traveler_id, booking.room_type,
+        booking.check_in_date, booking.check_out_date, restored
+    ))
+    return True
+
 def cancel_hotel_booking(db: Session, booking_id: int) -> Dict:
-    """Cancel a hotel booking and restore room availability"""
+    """Cancel a hotel booking and restore room availability (idempotent)"""
     try:
         # SQL: SELECT * FROM hotel_bookings WHERE booking_id = ? LIMIT 1
         booking = db.query(models.HotelBooking).filter(models.HotelBooking.booking_id == booking_id).first()
         if not booking:
             return None
         
-        # Update booking status
-        # SQL: UPDATE hotel_bookings SET booking_status = 'cancelled' WHERE booking_id = ?
-        booking.booking_status = 'cancelled'
-        
-        # Restore room availability
-        from datetime import datetime, timedelta
-        check_in = datetime.strptime(booking.check_in_date, '%Y-%m-%d').date()
-        check_out = datetime.strptime(booking.check_out_date, '%Y-%m-%d').date()
-        
-        current_date = check_in
-        while current_date < check_out:
-            # SQL: SELECT * FROM room_availability WHERE hotel_id = ? AND room_type = ? AND date = ? LIMIT 1
-            availability = db.query(models.RoomAvailability).filter(
-                models.RoomAvailability.hotel_id == booking.hotel_id,
-                models.RoomAvailability.room_type == booking.room_type,
-                models.RoomAvailability.date == current_date
-            ).first()
-            
-            if availability:
-                # SQL: UPDATE room_availability SET available_rooms = available_rooms + 1 WHERE availability_id = ?
-                availability.available_rooms += 1
-                db.commit()
-            
-            current_date += timedelta(days=1)
-        
+        _cancel_booking(db, booking)
         db.commit()
         db.refresh(booking)
         return booking.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error cancelling hotel booking: {e}")
+        logger.error("Error cancelling hotel booking: %s", e)
         raise
 
 def create_guest_request(db: Session, request_data: dict) -> Dict:
@@ -1512,7 +1522,7 @@ def create_guest_request(db: Session, request_data: dict) -> Dict:
         return request.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error creating guest request: {e}")
+        logger.error("Error creating guest request: %s", e)
         raise
 
 def get_guest_requests_by_booking(db: Session, booking_id: int) -> List[Dict]:
@@ -1522,7 +1532,7 @@ def get_guest_requests_by_booking(db: Session, booking_id: int) -> List[Dict]:
         requests = db.query(models.GuestRequest).filter(models.GuestRequest.booking_id == booking_id).all()
         return [request.to_dict() for request in requests]
     except Exception as e:
-        print(f"❌ Error getting guest requests by booking: {e}")
+        logger.error("Error getting guest requests by booking: %s", e)
         return []
 
 def get_guest_requests_by_hotel(db: Session, hotel_id: int) -> List[Dict]:
@@ -1534,7 +1544,7 @@ def get_guest_requests_by_hotel(db: Session, hotel_id: int) -> List[Dict]:
         ).all()
         return [request.to_dict() for request in requests]
     except Exception as e:
-        print(f"❌ Error getting guest requests by hotel: {e}")
+        logger.error("Error getting guest requests by hotel: %s", e)
         return []
 
 def update_guest_request(db: Session, request_id: int, update_data: dict) -> Dict:
@@ -1555,47 +1565,64 @@ def update_guest_request(db: Session, request_id: int, update_data: dict) -> Dic
         return request.to_dict()
     except Exception as e:
         db.rollback()
-        print(f"❌ Error updating guest request: {e}")
+        logger.error("Error updating guest request: %s", e)
         raise
 
-def get_hotel_booking_statistics(db: Session, hotel_id: int) -> Dict:
-    """Get comprehensive statistics for a hotel"""
+# Default occupancy window for booking statistics, starting today
+OCCUPANCY_WINDOW_DAYS = 30
+
+def get_hotel_booking_statistics(db: Session, hotel_id: int, start_date=None, end_date=None) -> Dict:
+    """Booking counts by status, revenue and room-night occupancy over [start_date, end_date) in one query"""
     try:
-        # Total bookings
-        # SQL: SELECT COUNT(*) FROM hotel_bookings WHERE hotel_id = ?
-        total_bookings = db.query(models.HotelBooking).filter(models.HotelBooking.hotel_id == hotel_id).count()
-        
-        # Confirmed bookings
-        # SQL: SELECT COUNT(*) FROM hotel_bookings WHERE hotel_id = ? AND booking_status = 'confirmed'
-        confirmed_bookings = db.query(models.HotelBooking).filter(
-            models.HotelBooking.hotel_id == hotel_id,
-            models.HotelBooking.booking_status == 'confirmed'
-        ).count()
-        
-        # Pending bookings
-        # SQL: SELECT COUNT(*) FROM hotel_bookings WHERE hotel_id = ? AND booking_status = 'pending'
-        pending_bookings = db.query(models.HotelBooking).filter(
-            models.HotelBooking.hotel_id == hotel_id,
-            models.HotelBooking.booking_status == 'pending'
-        ).count()
-        
-        # Total revenue
-        # SQL: SELECT SUM(total_price) FROM hotel_bookings WHERE hotel_id = ? AND booking_status IN ('confirmed', 'checked_in', 'checked_out')
-        total_revenue = db.query(func.sum(models.HotelBooking.total_price)).filter(
-            models.HotelBooking.hotel_id == hotel_id,
-            models.HotelBooking.booking_status.in_(['confirmed', 'checked_in', 'checked_out'])
-        ).scalar() or 0
-        
-        # Average rating (if reviews exist)
-        # This would need to be implemented when hotel reviews are added
-        
+        start_date = start_date or date.today()
+        end_date = end_date or start_date + timedelta(days=OCCUPANCY_WINDOW_DAYS)
+        booking = models.HotelBooking
+        availability = models.RoomAvailability
+        
+        def status_count(*statuses):
+            return func.coalesce(func.sum(case((booking.booking_status.in_(statuses), 1), else_=0)), 0)
+        
+        bookings = select(
+            func.count(booking.booking_id).label("total_bookings"),
+            status_count('pending').label("pending_bookings"),
+            status_count('confirmed').label("confirmed_bookings"),
+            status_count('checked_in').label("checked_in_bookings"),
+            status_count('checked_out').label("checked_out_bookings"),
+            status_count('cancelled').label("cancelled_bookings"),
+            func.coalesce(func.sum(case(
+                (booking.booking_status.in_(['confirmed', 'checked_in', 'checked_out']), booking.total_price), else_=0
+            )), 0).label("total_revenue")
+        ).where(booking.hotel_id == hotel_id).subquery()
+        # Every booked or held room-night has been taken off available_rooms, so occupancy
+        # comes straight from the inventory calendar for the window
+        room_nights = select(
+            func.coalesce(func.sum(availability.total_rooms), 0).label("available_room_nights"),
+            func.coalesce(func.sum(availability.total_rooms - availability.available_rooms), 0).label("booked_room_nights")
+        ).where(
+            availability.hotel_id == hotel_id,
+            availability.date >= start_date,
+            availability.date < end_date
+        ).subquery()
+        # SQL: SELECT b.*, n.* FROM (SELECT COUNT(*), SUM(CASE WHEN booking_status = 'pending' THEN 1 ELSE 0 END), ..., SUM(CASE WHEN booking_status IN ('confirmed', 'checked_in', 'checked_out') THEN total_price ELSE 0 END) FROM hotel_bookings WHERE hotel_id = ?) b JOIN (SELECT SUM(total_rooms), SUM(total_rooms - available_rooms) FROM room_availability WHERE hotel_id = ? AND date >= ? AND date < ?) n ON TRUE
+        row = db.execute(select(bookings, room_nights).select_from(bookings.join(room_nights, true()))).one()
+        
+        available_room_nights = int(row.available_room_nights)
+        booked_room_nights = int(row.booked_room_nights)
         return {
-            "total_bookings": total_bookings,
-            "confirmed_bookings": confirmed_bookings,
-            "pending_bookings": pending_bookings,
-            "total_revenue": float(total_revenue),
-            "occupancy_rate": (confirmed_bookings / total_bookings * 100) if total_bookings > 0 else 0
+            "total_bookings": row.total_bookings,
+            "confirmed_bookings": int(row.confirmed_bookings),
+            "pending_bookings": int(row.pending_bookings),
+            "checked_in_bookings": int(row.checked_in_bookings),
+            "checked_out_bookings": int(row.checked_out_bookings),
+            "cancelled_bookings": int(row.cancelled_bookings),
+            "total_revenue": float(row.total_revenue),
+            "period_start": start_date.isoformat(),
+            "period_end": end_date.isoformat(),
+            "booked_room_nights": booked_room_nights,
+            "available_room_nights": available_room_nights,
+            # Percentage of the window's room-nights that are booked or held
+            "occupancy_rate": round(booked_room_nights / available_room_nights * 100, 2) if available_room_nights else 0
         }
     except Exception as e:
-        print(f"❌ Error getting hotel booking statistics: {e}")
+        logger.error("Error getting hotel booking statistics: %s", e)
         return {}
@@ -0,0 +1,129 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Tuple
+from . import models
+import os
+import threading
+import time
+
+# Shared aggregation for the admin statistics endpoints.
+# Role counts come from one GROUP BY and every other total from one
+# multi-subquery SELECT, so a full snapshot costs two round-trips.
+
+# Seconds a statistics snapshot is served before the background task recomputes it
+STATS_SNAPSHOT_INTERVAL = float(os.getenv("STATS_SNAPSHOT_INTERVAL", "30"))
+
+# User roles that have their own admin_statistics column
+ROLE_COLUMNS = {
+    "traveler": "travelers",
+    "guide": "guides",
+    "restaurant_owner": "restaurant_owners",
+    "hotel_owner": "hotel_owners",
+    "admin": "admins",
+}
+
+def get_role_counts(db: Session) -> dict:
+    """Total users and users per role"""
+    # SQL: SELECT role, COUNT(id) FROM users GROUP BY role
+    rows = db.query(models.User.role, func.count(models.User.id)).group_by(models.User.role).all()
+    counts = {"total_users": 0, **{column: 0 for column in ROLE_COLUMNS.values()}}
+    for role, count in rows:
+        counts["total_users"] += count
+        if role in ROLE_COLUMNS:
+            counts[ROLE_COLUMNS[role]] = count
+    return counts
+
+def get_content_totals(db: Session) -> dict:
+    """Destination, blog post and review totals plus the average destination rating"""
+    # SQL: SELECT (SELECT COUNT(*) FROM destinations), (SELECT COUNT(*) FROM blog_posts), (SELECT COALESCE(AVG(rating), 0) FROM destinations), (SELECT COUNT(*) FROM reviews)
+    row = db.execute(select(
+        select(func.count()).select_from(models.Destination).scalar_subquery().label("total_destinations"),
+        select(func.count()).select_from(models.BlogPost).scalar_subquery().label("total_blog_posts"),
+        select(func.coalesce(func.avg(models.Destination.rating), 0)).scalar_subquery().label("average_rating"),
+        select(func.count()).select_from(models.Review).scalar_subquery().label("total_reviews"),
+    )).one()
+    return {
+        "total_destinations": row.total_destinations,
+        "total_blog_posts": row.total_blog_posts,
+        "average_rating": float(row.average_rating),
+        "total_reviews": row.total_reviews,
+    }
+
+def compute_statistics(db: Session) -> dict:
+    """Full admin statistics snapshot, shaped like an admin_statistics row"""
+    return {
+        **get_role_counts(db),
+        **get_content_totals(db),
+        "last_updated": datetime.utcnow().isoformat()
+    }
+
+def count_rated_destinations(db: Session) -> int:
+    """Destinations with a rating, i.e. the ones AVG(rating) averages over"""
+    # SQL: SELECT COUNT(rating) FROM destinations
+    return db.execute(select(func.count(models.Destination.rating))).scalar()
+
+def store_statistics(db: Session, statistics: dict) -> models.AdminStatistics:
+    """Write a compute_statistics() result to the admin_statistics row, creating it if missing"""
+    # SQL: SELECT * FROM admin_statistics LIMIT 1
+    admin_stats = db.query(models.AdminStatistics).first()
+    if not admin_stats:
+        # SQL: INSERT INTO admin_statistics (default_values) VALUES (?)
+        admin_stats = models.AdminStatistics()
+        db.add(admin_stats)
+    # SQL: UPDATE admin_statistics SET total_users = ?, travelers = ?, guides = ?, restaurant_owners = ?, hotel_owners = ?, admins = ?, total_destinations = ?, total_blog_posts = ?, average_rating = ?, total_reviews = ? WHERE id = ?
+    for column, value in statistics.items():
+        if column != "last_updated":
+            setattr(admin_stats, column, value)
+    db.commit()
+    db.refresh(admin_stats)
+    return admin_stats
+
+class StatisticsSnapshot:
+    """Last computed statistics, served to every admin statistics endpoint.
+
+    A background task refreshes it every STATS_SNAPSHOT_INTERVAL seconds, or
+    sooner once a committed write marks it dirty, so admin reads never
+    aggregate or write on the request path.
+    """
+
+    def __init__(self, max_age: float = STATS_SNAPSHOT_INTERVAL):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._data = None
+        self._refreshed_at = 0.0
+        self._dirty = True
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def age(self) -> float:
+        """Seconds since the snapshot was computed"""
+        return time.monotonic() - self._refreshed_at if self._data is not None else 0.0
+
+    def needs_refresh(self) -> bool:
+        return self._dirty or self._data is None or self.age() >= self.max_age
+
+    def refresh(self, db: Session) -> dict:
+        """Recompute the snapshot now"""
+        with self._lock:
+            # Cleared first so writes committed while computing mark it dirty again
+            self._dirty = False
+            try:
+                data = compute_statistics(db)
+            except Exception:
+                self._dirty = True
+                raise
+            data["average_rating"] = round(data["average_rating"], 2)
+            self._data = data
+            self._refreshed_at = time.monotonic()
+            return dict(data)
+
+    def get(self, db: Session) -> Tuple[dict, float]:
+        """Snapshot and its age in seconds, computed on first use if the task has not run yet"""
+        data = self._data
+        if data is None:
+            return self.refresh(db), 0.0
+        return dict(data), self.age()
+
+statistics_snapshot = StatisticsSnapshot()
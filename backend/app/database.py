@@ -1,8 +1,14 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
+import logging
 import os
+import threading
+import time
 
 # Load environment variables
 load_dotenv()
@@ -10,15 +16,159 @@ load_dotenv()
 # Get database URL from environment or use default for XAMPP
 DATABASE_URL = os.getenv("DATABASE_URL", "mysql+mysqlconnector://root:@localhost:3306/travel_db")
 
+# Async drivers used for the async engine when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def _async_url(url: str):
+    """Swap the sync driver in a database URL for its async counterpart"""
+    database_url = make_url(url)
+    return database_url.set(drivername=ASYNC_DRIVERS.get(database_url.get_backend_name(), database_url.drivername))
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+# Read replica for SELECT-only catalog traffic; falls back to the primary when unset
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL") or DATABASE_URL
+ASYNC_READ_DATABASE_URL = os.getenv("ASYNC_READ_DATABASE_URL") or _async_url(READ_DATABASE_URL)
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Below MySQL wait_timeout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() in ("1", "true", "yes")
+
+# Worker threads for sync routes; no point running more than the pool can serve
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+class PoolMetrics:
+    """Running counters for connection checkouts and how long they waited"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            if seconds > self.max_wait:
+                self.max_wait = seconds
+
+    def record_timeout(self):
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "avg_checkout_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait * 1000, 3)
+            }
+
+pool_metrics = PoolMetrics()
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+# SQLAlchemy names pool loggers after the pool class's module, which puts this
+# one under the "app" logger; keep it as quiet as the stock sqlalchemy.pool logger
+logging.getLogger(f"{__name__}.{MeteredQueuePool.__name__}").setLevel(logging.WARNING)
+
+def _engine_options(url, poolclass=None) -> dict:
+    """Pool options for the given database URL"""
+    database_url = make_url(url)
+    if database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection, so there is no pool to tune
+        return {}
+    options = {"poolclass": poolclass} if poolclass else {}
+    return {
+        **options,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL, poolclass=MeteredQueuePool))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for routes that run on the event loop instead of the threadpool
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, poolclass=AsyncAdaptedQueuePool))
+
+# Objects stay readable after commit since async sessions cannot lazy-refresh them
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+class ReadOnlySession(Session):
+    """Session bound to the replica; refuses to flush writes"""
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Read-only session cannot write; use get_db for writes")
+        super().flush(objects)
+
+# Replica engines, sharing the primary ones when no replica is configured
+if READ_DATABASE_URL == DATABASE_URL:
+    read_engine = engine
+else:
+    read_engine = create_engine(READ_DATABASE_URL, **_engine_options(READ_DATABASE_URL, poolclass=QueuePool))
+
+if ASYNC_READ_DATABASE_URL == ASYNC_DATABASE_URL:
+    async_read_engine = async_engine
+else:
+    async_read_engine = create_async_engine(ASYNC_READ_DATABASE_URL, **_engine_options(ASYNC_READ_DATABASE_URL, poolclass=AsyncAdaptedQueuePool))
+
+ReadSessionLocal = sessionmaker(class_=ReadOnlySession, autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, class_=AsyncSession, sync_session_class=ReadOnlySession, autoflush=False, expire_on_commit=False)
+
 # Create Base class for models
 Base = declarative_base()
 
+def _pool_counts(pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+def get_pool_status() -> dict:
+    """Snapshot of the engine's connection pool for the /health/db endpoint"""
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "threadpool_size": DB_THREADPOOL_SIZE,
+    }
+    status.update(_pool_counts(pool))
+    status.update(pool_metrics.to_dict())
+    if read_engine is not engine:
+        status["replica"] = _pool_counts(read_engine.pool)
+    return status
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
@@ -26,3 +176,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency to get a read-only session on the replica.
+# Only for SELECT-only routes; anything that writes, or must see its own
+# writes (bookings, signups), stays on get_db.
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency to get an async read-only session on the replica
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
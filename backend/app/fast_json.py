@@ -0,0 +1,44 @@
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import TypeAdapter
+from typing import List
+from decimal import Decimal
+from . import schemas
+import orjson
+
+# Fast JSON path for list endpoints.
+# FastAPI's default path validates to_dict() output against response_model,
+# dumps it back to Python, walks it with jsonable_encoder and encodes with
+# the stdlib json module. Here each list goes through one precompiled
+# TypeAdapter (validate + dump straight to bytes in pydantic-core), or
+# straight to orjson when there is no response model to enforce.
+
+def _default(value):
+    """orjson fallback for types it does not encode natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class DefaultORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes Decimal values"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class ModelListSerializer:
+    """Precompiled serializer for List[model], matching what response_model would emit"""
+
+    def __init__(self, model):
+        self.adapter = TypeAdapter(List[model])
+
+    def dump(self, rows) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(rows, from_attributes=True))
+
+    def response(self, rows) -> Response:
+        return Response(content=self.dump(rows), media_type="application/json")
+
+def json_response(content) -> Response:
+    """Encode already-serialized content (e.g. to_dict() output) with orjson, skipping jsonable_encoder"""
+    return DefaultORJSONResponse(content)
+
+RESTAURANT_LIST = ModelListSerializer(schemas.Restaurant)
+HOTEL_LIST = ModelListSerializer(schemas.Hotel)
@@ -0,0 +1,300 @@
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from starlette.routing import compile_path
+from typing import Optional
+from . import models
+from .database import SessionLocal
+from .ttl_cache import TTLCache
+import anyio
+import anyio.to_thread
+import hashlib
+import logging
+import orjson
+import os
+import threading
+import time
+
+# Idempotency keys for write routes.
+# A POST to one of IDEMPOTENT_ROUTES with an "Idempotency-Key" header runs
+# once; retries with the same key (from the same caller) get the stored
+# response back, marked "Idempotent-Replayed: true", without reaching the
+# route. A retry that arrives while the first request is still running gets
+# 409, and a key reused for a different request gets 422. Only 2xx responses
+# are stored: a failed request changed nothing and may simply be retried.
+#
+# Keys live in an in-process LRU. With several worker processes set
+# IDEMPOTENCY_DB_STORE so that the idempotency_keys table decides which
+# worker runs a request.
+
+load_dotenv()
+
+IDEMPOTENCY_KEY_TTL = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_DB_STORE = os.getenv("IDEMPOTENCY_DB_STORE", "False").lower() in ("1", "true", "yes")
+
+# A key still claimed after this long belongs to a request that died with its worker (seconds)
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+# How often expired rows are deleted from idempotency_keys (seconds)
+IDEMPOTENCY_PURGE_INTERVAL = 600
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+IDEMPOTENT_ROUTES = (
+    ("POST", "/hotels/{hotel_id}/book"),
+    ("POST", "/bookings/{booking_id}/requests"),
+    ("POST", "/destinations/{destination_id}/reviews"),
+)
+
+logger = logging.getLogger(__name__)
+
+class StoredResponse:
+    """A claimed key: the request it belongs to and, once finished, its response"""
+
+    __slots__ = ("request_hash", "status_code", "content_type", "body")
+
+    def __init__(self, request_hash: str, status_code: Optional[int] = None, content_type: Optional[str] = None, body: bytes = b""):
+        self.request_hash = request_hash
+        # None while the first request is still running
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = body
+
+class IdempotencyStore:
+    """In-process TTL + LRU store of idempotency keys"""
+
+    uses_database = False
+
+    def __init__(self, ttl: float = IDEMPOTENCY_KEY_TTL, max_size: int = IDEMPOTENCY_CACHE_SIZE):
+        self.ttl = ttl
+        # Serializes claims so two requests cannot both find a key missing and claim it
+        self._lock = threading.Lock()
+        self._entries = TTLCache(ttl, max_size)
+
+    def begin(self, key: str, request_hash: str) -> Optional[StoredResponse]:
+        """Claim key for a new request (None) or return what is already stored under it"""
+        with self._lock:
+            stored = self._entries.get(key)
+            if stored is None:
+                self._entries.put(key, StoredResponse(request_hash), IDEMPOTENCY_LOCK_TIMEOUT)
+            return stored
+
+    def complete(self, key: str, stored: StoredResponse):
+        with self._lock:
+            self._entries.put(key, stored)
+
+    def release(self, key: str):
+        """Give up a claim so the request can be retried"""
+        with self._lock:
+            stored = self._entries.get(key)
+            if stored is not None and stored.status_code is None:
+                self._entries.pop(key)
+
+    def clear(self):
+        self._entries.clear()
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Keys claimed in the idempotency_keys table, with finished responses also kept in the in-process LRU"""
+
+    uses_database = True
+
+    def __init__(self, ttl: float = IDEMPOTENCY_KEY_TTL, max_size: int = IDEMPOTENCY_CACHE_SIZE):
+        super().__init__(ttl, max_size)
+        self._last_purge = time.monotonic()
+
+    def begin(self, key: str, request_hash: str) -> Optional[StoredResponse]:
+        stored = self._entries.get(key)
+        if stored is not None:
+            return stored
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            # The primary key makes the INSERT the claim: exactly one worker succeeds
+            # SQL: INSERT INTO idempotency_keys (key_hash, request_hash, expires_at) VALUES (?, ?, ?)
+            db.add(models.IdempotencyKey(key_hash=key, request_hash=request_hash, expires_at=now + timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT)))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+
+            # SQL: SELECT * FROM idempotency_keys WHERE key_hash = ?
+            row = db.get(models.IdempotencyKey, key)
+            if row is None:
+                # Deleted between the INSERT and the SELECT; let the client retry
+                return StoredResponse(request_hash)
+            if row.expires_at > now:
+                stored = StoredResponse(row.request_hash, row.status_code, row.content_type, row.response_body or b"")
+                if stored.status_code is not None:
+                    super().complete(key, stored)
+                return stored
+
+            # Expired or abandoned: take it over unless another worker just did
+            # SQL: UPDATE idempotency_keys SET request_hash = ?, status_code = NULL, content_type = NULL, response_body = NULL, expires_at = ? WHERE key_hash = ? AND expires_at = ?
+            result = db.execute(
+                update(models.IdempotencyKey)
+                .where(models.IdempotencyKey.key_hash == key, models.IdempotencyKey.expires_at == row.expires_at)
+                .values(request_hash=request_hash, status_code=None, content_type=None, response_body=None,
+                        expires_at=now + timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return None if result.rowcount == 1 else StoredResponse(request_hash)
+        finally:
+            db.close()
+
+    def complete(self, key: str, stored: StoredResponse):
+        db = SessionLocal()
+        try:
+            # SQL: UPDATE idempotency_keys SET status_code = ?, content_type = ?, response_body = ?, expires_at = ? WHERE key_hash = ? AND request_hash = ?
+            db.execute(
+                update(models.IdempotencyKey)
+                .where(models.IdempotencyKey.key_hash == key, models.IdempotencyKey.request_hash == stored.request_hash)
+                .values(status_code=stored.status_code, content_type=stored.content_type, response_body=stored.body,
+                        expires_at=datetime.utcnow() + timedelta(seconds=self.ttl))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            self._purge_expired(db)
+        finally:
+            db.close()
+        super().complete(key, stored)
+
+    def release(self, key: str):
+        db = SessionLocal()
+        try:
+            # SQL: DELETE FROM idempotency_keys WHERE key_hash = ? AND status_code IS NULL
+            db.execute(
+                delete(models.IdempotencyKey)
+                .where(models.IdempotencyKey.key_hash == key, models.IdempotencyKey.status_code.is_(None))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _purge_expired(self, db):
+        if time.monotonic() - self._last_purge < IDEMPOTENCY_PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        # SQL: DELETE FROM idempotency_keys WHERE expires_at < ?
+        result = db.execute(
+            delete(models.IdempotencyKey)
+            .where(models.IdempotencyKey.expires_at < datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        logger.debug("Purged %d expired idempotency keys", result.rowcount)
+
+idempotency_store = DatabaseIdempotencyStore() if IDEMPOTENCY_DB_STORE else IdempotencyStore()
+
+def _header(scope, name: bytes) -> Optional[str]:
+    return next((value.decode("latin-1") for header, value in scope["headers"] if header == name), None)
+
+def _digest(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+async def _send_json(send, status_code: int, detail: str, headers=()):
+    body = orjson.dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware running each (caller, Idempotency-Key) at most once on the configured routes"""
+
+    def __init__(self, app, store: Optional[IdempotencyStore] = None, routes=IDEMPOTENT_ROUTES):
+        self.app = app
+        self.store = store or idempotency_store
+        self.routes = [(method, compile_path(path)[0]) for method, path in routes]
+
+    def _applies(self, scope) -> bool:
+        return any(scope["method"] == method and pattern.match(scope["path"]) for method, pattern in self.routes)
+
+    async def _call_store(self, method, *args):
+        if self.store.uses_database:
+            return await anyio.to_thread.run_sync(method, *args)
+        return method(*args)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = _header(scope, b"idempotency-key")
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters")
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        # Keys are scoped to the caller's credentials so clients cannot collide
+        key = _digest(_header(scope, b"authorization") or "", idempotency_key)
+        request_hash = _digest(scope["method"], scope["path"], scope.get("query_string", b""), body)
+        stored = await self._call_store(self.store.begin, key, request_hash)
+        if stored is not None:
+            if stored.status_code is None:
+                await _send_json(send, 409, "A request with this Idempotency-Key is still in progress", [(b"retry-after", b"1")])
+            elif stored.request_hash != request_hash:
+                await _send_json(send, 422, "Idempotency-Key was already used for a different request")
+            else:
+                logger.info("Replayed %s %s for an idempotency key", scope["method"], scope["path"])
+                await send({
+                    "type": "http.response.start",
+                    "status": stored.status_code,
+                    "headers": [
+                        (b"content-type", (stored.content_type or "application/json").encode("latin-1")),
+                        (b"content-length", str(len(stored.body)).encode()),
+                        (b"idempotent-replayed", b"true"),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        body_received = False
+        async def replay_body():
+            nonlocal body_received
+            if body_received:
+                return await receive()
+            body_received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        response = StoredResponse(request_hash)
+        response_body = []
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response.status_code = message["status"]
+                response.content_type = next((value.decode("latin-1") for name, value in message.get("headers", []) if name == b"content-type"), None)
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            # Release even when the request was cancelled (client disconnect)
+            with anyio.CancelScope(shield=True):
+                await self._call_store(self.store.release, key)
+            raise
+        if response.status_code is not None and 200 <= response.status_code < 300:
+            response.body = b"".join(response_body)
+            await self._call_store(self.store.complete, key, response)
+        else:
+            await self._call_store(self.store.release, key)
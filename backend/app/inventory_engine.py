@@ -0,0 +1,343 @@
+from array import array
+from datetime import date, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from . import models
+from .database import SessionLocal
+import anyio.to_thread
+import asyncio
+import logging
+import numpy as np
+import os
+import threading
+import time
+
+# In-memory room inventory.
+# For every hotel room type the engine keeps one row of a 2-D NumPy array per
+# quantity (available rooms, total rooms, nightly price), indexed by day
+# offset from the day it was loaded. A destination search is one slice
+# reduction over all of the destination's rows at once. Quotes and per-hotel
+# availability need base prices and whole availability rows, so they stay on
+# SQL (quotes are cached in quotes.py).
+#
+# room_availability stays the source of truth: bookings still reserve nights
+# in the database. The engine is loaded in the background at startup and then
+# follows committed writes from the booking, cancellation and inventory paths.
+# Other ORM edits to inventory, room types or hotels mark it stale and trigger
+# a reload, and it is fully reloaded every INVENTORY_RELOAD_INTERVAL to pick
+# up writes made by other processes. Until it is loaded, and for dates beyond
+# its horizon, callers fall back to SQL.
+
+load_dotenv()
+
+INVENTORY_ENGINE_ENABLED = os.getenv("INVENTORY_ENGINE_ENABLED", "True").lower() in ("1", "true", "yes")
+INVENTORY_ENGINE_DAYS = int(os.getenv("INVENTORY_ENGINE_DAYS", "365"))
+INVENTORY_RELOAD_INTERVAL = float(os.getenv("INVENTORY_RELOAD_INTERVAL", "300"))
+
+# How often the background loop checks whether a reload is due (seconds)
+INVENTORY_JOB_TICK = 1.0
+# Rows fetched per round trip while loading
+INVENTORY_LOAD_BATCH = 10000
+
+logger = logging.getLogger(__name__)
+
+# available_rooms on a night with no room_availability row; never bookable
+NO_INVENTORY = -1
+
+class InventoryCalendar:
+    """One loaded snapshot: per-(hotel_id, room_type) rows of day-indexed arrays"""
+
+    def __init__(self, origin: date, days: int, keys: List[Tuple[int, str]]):
+        self.origin = origin
+        self.days = days
+        # Rows are in (hotel_id, room_type) order so row order breaks price ties like the SQL search
+        self.keys = keys
+        self.rows: Dict[Tuple[int, str], int] = {key: row for row, key in enumerate(keys)}
+        self.available = np.full((len(keys), days), NO_INVENTORY, dtype=np.int32)
+        self.total = np.zeros((len(keys), days), dtype=np.int32)
+        self.prices = np.zeros((len(keys), days), dtype=np.float64)
+        self.max_guests = np.zeros(len(keys), dtype=np.int32)
+        self.searchable = np.zeros(len(keys), dtype=bool)
+        # destinations.destination_id -> rows of that destination's room types
+        self.destination_rows: Dict[str, np.ndarray] = {}
+
+    def window(self, check_in: date, check_out: date) -> Optional[slice]:
+        """Day offsets of the nights in [check_in, check_out), or None outside the horizon"""
+        start = (check_in - self.origin).days
+        end = (check_out - self.origin).days
+        if start < 0 or end > self.days or start >= end:
+            return None
+        return slice(start, end)
+
+class InventoryEngine:
+    """Vectorized availability and price lookups over an in-memory copy of room_availability"""
+
+    def __init__(self, days: int = INVENTORY_ENGINE_DAYS):
+        self.days = days
+        self.calendar: Optional[InventoryCalendar] = None
+        # Monotonic time of the last load attempt; a failed load is retried after INVENTORY_RELOAD_INTERVAL
+        self.loaded_at = float("-inf")
+        self._lock = threading.Lock()
+        self._stale = False
+        self._loading = False
+
+    @property
+    def ready(self) -> bool:
+        return INVENTORY_ENGINE_ENABLED and self.calendar is not None
+
+    def mark_stale(self):
+        self._stale = True
+
+    def needs_reload(self) -> bool:
+        if not INVENTORY_ENGINE_ENABLED:
+            return False
+        return self._stale or time.monotonic() - self.loaded_at >= INVENTORY_RELOAD_INTERVAL
+
+    def load(self, db: Session):
+        """Build a fresh calendar from the database and swap it in"""
+        origin = date.today()
+        horizon = origin + timedelta(days=self.days)
+        with self._lock:
+            self._stale = False
+            self._loading = True
+        self.loaded_at = time.monotonic()
+        try:
+            # SQL: SELECT hotel_room_types.hotel_id, room_type_name, max_guests, hotel_room_types.is_active, hotels.is_active, destinations.destination_id FROM hotel_room_types JOIN hotels ON hotels.id = hotel_room_types.hotel_id JOIN destinations ON destinations.id = hotels.destination_id
+            room_types = db.execute(
+                select(
+                    models.HotelRoomType.hotel_id,
+                    models.HotelRoomType.room_type_name,
+                    models.HotelRoomType.max_guests,
+                    models.HotelRoomType.is_active,
+                    models.Hotel.is_active.label("hotel_is_active"),
+                    models.Destination.destination_id
+                )
+                .join(models.Hotel, models.Hotel.id == models.HotelRoomType.hotel_id)
+                .join(models.Destination, models.Destination.id == models.Hotel.destination_id)
+            ).all()
+
+            # Columnar buffers keep a year of nights for every hotel compact while loading;
+            # each night stores the id of its (hotel_id, room_type) in order of first appearance
+            seen: Dict[Tuple[int, str], int] = {}
+            key_ids, offsets = array("i"), array("i")
+            available, total, prices = array("i"), array("i"), array("d")
+            # SQL: SELECT hotel_id, room_type, date, available_rooms, total_rooms, price_per_night FROM room_availability WHERE date >= ? AND date < ?
+            result = db.execute(
+                select(
+                    models.RoomAvailability.hotel_id,
+                    models.RoomAvailability.room_type,
+                    models.RoomAvailability.date,
+                    models.RoomAvailability.available_rooms,
+                    models.RoomAvailability.total_rooms,
+                    models.RoomAvailability.price_per_night
+                )
+                .filter(models.RoomAvailability.date >= origin, models.RoomAvailability.date < horizon)
+                .execution_options(yield_per=INVENTORY_LOAD_BATCH)
+            )
+            for hotel_id, room_type, night, available_rooms, total_rooms, price in result:
+                key_ids.append(seen.setdefault((hotel_id, room_type), len(seen)))
+                offsets.append((night - origin).days)
+                available.append(available_rooms or 0)
+                total.append(total_rooms or 0)
+                prices.append(float(price))
+
+            keys = sorted(set(seen) | {(row.hotel_id, row.room_type_name) for row in room_types})
+            calendar = InventoryCalendar(origin, self.days, keys)
+            if key_ids:
+                # Translate first-appearance ids to calendar rows
+                id_to_row = np.fromiter((calendar.rows[key] for key in seen), dtype=np.intp, count=len(seen))
+                row_index = id_to_row[np.frombuffer(key_ids, dtype=np.int32)]
+                day_index = np.frombuffer(offsets, dtype=np.int32)
+                calendar.available[row_index, day_index] = np.frombuffer(available, dtype=np.int32)
+                calendar.total[row_index, day_index] = np.frombuffer(total, dtype=np.int32)
+                calendar.prices[row_index, day_index] = np.frombuffer(prices, dtype=np.float64)
+
+            by_destination: Dict[str, List[int]] = {}
+            for row in room_types:
+                index = calendar.rows[(row.hotel_id, row.room_type_name)]
+                calendar.max_guests[index] = row.max_guests or 0
+                calendar.searchable[index] = bool(row.is_active) and bool(row.hotel_is_active)
+                by_destination.setdefault(row.destination_id, []).append(index)
+            calendar.destination_rows = {
+                destination_id: np.array(sorted(indexes), dtype=np.intp) for destination_id, indexes in by_destination.items()
+            }
+        finally:
+            with self._lock:
+                self._loading = False
+
+        with self._lock:
+            self.calendar = calendar
+        logger.info("Inventory engine loaded %d nights for %d room types from %s", len(key_ids), len(keys), origin.isoformat())
+
+    def _slice(self, hotel_id: int, room_type: str, check_in: date, check_out: date):
+        """(calendar, row, window) for a stay, or None when the engine cannot answer"""
+        calendar = self.calendar
+        if not INVENTORY_ENGINE_ENABLED or calendar is None:
+            return None
+        row = calendar.rows.get((hotel_id, room_type))
+        window = calendar.window(check_in, check_out)
+        if row is None or window is None:
+            return None
+        return calendar, row, window
+
+    def search(self, destination_id: str, check_in: date, check_out: date, guests: int = 1,
+               sort: str = "price_asc", skip: int = 0, limit: int = 20) -> Optional[List[Dict]]:
+        """Room types of a destination with a free room on every night, ordered by total price.
+
+        Same matches and order as async_crud.search_destination_availability,
+        without the hotel details. None when the engine cannot answer.
+        """
+        calendar = self.calendar
+        if not INVENTORY_ENGINE_ENABLED or calendar is None:
+            return None
+        window = calendar.window(check_in, check_out)
+        rows = calendar.destination_rows.get(destination_id)
+        if window is None or rows is None:
+            return None
+        with self._lock:
+            rows = rows[calendar.searchable[rows] & (calendar.max_guests[rows] >= guests)]
+            rooms_available = calendar.available[rows, window].min(axis=1)
+            bookable = rooms_available > 0
+            rows, rooms_available = rows[bookable], rooms_available[bookable]
+            prices = calendar.prices[rows, window]
+            totals = prices.sum(axis=1).round(2)
+            min_prices = prices.min(axis=1)
+        # lexsort orders by the last key first; row order breaks ties by (hotel_id, room_type)
+        order = np.lexsort((rows, -totals if sort == "price_desc" else totals))[skip:skip + limit]
+        keys = calendar.keys
+        return [
+            {
+                "hotel_id": keys[rows[i]][0],
+                "room_type": keys[rows[i]][1],
+                "max_guests": int(calendar.max_guests[rows[i]]),
+                "nights": window.stop - window.start,
+                "rooms_available": int(rooms_available[i]),
+                "min_price_per_night": float(min_prices[i]),
+                "total_price": float(totals[i])
+            }
+            for i in order
+        ]
+
+    def reserve(self, hotel_id: int, room_type: str, check_in: date, check_out: date, rooms: int = 1):
+        """Mirror reservations.reserve_nights after its transaction commits"""
+        found = self._slice(hotel_id, room_type, check_in, check_out)
+        if found is None:
+            self._missed(hotel_id, room_type, check_in, check_out)
+            return
+        calendar, row, window = found
+        with self._lock:
+            nights = calendar.available[row, window]
+            nights[nights >= rooms] -= rooms
+
+    def release(self, hotel_id: int, room_type: str, check_in: date, check_out: date, rooms: int = 1):
+        """Mirror reservations.release_nights after its transaction commits"""
+        found = self._slice(hotel_id, room_type, check_in, check_out)
+        if found is None:
+            self._missed(hotel_id, room_type, check_in, check_out)
+            return
+        calendar, row, window = found
+        with self._lock:
+            nights = calendar.available[row, window]
+            restorable = (nights != NO_INVENTORY) & (nights + rooms <= calendar.total[row, window])
+            nights[restorable] += rooms
+
+    def upsert_nights(self, hotel_id: int, rows: List[dict]):
+        """Mirror crud.bulk_upsert_room_availability after its transaction commits"""
+        calendar = self.calendar
+        if not INVENTORY_ENGINE_ENABLED or calendar is None:
+            return
+        by_room_type: Dict[str, List[dict]] = {}
+        for night in rows:
+            by_room_type.setdefault(night["room_type"], []).append(night)
+        for room_type, nights in by_room_type.items():
+            row = calendar.rows.get((hotel_id, room_type))
+            if row is None:
+                # A new room type needs a row and its metadata; reload picks up both
+                self.mark_stale()
+                continue
+            offsets = np.array([(night["date"] - calendar.origin).days for night in nights], dtype=np.intp)
+            in_horizon = (offsets >= 0) & (offsets < calendar.days)
+            offsets = offsets[in_horizon]
+            new_total = np.array([night["total_rooms"] for night in nights], dtype=np.int32)[in_horizon]
+            new_prices = np.array([float(night["price_per_night"]) for night in nights], dtype=np.float64)[in_horizon]
+            with self._lock:
+                current = calendar.available[row, offsets]
+                # Same rule as the SQL upsert: existing nights keep their booked rooms
+                calendar.available[row, offsets] = np.where(
+                    current == NO_INVENTORY, new_total, np.maximum(current + new_total - calendar.total[row, offsets], 0)
+                )
+                calendar.total[row, offsets] = new_total
+                calendar.prices[row, offsets] = new_prices
+
+    def _missed(self, hotel_id: int, room_type: str, check_in: date, check_out: date):
+        """A committed change the calendar has no row or days for"""
+        calendar = self.calendar
+        if calendar is not None and (hotel_id, room_type) not in calendar.rows and calendar.window(check_in, check_out) is not None:
+            self.mark_stale()
+
+    def apply(self, operations: List[tuple]):
+        with self._lock:
+            # Changes committed while a reload is reading may or may not be in
+            # its snapshot; reload again rather than guess
+            if self._loading:
+                self._stale = True
+        for method, args in operations:
+            try:
+                getattr(self, method)(*args)
+            except Exception:
+                logger.exception("Failed to apply inventory change %s%r", method, args)
+                self.mark_stale()
+
+inventory_engine = InventoryEngine()
+
+def stage(db: Session, method: str, *args):
+    """Queue an engine update on db; it is applied if and when the transaction commits"""
+    if INVENTORY_ENGINE_ENABLED:
+        db.info.setdefault("inventory_operations", []).append((method, args))
+
+@event.listens_for(Session, "after_flush")
+def _detect_inventory_edits(session, flush_context):
+    # ORM edits to inventory rows or to what the search filters on are not
+    # mirrored field by field; they make the engine reload instead
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (models.RoomAvailability, models.HotelRoomType)):
+            session.info["inventory_stale"] = True
+            return
+        if isinstance(obj, models.Hotel):
+            state = inspect(obj)
+            if obj in session.new or obj in session.deleted or any(
+                state.attrs[name].history.has_changes() for name in ("is_active", "destination_id")
+            ):
+                session.info["inventory_stale"] = True
+                return
+
+@event.listens_for(Session, "after_commit")
+def _apply_inventory_operations(session):
+    operations = session.info.pop("inventory_operations", None)
+    if operations:
+        inventory_engine.apply(operations)
+    if session.info.pop("inventory_stale", False):
+        inventory_engine.mark_stale()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_inventory_operations(session):
+    session.info.pop("inventory_operations", None)
+    session.info.pop("inventory_stale", None)
+
+def reload_inventory():
+    db = SessionLocal()
+    try:
+        inventory_engine.load(db)
+    except Exception as e:
+        logger.warning("Failed to load inventory engine: %s", e)
+    finally:
+        db.close()
+
+async def run_inventory_jobs():
+    """Background loop: load the engine at startup and reload it when stale or due"""
+    while True:
+        if inventory_engine.needs_reload():
+            await anyio.to_thread.run_sync(reload_inventory)
+        await asyncio.sleep(INVENTORY_JOB_TICK)
@@ -0,0 +1,88 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import Session, selectinload
+from typing import Callable, Dict, List
+from . import models
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Eager-loading plans for to_dict() serialization.
+# Each plan loads every relationship the model's to_dict() touches, so a
+# listing costs one query per relationship instead of one per row.
+# Pass them to .options(*PLAN) in list queries.
+
+RESTAURANT_PLAN = (selectinload(models.Restaurant.destination),)
+HOTEL_PLAN = (selectinload(models.Hotel.destination),)
+REVIEW_PLAN = (selectinload(models.Review.user),)
+GUIDE_REVIEW_PLAN = (selectinload(models.GuideReview.traveler),)
+# Guide.reviews is a dynamic relationship and cannot be eager-loaded;
+# serialize_guides() batch-loads it separately
+GUIDE_PLAN = (selectinload(models.Guide.user), selectinload(models.Guide.destination))
+GUIDE_SUMMARY_PLAN = (selectinload(models.Guide.user),)
+
+# Raise on any query issued while serializing (enable in tests and development)
+LAZY_LOAD_GUARD = os.getenv("LAZY_LOAD_GUARD", "False").lower() in ("1", "true", "yes")
+
+class LazyLoadError(RuntimeError):
+    """A relationship was loaded during serialization instead of by the query's loading plan"""
+    pass
+
+@contextmanager
+def serialization_guard(db: Session):
+    """Within this block, any query on db raises LazyLoadError when LAZY_LOAD_GUARD is on"""
+    if not LAZY_LOAD_GUARD:
+        yield
+        return
+    db.info["serializing"] = True
+    try:
+        yield
+    finally:
+        db.info.pop("serializing", None)
+
+@event.listens_for(Session, "do_orm_execute")
+def _reject_queries_while_serializing(orm_execute_state):
+    if orm_execute_state.session.info.get("serializing"):
+        raise LazyLoadError(f"Query issued during serialization: {orm_execute_state.statement}")
+
+def serialize(db: Session, rows) -> List[dict]:
+    """to_dict() every row under the lazy-load guard"""
+    with serialization_guard(db):
+        return [row.to_dict() for row in rows]
+
+def serialize_rows(db: Session, rows, to_dict: Callable, fallback: Callable) -> List[dict]:
+    """to_dict(row) for every row under the lazy-load guard; a row whose to_dict fails is logged and replaced by fallback(row).
+
+    LazyLoadError is not caught: a missing loading plan fails the request.
+    """
+    serialized = []
+    with serialization_guard(db):
+        for row in rows:
+            try:
+                serialized.append(to_dict(row))
+            except LazyLoadError:
+                raise
+            except Exception as e:
+                logger.warning("Error serializing %s %s: %s", type(row).__name__, row.id, e)
+                serialized.append(fallback(row))
+    return serialized
+
+def load_guide_reviews(db: Session, guides) -> Dict[int, List[models.GuideReview]]:
+    """Reviews (with travelers) for all guides in one query, keyed by guide id"""
+    reviews_by_guide = defaultdict(list)
+    guide_ids = [guide.id for guide in guides]
+    if not guide_ids:
+        return reviews_by_guide
+    # SQL: SELECT * FROM guide_reviews WHERE guide_id IN (...); SELECT * FROM users WHERE id IN (...)
+    reviews = db.query(models.GuideReview).options(*GUIDE_REVIEW_PLAN).filter(models.GuideReview.guide_id.in_(guide_ids)).all()
+    for review in reviews:
+        reviews_by_guide[review.guide_id].append(review)
+    return reviews_by_guide
+
+def serialize_guides(db: Session, guides) -> List[dict]:
+    """to_dict() guides loaded with GUIDE_PLAN, batch-loading their reviews"""
+    reviews_by_guide = load_guide_reviews(db, guides)
+    with serialization_guard(db):
+        return [guide.to_dict(reviews=reviews_by_guide[guide.id]) for guide in guides]
@@ -0,0 +1,85 @@
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+
+# Load environment variables
+load_dotenv()
+
+# Logging settings
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE")  # JSON lines are written here when set, otherwise to stdout
+
+# Attributes every LogRecord has; anything else was passed via extra= and is kept
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, message, extra fields and exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class RecordQueueHandler(QueueHandler):
+    """QueueHandler that leaves JSON formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render the traceback now, while they are still valid,
+        # but keep them as separate fields instead of one preformatted string
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_queue = queue.SimpleQueue()
+_listener = None
+
+def setup_logging() -> QueueListener:
+    """Route the app's loggers through a queue to a JSON-lines sink on a background thread.
+
+    Request threads only enqueue records; formatting and I/O happen on the
+    listener thread. Records below LOG_LEVEL are dropped before formatting.
+    Safe to call again after shutdown_logging().
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    app_logger = logging.getLogger("app")
+    if not any(isinstance(handler, RecordQueueHandler) for handler in app_logger.handlers):
+        app_logger.setLevel(LOG_LEVEL)
+        app_logger.addHandler(RecordQueueHandler(_queue))
+        app_logger.propagate = False
+
+    sink = logging.FileHandler(LOG_FILE, encoding="utf-8") if LOG_FILE else logging.StreamHandler(sys.stdout)
+    sink.setFormatter(JsonLinesFormatter())
+    _listener = QueueListener(_queue, sink, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,24 +1,92 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from . import crud, models, schemas
-from .database import engine, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, async_crud, models, schemas, password_hashing, dashboard_stats, loading, fast_json, reservations, quotes, booking_holds
+from .schema_registry import schema_registry
+from .principal_cache import Principal, principal_cache
+from .stats_aggregator import run_statistics_jobs, flush_pending_statistics
+from .dashboard_stats import statistics_snapshot
+from .database import engine, async_engine, read_engine, async_read_engine, SessionLocal, get_db, get_read_db, get_async_read_db, get_pool_status, DB_THREADPOOL_SIZE
+from .logging_config import setup_logging, shutdown_logging
+from .metrics import MetricsMiddleware, metrics, instrument_engine
+from .slow_queries import slow_query_recorder
+from .profiling import ProfilingMiddleware
+from .idempotency import IdempotencyMiddleware
+from .inventory_engine import inventory_engine, run_inventory_jobs
 from typing import List, Optional
+from contextlib import asynccontextmanager
+import anyio.to_thread
+import asyncio
 import json
 import jwt
-from datetime import datetime, timedelta, timezone
+import logging
+from datetime import date, datetime, timedelta, timezone
 import os
 
+# Structured JSON-lines logging through a background queue listener
+setup_logging()
+logger = logging.getLogger(__name__)
+
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    setup_logging()
+    # Sync routes run on AnyIO's worker threads; size them to the DB pool so
+    # requests wait on a thread rather than on a pool checkout
+    anyio.to_thread.current_default_thread_limiter().total_tokens = DB_THREADPOOL_SIZE
+    # Probe the schema once up front instead of on every request
+    schema_registry.get(engine)
+    # Apply admin statistics deltas in the background instead of recounting per write
+    statistics_jobs = asyncio.create_task(run_statistics_jobs())
+    # Load the in-memory inventory in the background; searches use SQL until it is ready
+    inventory_jobs = asyncio.create_task(run_inventory_jobs())
+    # Return the rooms of pending bookings whose hold has expired
+    hold_sweeper = asyncio.create_task(booking_holds.run_hold_sweeper())
+    yield
+    for job in (statistics_jobs, inventory_jobs, hold_sweeper):
+        job.cancel()
+        try:
+            await job
+        except asyncio.CancelledError:
+            pass
+    await anyio.to_thread.run_sync(flush_pending_statistics)
+    password_hashing.shutdown()
+    slow_query_recorder.shutdown()
+    engine.dispose()
+    await async_engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+    shutdown_logging()
+
 app = FastAPI(
     title="Travel Backend API",
     description="A FastAPI backend for travel application with role-based authentication",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=fast_json.DefaultORJSONResponse
 )
 
+# Login/signup bursts that overflow the hashing pool get 503 instead of queueing
+@app.exception_handler(password_hashing.PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: password_hashing.PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service is busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+# Idempotency-Key support for booking, guest request and review creation.
+# Added before CORS so replayed responses still get CORS headers.
+app.add_middleware(IdempotencyMiddleware)
+
 # Add CORS middleware to allow frontend connections
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +96,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def authorize_profiling(authorization: str) -> bool:
+    """Whether an Authorization header belongs to an admin (same check as get_current_user + role)"""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    db = SessionLocal()
+    try:
+        token_data = verify_token(HTTPAuthorizationCredentials(scheme=scheme, credentials=token))
+        current_user = get_current_user(token_data, db)
+    except Exception:
+        return False
+    finally:
+        db.close()
+    return current_user.role == "admin"
+
+# ?__profile=1 / X-Profile: 1 from an admin returns a sampled profile (off unless PROFILING_ENABLED)
+app.add_middleware(ProfilingMiddleware, authorize=authorize_profiling)
+
+# Per-route request counts, latency and DB time, exposed at /metrics.
+# Added last so it is the outermost user middleware and times the whole stack.
+app.add_middleware(MetricsMiddleware)
+for _engine in {engine, async_engine.sync_engine, read_engine, async_read_engine.sync_engine}:
+    instrument_engine(_engine)
+# Capture slow statements with their EXPLAIN plans (sync engines; see slow_queries.py)
+for _engine in {engine, read_engine}:
+    slow_query_recorder.attach(_engine)
+
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 ALGORITHM = "HS256"
@@ -75,6 +170,10 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
 
 def get_current_user(token_data: dict = Depends(verify_token), db: Session = Depends(get_db)):
     """Get current authenticated user"""
+    # Served from the principal cache; crud invalidates entries when a user changes
+    principal = principal_cache.get(token_data["email"])
+    if principal is not None:
+        return principal
     user = crud.get_user_by_email(db, email=token_data["email"])
     if user is None:
         raise HTTPException(
@@ -82,7 +181,12 @@ def get_current_user(token_data: dict = Depends(verify_token), db: Session = Dep
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+    return principal_cache.put(Principal.from_user(user))
+
+def get_current_user_claims(token_data: dict = Depends(verify_token)) -> schemas.TokenData:
+    """Get the authenticated user's email and role from the token alone (no database lookup).
+    For endpoints that only authorize on role."""
+    return schemas.TokenData(email=token_data["email"], role=token_data["role"])
 
 # Health check endpoint
 # SQL: No database query - simple status check
@@ -92,6 +196,20 @@ def health_check():
     """Health check endpoint"""
     return {"status": "ok"}
 
+# SQL: No database query - reads connection pool counters
+# Function: Returns connection pool usage and checkout wait times
+@app.get("/health/db", response_model=schemas.DatabaseHealthResponse)
+def database_health_check():
+    """Database connection pool health"""
+    return {"status": "ok", "pool": get_pool_status()}
+
+# SQL: No database query - renders in-process request metrics
+# Function: Returns per-route counters and histograms in Prometheus text format
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Test endpoint for debugging
 # SQL: No database query - simple response test
 # Function: Returns test message with current timestamp
@@ -129,7 +247,7 @@ def test_models():
 @app.get("/test/delete/{user_id}")
 def test_delete_user(user_id: int, db: Session = Depends(get_db)):
     """Test endpoint to check if user exists and can be deleted (for debugging)"""
-    print(f"🧪 Test delete endpoint called for user {user_id}")
+    logger.debug("Test delete endpoint called for user %s", user_id)
     
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if db_user:
@@ -179,6 +297,8 @@ def signin(user_credentials: schemas.UserSignIn, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    principal_cache.put(Principal.from_user(user))
+    
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -202,7 +322,7 @@ def get_current_user_info(current_user: models.User = Depends(get_current_user))
 # SQL: SELECT * FROM users LIMIT ? OFFSET ?;
 # Function: Retrieves paginated list of all users (admin only)
 @app.get("/users", response_model=List[schemas.UserResponse])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Get all users (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
@@ -226,88 +346,58 @@ def read_user(user_id: int, db: Session = Depends(get_db), current_user: models.
 @app.delete("/users/{user_id}")
 def delete_user_endpoint(user_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """Delete a user (admin only)"""
-    print(f"🔍 Delete user request: user_id={user_id}, current_user={current_user.id}, role={current_user.role}")
+    logger.debug("Delete user request: user_id=%s, current_user=%s, role=%s", user_id, current_user.id, current_user.role)
     
     if current_user.role != "admin":
-        print(f"❌ Access denied: {current_user.role} is not admin")
+        logger.warning("Access denied: %s is not admin", current_user.role)
         raise HTTPException(status_code=403, detail="Admin access required")
     
     if current_user.id == user_id:
-        print(f"❌ Self-deletion attempt: {current_user.id}")
+        logger.warning("Self-deletion attempt: %s", current_user.id)
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
     
-    print(f"✅ Proceeding with user deletion: {user_id}")
+    logger.info("Proceeding with user deletion: %s", user_id)
     success = crud.delete_user(db, user_id=user_id)
     
     if not success:
-        print(f"❌ User not found for deletion: {user_id}")
+        logger.warning("User not found for deletion: %s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
     
-    print(f"✅ User {user_id} deleted successfully")
+    logger.info("User %s deleted successfully", user_id)
     return {"message": "User deleted successfully"}
 
 # Admin Statistics endpoints
-# SQL: SELECT * FROM admin_statistics; UPDATE admin_statistics SET ...;
-# Function: Retrieves and updates admin dashboard statistics from dedicated table
+def serve_statistics_snapshot(db: Session, response: Response) -> dict:
+    """Current statistics snapshot, with its age in seconds as the Age header"""
+    statistics, age = statistics_snapshot.get(db)
+    response.headers["Age"] = str(int(age))
+    return statistics
+
+# SQL: None (served from the in-memory statistics snapshot)
+# Function: Retrieves admin dashboard statistics from the background-refreshed snapshot
 @app.get("/admin/statistics", response_model=schemas.AdminStatistics)
-def get_admin_statistics(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_admin_statistics(response: Response, db: Session = Depends(get_read_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Get admin dashboard statistics (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Update statistics first, then return
-    updated_stats = crud.update_admin_statistics(db)
-    if updated_stats:
-        return updated_stats.to_dict()
-    else:
-        # Fallback to calculated stats
-        return crud.get_admin_statistics(db)
+    return serve_statistics_snapshot(db, response)
 
 # Simple working admin statistics endpoint (no special tables required)
-# SQL: SELECT COUNT(*) FROM users; SELECT COUNT(*) FROM users WHERE role = ?; SELECT COUNT(*) FROM destinations; SELECT COUNT(*) FROM blog_posts; SELECT rating FROM destinations; SELECT COUNT(*) FROM reviews;
-# Function: Calculates admin statistics by querying multiple tables directly
+# SQL: None (served from the in-memory statistics snapshot)
+# Function: Returns admin statistics from the background-refreshed snapshot
 @app.get("/admin/statistics/simple")
-def get_simple_admin_statistics(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_simple_admin_statistics(response: Response, db: Session = Depends(get_read_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Get simple admin statistics without requiring special tables (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        # Get basic counts directly
-        total_users = db.query(models.User).count()
-        travelers = db.query(models.User).filter(models.User.role == "traveler").count()
-        guides = db.query(models.User).filter(models.User.role == "guide").count()
-        restaurant_owners = db.query(models.User).filter(models.User.role == "restaurant_owner").count()
-        hotel_owners = db.query(models.User).filter(models.User.role == "hotel_owner").count()
-        admins = db.query(models.User).filter(models.User.role == "admin").count()
-        
-        destinations = db.query(models.Destination).count()
-        blog_posts = db.query(models.BlogPost).count()
-        
-        # Calculate average rating
-        destination_ratings = db.query(models.Destination.rating).all()
-        if destination_ratings:
-            average_rating = sum([rating[0] for rating in destination_ratings if rating[0] is not None]) / len(destination_ratings)
-        else:
-            average_rating = 0.0
-        
-        total_reviews = db.query(models.Review).count()
-        
-        return {
-            "total_users": total_users,
-            "travelers": travelers,
-            "guides": guides,
-            "restaurant_owners": restaurant_owners,
-            "hotel_owners": hotel_owners,
-            "admins": admins,
-            "total_destinations": destinations,
-            "total_blog_posts": blog_posts,
-            "average_rating": round(average_rating, 1),
-            "total_reviews": total_reviews,
-            "last_updated": datetime.utcnow().isoformat()
-        }
+        statistics = serve_statistics_snapshot(db, response)
+        statistics["average_rating"] = round(statistics["average_rating"], 1)
+        return statistics
     except Exception as e:
-        print(f"Error getting simple admin statistics: {e}")
+        logger.error("Error getting simple admin statistics: %s", e)
         # Return default values if anything fails
         return {
             "total_users": 0,
@@ -327,7 +417,7 @@ def get_simple_admin_statistics(db: Session = Depends(get_db), current_user: mod
 # SQL: SELECT * FROM users;
 # Function: Retrieves all users with formatted data for admin user management
 @app.get("/admin/users/simple")
-def get_simple_users(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_simple_users(db: Session = Depends(get_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Get simple user list without requiring user management system (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
@@ -353,81 +443,90 @@ def get_simple_users(db: Session = Depends(get_db), current_user: models.User =
         
         return user_list
     except Exception as e:
-        print(f"Error getting simple users: {e}")
+        logger.error("Error getting simple users: %s", e)
         return []
 
-# SQL: Complex queries for user statistics aggregation
-# Function: Retrieves detailed user statistics and analytics for admin dashboard
+# SQL: None (served from the in-memory statistics snapshot)
+# Function: Retrieves user counts by role from the statistics snapshot
 @app.get("/admin/users/statistics", response_model=schemas.UserStatistics)
-def get_user_statistics(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_user_statistics(response: Response, db: Session = Depends(get_read_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Get detailed user statistics (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    return crud.get_user_statistics(db)
+    statistics = serve_statistics_snapshot(db, response)
+    return {key: statistics[key] for key in ("total_users", *dashboard_stats.ROLE_COLUMNS.values())}
 
 # SQL: Multiple table joins for comprehensive dashboard data
 # Function: Retrieves complete dashboard overview with all admin metrics
 @app.get("/admin/dashboard/overview", response_model=schemas.DashboardOverview)
-def get_dashboard_overview(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_dashboard_overview(db: Session = Depends(get_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Get complete dashboard overview (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
     return crud.get_dashboard_overview(db)
 
+# SQL: No database query - reads the in-memory slow-query captures
+# Function: Returns recent slow statements with their route, origin and EXPLAIN plan (admin only)
+@app.get("/admin/slow-queries")
+def get_slow_queries(limit: int = 50, current_user: schemas.TokenData = Depends(get_current_user_claims)):
+    """Most recent slow-query captures, newest first (admin only)"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return slow_query_recorder.captures(limit)
+
 # Updated Admin-specific endpoints that work with existing user system
-# SQL: SELECT * FROM admin_statistics;
-# Function: Retrieves admin statistics from dedicated admin_statistics table
+# SQL: None (served from the in-memory statistics snapshot)
+# Function: Retrieves admin statistics from the background-refreshed snapshot
 @app.get("/admin/dashboard/stats", response_model=schemas.AdminStatistics)
-def get_admin_dashboard_stats(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    """Get admin dashboard statistics from dedicated table (admin only)"""
+def get_admin_dashboard_stats(response: Response, db: Session = Depends(get_read_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
+    """Get admin dashboard statistics (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Get stats from admin_statistics table
-    stats = crud.get_admin_statistics_from_table(db)
-    if stats:
-        return stats.to_dict()
-    else:
-        raise HTTPException(status_code=500, detail="Failed to retrieve admin statistics")
+    return serve_statistics_snapshot(db, response)
 
-# SQL: UPDATE admin_statistics SET ...; INSERT INTO admin_activity_log (...);
-# Function: Manually refreshes admin statistics and logs the activity
+# SQL: SELECT role, COUNT(id) FROM users GROUP BY role; SELECT (SELECT COUNT(*) FROM destinations), ...; INSERT INTO admin_activity_log (...);
+# Function: Forces an early refresh of the statistics snapshot and logs the activity
 @app.post("/admin/dashboard/refresh", response_model=schemas.AdminStatistics)
-def refresh_admin_dashboard(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def refresh_admin_dashboard(response: Response, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """Manually refresh admin dashboard statistics (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Update statistics
-    updated_stats = crud.update_admin_statistics(db)
-    if updated_stats:
-        # Log the refresh activity (if admin_activity_log table exists)
-        try:
-            crud.log_admin_activity(db, current_user.id, "dashboard_refresh", "Admin dashboard statistics refreshed")
-        except:
-            pass  # Ignore if activity logging fails
-        return updated_stats.to_dict()
-    else:
+    # Recompute the snapshot now instead of waiting for the background task
+    try:
+        updated_stats = statistics_snapshot.refresh(db)
+    except Exception as e:
+        logger.error("Error refreshing admin statistics: %s", e)
         raise HTTPException(status_code=500, detail="Failed to refresh admin statistics")
+    
+    # Log the refresh activity (if admin_activity_log table exists)
+    try:
+        crud.log_admin_activity(db, current_user.id, "dashboard_refresh", "Admin dashboard statistics refreshed")
+    except:
+        pass  # Ignore if activity logging fails
+    response.headers["Age"] = "0"
+    return updated_stats
 
 # Destination endpoints
 # SQL: SELECT * FROM destinations LIMIT ? OFFSET ?;
 # Function: Retrieves paginated list of all destinations
 @app.get("/destinations")
-def read_destinations(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_destinations(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_read_db)):
     """Get all destinations"""
-    destinations = crud.get_destinations(db, skip=skip, limit=limit)
+    destinations = await async_crud.get_destinations(db, skip=skip, limit=limit)
     # Convert to dictionary format to avoid relationship loading issues
-    return [destination.to_dict() for destination in destinations]
+    return fast_json.json_response([destination.to_dict() for destination in destinations])
 
 # SQL: SELECT * FROM destinations WHERE destination_id = ?;
 # Function: Retrieves specific destination by destination_id string
 @app.get("/destinations/{destination_id}")
-def read_destination(destination_id: str, db: Session = Depends(get_db)):
+async def read_destination(destination_id: str, db: AsyncSession = Depends(get_async_read_db)):
     """Get a specific destination by ID"""
-    db_destination = crud.get_destination_by_id(db, destination_id=destination_id)
+    db_destination = await async_crud.get_destination_by_id(db, destination_id=destination_id)
     if db_destination is None:
         raise HTTPException(status_code=404, detail="Destination not found")
     return db_destination.to_dict()
@@ -435,7 +534,7 @@ def read_destination(destination_id: str, db: Session = Depends(get_db)):
 # SQL: INSERT INTO destinations (destination_id, name, image, rating, reviews, description, highlights, country, region) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
 # Function: Creates new destination with admin/guide role validation
 @app.post("/destinations", response_model=schemas.Destination, status_code=status.HTTP_201_CREATED)
-def create_destination(destination: schemas.DestinationCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def create_destination(destination: schemas.DestinationCreate, db: Session = Depends(get_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Create a new destination (admin/guide only)"""
     if current_user.role not in ["admin", "guide"]:
         raise HTTPException(status_code=403, detail="Admin or guide access required")
@@ -444,7 +543,7 @@ def create_destination(destination: schemas.DestinationCreate, db: Session = Dep
 # SQL: SELECT * FROM destinations WHERE id = ?; UPDATE destinations SET ... WHERE id = ?;
 # Function: Updates destination by numeric ID with admin-only access
 @app.put("/destinations/{destination_id}", response_model=schemas.Destination)
-def update_destination(destination_id: int, destination: schemas.DestinationUpdate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def update_destination(destination_id: int, destination: schemas.DestinationUpdate, db: Session = Depends(get_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Update a destination (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
@@ -464,7 +563,7 @@ def update_destination(destination_id: int, destination: schemas.DestinationUpda
 # SQL: SELECT * FROM destinations WHERE id = ?; DELETE FROM destinations WHERE id = ?;
 # Function: Deletes destination by numeric ID with admin-only access
 @app.delete("/destinations/{destination_id}")
-def delete_destination(destination_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def delete_destination(destination_id: int, db: Session = Depends(get_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Delete a destination (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
@@ -485,47 +584,82 @@ def delete_destination(destination_id: int, db: Session = Depends(get_db), curre
 # SQL: SELECT * FROM destinations WHERE destination_id = ?; SELECT * FROM reviews WHERE destination_id = ? LIMIT ? OFFSET ?;
 # Function: Retrieves paginated reviews for a specific destination
 @app.get("/destinations/{destination_id}/reviews")
-def read_destination_reviews(destination_id: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_destination_reviews(destination_id: str, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_read_db)):
     """Get reviews for a specific destination"""
     try:
-        print(f"🔍 Getting reviews for destination ID: {destination_id}")
-        db_destination = crud.get_destination_by_id(db, destination_id=destination_id)
+        logger.debug("Getting reviews for destination ID: %s", destination_id)
+        db_destination = await async_crud.get_destination_by_id(db, destination_id=destination_id)
         if db_destination is None:
             raise HTTPException(status_code=404, detail="Destination not found")
         
-        print(f"📍 Found destination: {db_destination.name} (ID: {db_destination.id})")
-        reviews = crud.get_reviews_by_destination(db, destination_id=db_destination.id, skip=skip, limit=limit)
-        print(f"✅ Found {len(reviews)} reviews for destination {destination_id}")
+        logger.debug("Found destination: %s (ID: %s)", db_destination.name, db_destination.id)
+        reviews = await async_crud.get_reviews_by_destination(db, destination_id=db_destination.id, skip=skip, limit=limit)
+        logger.debug("Found %s reviews for destination %s", len(reviews), destination_id)
         
         # Debug: Print first review if exists
         if reviews and len(reviews) > 0:
-            print(f"📝 First review: {reviews[0]}")
+            logger.debug("First review: %s", reviews[0])
         
         return reviews
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error getting destination reviews: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting destination reviews: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load reviews")
 
+# SQL: SELECT id, name, city, rating, image FROM hotels WHERE id IN (...); OR SELECT hotels.*, room_type, MIN(available_rooms), MIN(price_per_night), SUM(price_per_night) FROM room_availability JOIN hotels JOIN destinations JOIN hotel_room_types WHERE destinations.destination_id = ? AND date >= ? AND date < ? AND available_rooms > 0 AND max_guests >= ? GROUP BY hotel, room_type HAVING COUNT(*) = nights ORDER BY total price LIMIT ? OFFSET ?;
+# Function: Lists every hotel room type in a destination that can be booked for the whole stay, with total and cheapest nightly price (from the in-memory inventory when loaded)
+@app.get("/destinations/{destination_id}/availability")
+async def search_destination_availability(
+    destination_id: str,
+    check_in: str,
+    check_out: str,
+    guests: int = 1,
+    sort: str = "price_asc",
+    skip: int = 0,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Bookable hotels and room types in a destination for the given dates"""
+    try:
+        check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
+        check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if check_in_date >= check_out_date:
+        raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+    if sort not in async_crud.AVAILABILITY_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(async_crud.AVAILABILITY_SORTS)}")
+    
+    matches = inventory_engine.search(destination_id, check_in_date, check_out_date, guests=guests, sort=sort, skip=skip, limit=min(limit, 100))
+    if matches is not None:
+        return fast_json.json_response(await async_crud.add_hotel_details(db, matches))
+    results = await async_crud.search_destination_availability(
+        db, destination_id, check_in_date, check_out_date, guests=guests, sort=sort, skip=skip, limit=min(limit, 100)
+    )
+    if not results and skip == 0 and await async_crud.get_destination_by_id(db, destination_id=destination_id) is None:
+        raise HTTPException(status_code=404, detail="Destination not found")
+    return fast_json.json_response(results)
+
 # SQL: SELECT * FROM destinations WHERE destination_id = ?; INSERT INTO reviews (user_id, destination_id, rating, comment, created_at) VALUES (?, ?, ?, ?, ?);
 # Function: Creates new review for destination with user authentication
 @app.post("/destinations/{destination_id}/reviews", response_model=schemas.Review, status_code=status.HTTP_201_CREATED)
 def create_destination_review(destination_id: str, review: schemas.ReviewCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """Create a new review for a destination (authenticated users only)"""
-    print(f"🔄 Creating review for destination: {destination_id}")
-    print(f"📝 Review data: {review.dict()}")
-    print(f"👤 User ID: {current_user.id}")
+    logger.debug("Creating review for destination: %s", destination_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Review data: %s", review.dict())
+    logger.debug("User ID: %s", current_user.id)
     
     db_destination = crud.get_destination_by_id(db, destination_id=destination_id)
     if db_destination is None:
         raise HTTPException(status_code=404, detail="Destination not found")
     
-    print(f"📍 Destination found: {db_destination.name} (ID: {db_destination.id})")
+    logger.debug("Destination found: %s (ID: %s)", db_destination.name, db_destination.id)
     
     # Pass the destination_id directly to the CRUD function
     created_review = crud.create_review(db=db, review=review, user_id=current_user.id, destination_id=db_destination.id)
-    print(f"✅ Review created successfully: {created_review.id}")
+    logger.info("Review created successfully: %s", created_review.id)
     
     return created_review
 
@@ -533,7 +667,7 @@ def create_destination_review(destination_id: str, review: schemas.ReviewCreate,
 # SQL: SELECT * FROM travel_buddies WHERE destination = ? AND is_active = TRUE LIMIT ? OFFSET ?; OR SELECT * FROM travel_buddies WHERE is_active = TRUE LIMIT ? OFFSET ?;
 # Function: Retrieves travel buddy requests with optional destination filtering
 @app.get("/travel-buddies", response_model=List[schemas.TravelBuddy])
-def read_travel_buddies(destination: str = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_travel_buddies(destination: str = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get travel buddies, optionally filtered by destination"""
     if destination:
         buddies = crud.get_travel_buddies_by_destination(db, destination=destination, skip=skip, limit=limit)
@@ -553,7 +687,7 @@ def create_travel_buddy(travel_buddy: schemas.TravelBuddyCreate, db: Session = D
 # SQL: SELECT * FROM blog_posts LIMIT ? OFFSET ?;
 # Function: Retrieves paginated list of all blog posts
 @app.get("/blog-posts", response_model=List[schemas.BlogPost])
-def read_blog_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_blog_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get all blog posts"""
     posts = crud.get_blog_posts(db, skip=skip, limit=limit)
     return posts
@@ -561,7 +695,7 @@ def read_blog_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
 # SQL: SELECT * FROM blog_posts WHERE id = ?;
 # Function: Retrieves specific blog post by ID
 @app.get("/blog-posts/{post_id}", response_model=schemas.BlogPost)
-def read_blog_post(post_id: int, db: Session = Depends(get_db)):
+def read_blog_post(post_id: int, db: Session = Depends(get_read_db)):
     """Get a specific blog post by ID"""
     db_post = crud.get_blog_post(db, post_id=post_id)
     if db_post is None:
@@ -579,15 +713,15 @@ def create_blog_post(blog_post: schemas.BlogPostCreate, db: Session = Depends(ge
 # SQL: SELECT * FROM restaurants LIMIT ? OFFSET ?;
 # Function: Retrieves paginated list of all restaurants
 @app.get("/restaurants", response_model=List[schemas.Restaurant])
-def read_restaurants(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_restaurants(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get all restaurants"""
     restaurants = crud.get_restaurants(db, skip=skip, limit=limit)
-    return restaurants
+    return fast_json.RESTAURANT_LIST.response(restaurants)
 
 # SQL: SELECT * FROM restaurants WHERE id = ?;
 # Function: Retrieves specific restaurant by ID
 @app.get("/restaurants/{restaurant_id}", response_model=schemas.Restaurant)
-def read_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
+def read_restaurant(restaurant_id: int, db: Session = Depends(get_read_db)):
     """Get a specific restaurant by ID"""
     db_restaurant = crud.get_restaurant(db, restaurant_id=restaurant_id)
     if db_restaurant is None:
@@ -634,17 +768,15 @@ def delete_restaurant(restaurant_id: int, db: Session = Depends(get_db), current
 # SQL: SELECT * FROM restaurants WHERE destination_id = ?;
 # Function: Retrieves restaurants filtered by destination ID for travelers
 @app.get("/restaurants/by-destination/{destination_id}")
-def get_restaurants_by_destination(destination_id: int, db: Session = Depends(get_db)):
+async def get_restaurants_by_destination(destination_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get restaurants filtered by destination ID for travelers"""
     try:
-        print(f"🔍 Getting restaurants for destination ID: {destination_id}")
-        restaurants = crud.get_restaurants_by_destination(db, destination_id=destination_id)
-        print(f"✅ Found {len(restaurants)} restaurants for destination {destination_id}")
+        logger.debug("Getting restaurants for destination ID: %s", destination_id)
+        restaurants = await async_crud.get_restaurants_by_destination(db, destination_id=destination_id)
+        logger.debug("Found %s restaurants for destination %s", len(restaurants), destination_id)
         return restaurants
     except Exception as e:
-        print(f"❌ Error getting restaurants by destination: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting restaurants by destination: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load restaurants")
 
 # Restaurant Owner Dashboard endpoints
@@ -660,8 +792,8 @@ def get_restaurant_owner_restaurants(
     current_user: models.User = Depends(get_current_user)
 ):
     """Get restaurants for restaurant owner with search and filtering"""
-    print(f"🔍 Restaurant Owner Endpoint: User ID: {current_user.id}, Role: {current_user.role}")
-    print(f"🔍 Restaurant Owner Endpoint: Filters - search: {search}, destination_id: {destination_id}, cuisine_type: {cuisine_type}, price_range: {price_range}")
+    logger.debug("Restaurant Owner Endpoint: User ID: %s, Role: %s", current_user.id, current_user.role)
+    logger.debug("Restaurant Owner Endpoint: Filters - search: %s, destination_id: %s, cuisine_type: %s, price_range: %s", search, destination_id, cuisine_type, price_range)
     
     if current_user.role != "restaurant_owner":
         raise HTTPException(status_code=403, detail="Restaurant owner access required")
@@ -675,11 +807,11 @@ def get_restaurant_owner_restaurants(
             cuisine_type=cuisine_type,
             price_range=price_range
         )
-        print(f"✅ Restaurant Owner Endpoint: Found {len(restaurants)} restaurants")
-        print(f"📊 Restaurant Owner Endpoint: First restaurant data: {restaurants[0] if restaurants else 'None'}")
+        logger.debug("Restaurant Owner Endpoint: Found %s restaurants", len(restaurants))
+        logger.debug("Restaurant Owner Endpoint: First restaurant data: %s", restaurants[0] if restaurants else 'None')
         return restaurants
     except Exception as e:
-        print(f"❌ Error getting restaurant owner restaurants: {e}")
+        logger.error("Error getting restaurant owner restaurants: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load restaurants")
 
 # SQL: SELECT * FROM destinations;
@@ -687,7 +819,7 @@ def get_restaurant_owner_restaurants(
 @app.get("/restaurant-owner/destinations")
 def get_restaurant_owner_destinations(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.TokenData = Depends(get_current_user_claims)
 ):
     """Get available destinations for restaurant owners"""
     if current_user.role != "restaurant_owner":
@@ -697,7 +829,7 @@ def get_restaurant_owner_destinations(
         destinations = crud.get_destinations(db)
         return destinations
     except Exception as e:
-        print(f"❌ Error getting restaurant owner destinations: {e}")
+        logger.error("Error getting restaurant owner destinations: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load destinations")
 
 # SQL: SELECT * FROM restaurants WHERE owner_id = ?;
@@ -747,7 +879,7 @@ def get_restaurant_owner_statistics(
             "destinations_covered": unique_destinations
         }
     except Exception as e:
-        print(f"❌ Error getting restaurant owner statistics: {e}")
+        logger.error("Error getting restaurant owner statistics: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load statistics")
 
 @app.get("/test/hotel-owner-auth")
@@ -773,9 +905,7 @@ def test_hotel_creation(db: Session = Depends(get_db)):
         dest_count = len(destinations)
         
         # Check if hotels table exists and has correct structure
-        from sqlalchemy import inspect
-        inspector = inspect(db.bind)
-        hotel_columns = inspector.get_columns('hotels') if 'hotels' in inspector.get_table_names() else []
+        capabilities = schema_registry.get(db.get_bind())
         
         # Check if any hotels exist
         hotels = db.query(models.Hotel).limit(5).all()
@@ -785,8 +915,8 @@ def test_hotel_creation(db: Session = Depends(get_db)):
             "message": "Hotel creation test",
             "destinations_count": dest_count,
             "sample_destinations": [{"id": d.id, "name": d.name} for d in destinations[:3]],
-            "hotels_table_exists": 'hotels' in inspector.get_table_names(),
-            "hotels_columns": [col['name'] for col in hotel_columns],
+            "hotels_table_exists": capabilities.has_table('hotels'),
+            "hotels_columns": sorted(capabilities.columns.get('hotels', ())),
             "hotels_count": hotel_count,
             "sample_hotels": [{"id": h.id, "name": h.name, "owner_id": h.owner_id, "destination_id": h.destination_id} for h in hotels[:3]],
             "timestamp": datetime.now(timezone.utc).isoformat()
@@ -823,46 +953,44 @@ def test_hotels_database(db: Session = Depends(get_db)):
 # SQL: SELECT * FROM hotels LIMIT ? OFFSET ?;
 # Function: Retrieves paginated list of all hotels
 @app.get("/hotels", response_model=List[schemas.Hotel])
-def read_hotels(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_hotels(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     hotels = crud.get_hotels(db, skip=skip, limit=limit)
-    return hotels
+    return fast_json.HOTEL_LIST.response(loading.serialize(db, hotels))
 
 # SQL: SELECT * FROM hotels WHERE id = ?;
 # Function: Retrieves specific hotel by ID
 @app.get("/hotels/{hotel_id}", response_model=schemas.Hotel)
-def read_hotel(hotel_id: int, db: Session = Depends(get_db)):
+def read_hotel(hotel_id: int, db: Session = Depends(get_read_db)):
     db_hotel = crud.get_hotel(db, hotel_id=hotel_id)
     if db_hotel is None:
         raise HTTPException(status_code=404, detail="Hotel not found")
-    return db_hotel
+    return db_hotel.to_dict()
 
 # SQL: INSERT INTO hotels (owner_id, name, description, address, city, country, phone, email, website, image, rating, reviews, price_range, amenities, room_types, destination_id, is_active, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
 # Function: Creates new hotel with hotel owner role validation
 @app.post("/hotels", response_model=schemas.Hotel, status_code=status.HTTP_201_CREATED)
 def create_hotel(hotel: schemas.HotelCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """Create a new hotel with authentication and validation"""
-    print(f"🔍 Hotel creation request from user: {current_user.email} (ID: {current_user.id}, Role: {current_user.role})")
-    print(f"📋 Hotel data received: {hotel.dict()}")
+    logger.debug("Hotel creation request from user: %s (ID: %s, Role: %s)", current_user.email, current_user.id, current_user.role)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Hotel data received: %s", hotel.dict())
     
     if current_user.role != "hotel_owner":
-        print(f"❌ Access denied: User role {current_user.role} is not hotel_owner")
+        logger.warning("Access denied: User role %s is not hotel_owner", current_user.role)
         raise HTTPException(status_code=403, detail="Hotel owner access required")
     
     try:
-        print(f"✅ User authenticated, creating hotel for owner_id: {current_user.id}")
+        logger.debug("User authenticated, creating hotel for owner_id: %s", current_user.id)
         result = crud.create_hotel(db=db, hotel=hotel, owner_id=current_user.id)
-        print(f"✅ Hotel created successfully with ID: {result.id}")
+        logger.info("Hotel created successfully with ID: %s", result.id)
         
         # Return the hotel with destination info
         hotel_data = result.to_dict()
-        print(f"📤 Returning hotel data: {hotel_data}")
+        logger.debug("Returning hotel data: %s", hotel_data)
         return hotel_data
         
     except Exception as e:
-        print(f"❌ Error creating hotel: {str(e)}")
-        print(f"❌ Error type: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error creating hotel: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create hotel: {str(e)}")
 
 # SQL: SELECT * FROM hotels WHERE id = ?; UPDATE hotels SET ... WHERE id = ?;
@@ -892,17 +1020,15 @@ def delete_hotel(hotel_id: int, db: Session = Depends(get_db), current_user: mod
 # SQL: SELECT * FROM hotels WHERE destination_id = ?;
 # Function: Retrieves hotels filtered by destination ID for travelers
 @app.get("/hotels/by-destination/{destination_id}")
-def get_hotels_by_destination(destination_id: int, db: Session = Depends(get_db)):
+async def get_hotels_by_destination(destination_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get hotels filtered by destination ID for travelers"""
     try:
-        print(f"🔍 Getting hotels for destination ID: {destination_id}")
-        hotels = crud.get_hotels_by_destination(db, destination_id=destination_id)
-        print(f"✅ Found {len(hotels)} hotels for destination {destination_id}")
+        logger.debug("Getting hotels for destination ID: %s", destination_id)
+        hotels = await async_crud.get_hotels_by_destination(db, destination_id=destination_id)
+        logger.debug("Found %s hotels for destination %s", len(hotels), destination_id)
         return hotels
     except Exception as e:
-        print(f"❌ Error getting hotels by destination: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting hotels by destination: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load hotels")
 
 # Hotel Owner Dashboard endpoints
@@ -930,16 +1056,16 @@ def get_hotel_owner_hotels(
     current_user: models.User = Depends(get_current_user)
 ):
     """Get hotels for hotel owner with search and filter options"""
-    print(f"🔍 Loading hotels for user: {current_user.email} (ID: {current_user.id})")
+    logger.debug("Loading hotels for user: %s (ID: %s)", current_user.email, current_user.id)
     
     if current_user.role != "hotel_owner":
-        print(f"❌ Access denied: User role {current_user.role} is not hotel_owner")
+        logger.warning("Access denied: User role %s is not hotel_owner", current_user.role)
         raise HTTPException(status_code=403, detail="Hotel owner access required")
     
     try:
         if search or destination_id or price_range:
             # Use search function
-            print(f"🔍 Using search with: search='{search}', destination_id={destination_id}, price_range='{price_range}'")
+            logger.debug("Using search with: search='%s', destination_id=%s, price_range='%s'", search, destination_id, price_range)
             hotels = crud.search_hotels_by_owner(
                 db, 
                 current_user.id, 
@@ -949,10 +1075,10 @@ def get_hotel_owner_hotels(
             )
         else:
             # Get all hotels by owner
-            print(f"📋 Getting all hotels for owner_id: {current_user.id}")
+            logger.debug("Getting all hotels for owner_id: %s", current_user.id)
             hotels = crud.get_hotels_by_owner_with_destinations(db, current_user.id, skip, limit)
         
-        print(f"✅ Found {len(hotels)} hotels")
+        logger.debug("Found %s hotels", len(hotels))
         
         # Convert to dictionaries with destination info
         hotel_list = []
@@ -960,9 +1086,9 @@ def get_hotel_owner_hotels(
             try:
                 hotel_dict = hotel.to_dict()
                 hotel_list.append(hotel_dict)
-                print(f"🏨 Hotel {hotel.id}: {hotel.name} - Destination: {hotel_dict.get('destination_id')}")
+                logger.debug("Hotel %s: %s - Destination: %s", hotel.id, hotel.name, hotel_dict.get('destination_id'))
             except Exception as e:
-                print(f"❌ Error converting hotel {hotel.id}: {str(e)}")
+                logger.error("Error converting hotel %s: %s", hotel.id, e)
                 # Add basic hotel info if to_dict fails
                 hotel_list.append({
                     "id": hotel.id,
@@ -987,19 +1113,17 @@ def get_hotel_owner_hotels(
                     "updated_at": hotel.updated_at.isoformat() if hotel.updated_at else None
                 })
         
-        print(f"📤 Returning {len(hotel_list)} hotels")
+        logger.debug("Returning %s hotels", len(hotel_list))
         return hotel_list
         
     except Exception as e:
-        print(f"❌ Error loading hotels: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error loading hotels: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to load hotels: {str(e)}")
 
 # SQL: SELECT * FROM destinations;
 # Function: Retrieves all destinations for hotel owner selection
 @app.get("/hotel-owner/destinations")
-def get_hotel_owner_destinations(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_hotel_owner_destinations(db: Session = Depends(get_db), current_user: schemas.TokenData = Depends(get_current_user_claims)):
     """Get destinations available for hotel owner"""
     if current_user.role != "hotel_owner":
         raise HTTPException(status_code=403, detail="Hotel owner access required")
@@ -1008,12 +1132,12 @@ def get_hotel_owner_destinations(db: Session = Depends(get_db), current_user: mo
         destinations = crud.get_destinations(db)
         return destinations
     except Exception as e:
-        print(f"❌ Error getting hotel owner destinations: {e}")
+        logger.error("Error getting hotel owner destinations: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load destinations")
 
 # Hotel Booking Management Endpoints
-# SQL: INSERT INTO hotel_bookings (traveler_id, hotel_id, check_in_date, check_out_date, room_type, guests, total_price, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
-# Function: Creates new hotel booking with traveler role validation and date validation
+# SQL: SELECT * FROM room_availability WHERE hotel_id = ? AND room_type = ? AND date >= ? AND date < ? FOR UPDATE; UPDATE room_availability SET available_rooms = available_rooms - 1 WHERE ...; INSERT INTO hotel_bookings (...) VALUES (...);
+# Function: Creates new hotel booking with traveler role validation and date validation; answers 409 when any night is full
 @app.post("/hotels/{hotel_id}/book")
 def create_hotel_booking(
     hotel_id: int,
@@ -1046,10 +1170,12 @@ def create_hotel_booking(
         new_booking = crud.create_hotel_booking(db, booking_data)
         return {"message": "Booking created successfully", "booking": new_booking}
         
+    except reservations.RoomsUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"❌ Error creating hotel booking: {e}")
+        logger.error("Error creating hotel booking: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create booking")
 
 # SQL: SELECT * FROM hotels WHERE id = ? AND owner_id = ?; SELECT * FROM hotel_bookings WHERE hotel_id = ?;
@@ -1073,7 +1199,7 @@ def get_hotel_bookings(
         bookings = crud.get_hotel_bookings_by_hotel(db, hotel_id)
         return bookings
     except Exception as e:
-        print(f"❌ Error getting hotel bookings: {e}")
+        logger.error("Error getting hotel bookings: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load bookings")
 
 # SQL: SELECT * FROM hotel_bookings WHERE traveler_id = ?;
@@ -1091,11 +1217,11 @@ def get_traveler_bookings(
         bookings = crud.get_hotel_bookings_by_traveler(db, current_user.id)
         return bookings
     except Exception as e:
-        print(f"❌ Error getting traveler bookings: {e}")
+        logger.error("Error getting traveler bookings: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load bookings")
 
-# SQL: SELECT * FROM hotel_bookings WHERE booking_id = ?; SELECT * FROM hotels WHERE id = ? AND owner_id = ?; UPDATE hotel_bookings SET ... WHERE booking_id = ?;
-# Function: Updates hotel booking with traveler/hotel owner access control
+# SQL: SELECT * FROM hotel_bookings WHERE booking_id = ?; SELECT * FROM hotels WHERE id = ? AND owner_id = ?; SELECT * FROM hotel_bookings WHERE booking_id = ? FOR UPDATE; UPDATE hotel_bookings SET hold_expires_at = NULL WHERE booking_id = ? AND booking_status = 'pending' AND hold_expires_at > ?; UPDATE hotel_bookings SET ... WHERE booking_id = ?; (cancelling) UPDATE hotel_bookings SET booking_status = 'cancelled' WHERE booking_id = ? AND booking_status != 'cancelled'; UPDATE room_availability SET available_rooms = available_rooms + 1 WHERE ...;
+# Function: Updates hotel booking with traveler/hotel owner access control; cancelling releases the nights like /cancel; answers 409 when confirming a booking whose hold has expired or reviving a cancelled one
 @app.put("/bookings/{booking_id}")
 def update_hotel_booking(
     booking_id: int,
@@ -1121,11 +1247,13 @@ def update_hotel_booking(
     try:
         updated_booking = crud.update_hotel_booking(db, booking_id, booking_update.dict(exclude_unset=True))
         return {"message": "Booking updated successfully", "booking": updated_booking}
+    except (booking_holds.HoldExpired, booking_holds.HoldEnded, reservations.BookingClosed) as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
-        print(f"❌ Error updating hotel booking: {e}")
+        logger.error("Error updating hotel booking: %s", e)
         raise HTTPException(status_code=500, detail="Failed to update booking")
 
-# SQL: SELECT * FROM hotel_bookings WHERE booking_id = ?; SELECT * FROM hotels WHERE id = ? AND owner_id = ?; UPDATE hotel_bookings SET status = 'cancelled' WHERE booking_id = ?;
+# SQL: SELECT * FROM hotel_bookings WHERE booking_id = ?; SELECT * FROM hotels WHERE id = ? AND owner_id = ?; UPDATE hotel_bookings SET booking_status = 'cancelled' WHERE booking_id = ? AND booking_status != 'cancelled'; UPDATE room_availability SET available_rooms = available_rooms + 1 WHERE ...;
 # Function: Cancels hotel booking with traveler/hotel owner access control
 @app.post("/bookings/{booking_id}/cancel")
 def cancel_hotel_booking(
@@ -1152,7 +1280,7 @@ def cancel_hotel_booking(
         cancelled_booking = crud.cancel_hotel_booking(db, booking_id)
         return {"message": "Booking cancelled successfully", "booking": cancelled_booking}
     except Exception as e:
-        print(f"❌ Error cancelling hotel booking: {e}")
+        logger.error("Error cancelling hotel booking: %s", e)
         raise HTTPException(status_code=500, detail="Failed to cancel booking")
 
 # SQL: SELECT room_types FROM hotels WHERE id = ?;
@@ -1167,7 +1295,7 @@ def get_hotel_room_types(
         room_types = crud.get_hotel_room_types(db, hotel_id)
         return room_types
     except Exception as e:
-        print(f"❌ Error getting hotel room types: {e}")
+        logger.error("Error getting hotel room types: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load room types")
 
 # SQL: SELECT * FROM hotel_bookings WHERE hotel_id = ? AND room_type = ? AND check_in_date <= ? AND check_out_date >= ?;
@@ -1185,9 +1313,61 @@ def get_hotel_availability(
         availability = crud.get_room_availability(db, hotel_id, room_type, start_date, end_date)
         return availability
     except Exception as e:
-        print(f"❌ Error getting hotel availability: {e}")
+        logger.error("Error getting hotel availability: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load availability")
 
+# SQL: SELECT hotel_room_types.base_price_per_night, room_availability.date, room_availability.price_per_night FROM hotel_room_types LEFT OUTER JOIN room_availability ON ... AND date >= ? AND date < ? WHERE hotel_room_types.hotel_id = ? AND room_type_name = ?;
+# Function: Prices a stay night by night from the availability rates (base price for nights without one), cached briefly
+@app.get("/hotels/{hotel_id}/quote")
+def get_hotel_quote(
+    hotel_id: int,
+    room_type: str,
+    check_in: str,
+    check_out: str,
+    db: Session = Depends(get_read_db)
+):
+    """Total price of a stay with the rate of each night"""
+    try:
+        check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
+        check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if check_in_date >= check_out_date:
+        raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+    if (check_out_date - check_in_date).days > quotes.MAX_QUOTE_NIGHTS:
+        raise HTTPException(status_code=400, detail=f"Stays can be quoted for at most {quotes.MAX_QUOTE_NIGHTS} nights")
+
+    quote = quotes.get_quote(db, hotel_id, room_type, check_in_date, check_out_date)
+    if quote is None:
+        raise HTTPException(status_code=404, detail="Room type not found")
+    return fast_json.json_response(quote.to_dict())
+
+# SQL: SELECT * FROM hotels WHERE id = ? AND owner_id = ?; SELECT room_type, date FROM room_availability WHERE ...; INSERT INTO room_availability (...) VALUES (...), (...), ... ON DUPLICATE KEY UPDATE ...;
+# Function: Creates or updates a hotel's availability calendar in bulk (hotel owner only)
+@app.post("/hotels/{hotel_id}/inventory", response_model=schemas.RoomInventoryBulkResult)
+def bulk_upsert_hotel_inventory(
+    hotel_id: int,
+    inventory: schemas.RoomInventoryBulkUpsert,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Open or reprice room types over date ranges; existing nights keep their bookings (hotel owner only)"""
+    if current_user.role != "hotel_owner":
+        raise HTTPException(status_code=403, detail="Hotel owner access required")
+    
+    # Verify hotel ownership
+    hotel = db.query(models.Hotel).filter(models.Hotel.id == hotel_id, models.Hotel.owner_id == current_user.id).first()
+    if not hotel:
+        raise HTTPException(status_code=404, detail="Hotel not found or access denied")
+    
+    try:
+        return crud.bulk_upsert_room_availability(db, hotel_id, inventory.ranges)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error upserting hotel inventory: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to update inventory")
+
 # Guest Request Management Endpoints
 # SQL: SELECT * FROM hotel_bookings WHERE booking_id = ? AND traveler_id = ?; INSERT INTO guest_requests (booking_id, request_type, description, status, created_at) VALUES (?, ?, ?, ?, ?);
 # Function: Creates new guest request with traveler role validation and booking ownership check
@@ -1214,7 +1394,7 @@ def create_guest_request(
         new_request = crud.create_guest_request(db, request_data)
         return {"message": "Request created successfully", "request": new_request}
     except Exception as e:
-        print(f"❌ Error creating guest request: {e}")
+        logger.error("Error creating guest request: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create request")
 
 # SQL: SELECT * FROM hotel_bookings WHERE booking_id = ?; SELECT * FROM hotels WHERE id = ? AND owner_id = ?; SELECT * FROM guest_requests WHERE booking_id = ?;
@@ -1244,7 +1424,7 @@ def get_guest_requests(
         requests = crud.get_guest_requests_by_booking(db, booking_id)
         return requests
     except Exception as e:
-        print(f"❌ Error getting guest requests: {e}")
+        logger.error("Error getting guest requests: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load requests")
 
 # SQL: SELECT * FROM hotels WHERE id = ? AND owner_id = ?; SELECT * FROM guest_requests WHERE booking_id IN (SELECT booking_id FROM hotel_bookings WHERE hotel_id = ?);
@@ -1268,7 +1448,7 @@ def get_hotel_guest_requests(
         requests = crud.get_guest_requests_by_hotel(db, hotel_id)
         return requests
     except Exception as e:
-        print(f"❌ Error getting hotel guest requests: {e}")
+        logger.error("Error getting hotel guest requests: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load requests")
 
 # SQL: SELECT * FROM guest_requests WHERE request_id = ?; SELECT * FROM hotels JOIN hotel_bookings ON hotels.id = hotel_bookings.hotel_id WHERE hotel_bookings.booking_id = ? AND hotels.owner_id = ?; UPDATE guest_requests SET ... WHERE request_id = ?;
@@ -1303,20 +1483,29 @@ def update_guest_request(
         updated_request = crud.update_guest_request(db, request_id, request_update.dict(exclude_unset=True))
         return {"message": "Request updated successfully", "request": updated_request}
     except Exception as e:
-        print(f"❌ Error updating guest request: {e}")
+        logger.error("Error updating guest request: %s", e)
         raise HTTPException(status_code=500, detail="Failed to update request")
 
-# SQL: SELECT * FROM hotels WHERE id = ? AND owner_id = ?; Complex queries for hotel booking statistics aggregation
-# Function: Retrieves comprehensive booking statistics for a hotel with hotel owner access control
+# SQL: SELECT * FROM hotels WHERE id = ? AND owner_id = ?; one SELECT aggregating hotel_bookings by status with room-nights from room_availability
+# Function: Retrieves booking counts, revenue and occupancy over a date window for a hotel with hotel owner access control
 @app.get("/hotels/{hotel_id}/booking-statistics")
 def get_hotel_booking_statistics(
     hotel_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Get comprehensive booking statistics for a hotel (hotel owner only)"""
+    """Get comprehensive booking statistics for a hotel (hotel owner only); occupancy covers [start_date, end_date)"""
     if current_user.role != "hotel_owner":
         raise HTTPException(status_code=403, detail="Hotel owner access required")
+    try:
+        period_start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        period_end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if period_end and period_end <= (period_start or date.today()):
+        raise HTTPException(status_code=400, detail="End date must be after start date")
     
     # Verify hotel ownership
     hotel = db.query(models.Hotel).filter(models.Hotel.id == hotel_id, models.Hotel.owner_id == current_user.id).first()
@@ -1324,10 +1513,10 @@ def get_hotel_booking_statistics(
         raise HTTPException(status_code=404, detail="Hotel not found or access denied")
     
     try:
-        statistics = crud.get_hotel_booking_statistics(db, hotel_id)
+        statistics = crud.get_hotel_booking_statistics(db, hotel_id, period_start, period_end)
         return statistics
     except Exception as e:
-        print(f"❌ Error getting hotel booking statistics: {e}")
+        logger.error("Error getting hotel booking statistics: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load statistics")
 
 # Keep original Item endpoints for compatibility
@@ -1447,8 +1636,8 @@ def seed_data(db: Session = Depends(get_db)):
 # SQL: Complex queries for user management data aggregation with joins across multiple tables
 # Function: Retrieves comprehensive user management data for admin dashboard
 @app.get("/admin/users/management", response_model=List[schemas.UserManagementData])
-async def get_user_management_data(
-    current_user: models.User = Depends(get_current_user),
+def get_user_management_data(
+    current_user: schemas.TokenData = Depends(get_current_user_claims),
     db: Session = Depends(get_db)
 ):
     """Get all user management data (admin only)"""
@@ -1460,7 +1649,7 @@ async def get_user_management_data(
 # SQL: SELECT * FROM users WHERE id = ?; UPDATE users SET status = ?, updated_at = ? WHERE id = ?;
 # Function: Updates user status with admin-only access and self-deletion prevention
 @app.put("/admin/users/{user_id}/status")
-async def update_user_status(
+def update_user_status(
     user_id: int,
     status_update: schemas.UpdateUserStatusRequest,
     current_user: models.User = Depends(get_current_user),
@@ -1497,7 +1686,7 @@ async def update_user_status(
 # SQL: SELECT * FROM guides WHERE id = ?;
 # Function: Retrieves guide profile by ID
 @app.get("/guides/{guide_id}")
-def get_guide_profile(guide_id: int, db: Session = Depends(get_db)):
+def get_guide_profile(guide_id: int, db: Session = Depends(get_read_db)):
     """Get guide profile by ID"""
     guide = crud.get_guide(db, guide_id=guide_id)
     if guide is None:
@@ -1507,7 +1696,7 @@ def get_guide_profile(guide_id: int, db: Session = Depends(get_db)):
 # SQL: SELECT * FROM guides WHERE user_id = ?;
 # Function: Retrieves guide profile by user ID
 @app.get("/guides/user/{user_id}")
-def get_guide_by_user(user_id: int, db: Session = Depends(get_db)):
+def get_guide_by_user(user_id: int, db: Session = Depends(get_read_db)):
     """Get guide profile by user ID"""
     guide = crud.get_guide_by_user_id(db, user_id=user_id)
     if guide is None:
@@ -1520,45 +1709,45 @@ def get_guide_by_user(user_id: int, db: Session = Depends(get_db)):
 def create_guide_profile(guide: schemas.GuideBase, db: Session = Depends(get_db), current_user: schemas.User = Depends(get_current_user)):
     """Create new guide profile"""
     try:
-        print(f"🔍 === GUIDE PROFILE CREATION START ===")
-        print(f"🔍 Current user: ID={current_user.id}, Email={current_user.email}, Role={current_user.role}")
+        logger.debug("=== GUIDE PROFILE CREATION START ===")
+        logger.debug("Current user: ID=%s, Email=%s, Role=%s", current_user.id, current_user.email, current_user.role)
         
         if current_user.role != "guide":
-            print(f"❌ User role {current_user.role} is not 'guide'")
+            logger.warning("User role %s is not 'guide'", current_user.role)
             raise HTTPException(status_code=403, detail="Only guides can create profiles")
         
         # Check if profile already exists
         existing_guide = crud.get_guide_by_user_id(db, user_id=current_user.id)
         if existing_guide:
-            print(f"❌ Guide profile already exists for user {current_user.id}")
+            logger.warning("Guide profile already exists for user %s", current_user.id)
             raise HTTPException(status_code=400, detail="Guide profile already exists")
         
-        # Debug logging
-        print(f"🔍 Received guide data: {guide.dict()}")
-        print(f"🔍 Guide data types: {[(k, type(v)) for k, v in guide.dict().items()]}")
+        # Debug logging; guarded since building the arguments costs more than the call
+        if logger.isEnabledFor(logging.DEBUG):
+            received = guide.dict()
+            logger.debug("Received guide data: %s", received)
+            logger.debug("Guide data types: %s", [(k, type(v)) for k, v in received.items()])
         
         # Create guide profile with user_id added
         guide_data = guide.dict()
         guide_data["user_id"] = current_user.id
-        print(f"🔍 Final guide data with user_id: {guide_data}")
+        logger.debug("Final guide data with user_id: %s", guide_data)
         
         # Create the GuideCreate object with all required fields
-        print(f"🔍 Creating GuideCreate schema object...")
+        logger.debug("Creating GuideCreate schema object...")
         guide_create = schemas.GuideCreate(**guide_data)
-        print(f"🔍 GuideCreate object created successfully: {guide_create.dict()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("GuideCreate object created successfully: %s", guide_create.dict())
         
         # Call CRUD function
-        print(f"🔍 Calling crud.create_guide...")
+        logger.debug("Calling crud.create_guide...")
         result = crud.create_guide(db, guide=guide_create)
-        print(f"🔍 Guide created successfully with ID: {result.id}")
+        logger.info("Guide created successfully with ID: %s", result.id)
         
         return result
         
     except Exception as e:
-        print(f"❌ ERROR in create_guide_profile: {str(e)}")
-        print(f"❌ Error type: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("ERROR in create_guide_profile: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 # SQL: SELECT * FROM guides WHERE id = ?; UPDATE guides SET ... WHERE id = ?;
@@ -1603,24 +1792,22 @@ def delete_guide_profile(guide_id: int, db: Session = Depends(get_db), current_u
 # SQL: SELECT * FROM guides WHERE destination_id = ?;
 # Function: Retrieves guides filtered by destination ID for travelers
 @app.get("/guides/by-destination/{destination_id}")
-def get_guides_by_destination(destination_id: int, db: Session = Depends(get_db)):
+async def get_guides_by_destination(destination_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get guides filtered by destination ID for travelers"""
     try:
-        print(f"🔍 Getting guides for destination ID: {destination_id}")
-        guides = crud.get_guides_by_destination(db, destination_id=destination_id)
-        print(f"✅ Found {len(guides)} guides for destination {destination_id}")
+        logger.debug("Getting guides for destination ID: %s", destination_id)
+        guides = await async_crud.get_guides_by_destination(db, destination_id=destination_id)
+        logger.debug("Found %s guides for destination %s", len(guides), destination_id)
         return guides
     except Exception as e:
-        print(f"❌ Error getting guides by destination: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting guides by destination: %s", e)
         raise HTTPException(status_code=500, detail="Failed to load guides")
 
 # Guide Reviews Endpoints
 # SQL: SELECT * FROM guides WHERE id = ?; SELECT * FROM guide_reviews WHERE guide_id = ? LIMIT ? OFFSET ?;
 # Function: Retrieves paginated reviews for a specific guide with guide existence validation
 @app.get("/guides/{guide_id}/reviews")
-def get_guide_reviews(guide_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_guide_reviews(guide_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get reviews for a guide"""
     guide = crud.get_guide(db, guide_id=guide_id)
     if guide is None:
@@ -0,0 +1,202 @@
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+from typing import Callable, Dict, List, Optional, Tuple
+from . import query_budget
+import time
+
+# In-process request metrics rendered in Prometheus text format at /metrics.
+# All request-side updates happen on the event loop thread, so no locks are
+# needed; DB timings are collected per request through a context variable.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Fixed-bucket histogram (bucket counts stored non-cumulative)"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class RequestDbUsage:
+    """DB time, query count and statements accumulated by one request"""
+
+    __slots__ = ("scope", "seconds", "queries", "statements")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.seconds = 0.0
+        self.queries = 0
+        self.statements = Counter()
+
+    def statement_shapes(self) -> Counter:
+        """Statement counts keyed by normalized shape"""
+        shapes = Counter()
+        for statement, count in self.statements.items():
+            shapes[query_budget.statement_shape(statement)] += count
+        return shapes
+
+# Set by the middleware for the duration of a request; AnyIO copies the
+# context into worker threads, so sync routes update the same object
+_request_db_usage: ContextVar[Optional[RequestDbUsage]] = ContextVar("request_db_usage", default=None)
+
+# Templated route path per endpoint, filled on first use
+_route_paths: Dict[object, str] = {}
+
+def route_path(scope) -> str:
+    """Templated path of the route that handled scope (e.g. /hotels/{hotel_id}), or unmatched"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        # Nothing matched (404/405); one label instead of one per raw path
+        return "unmatched"
+    path = _route_paths.get(endpoint)
+    if path is None:
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                path = route.path
+                break
+        else:
+            path = "unmatched"
+        _route_paths[endpoint] = path
+    return path
+
+def current_route() -> Optional[str]:
+    """"METHOD /templated/path" of the request being handled in this context, if any"""
+    db_usage = _request_db_usage.get()
+    if db_usage is None or db_usage.scope is None:
+        return None
+    return f"{db_usage.scope['method']} {route_path(db_usage.scope)}"
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.db_time: Dict[Tuple[str, str], Histogram] = {}
+        self.db_queries: Dict[Tuple[str, str], int] = {}
+        self.in_flight = 0
+        # Callables returning extra exposition lines (metrics owned by other modules)
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> Callable[[], List[str]]:
+        """Append collector()'s lines to every render (usable as a decorator)"""
+        self.collectors.append(collector)
+        return collector
+
+    def record(self, method: str, route: str, status: int, seconds: float, db_usage: RequestDbUsage):
+        key = (method, route)
+        status_key = (method, route, str(status))
+        self.requests[status_key] = self.requests.get(status_key, 0) + 1
+        if key not in self.latency:
+            self.latency[key] = Histogram()
+            self.db_time[key] = Histogram()
+            self.db_queries[key] = 0
+        self.latency[key].observe(seconds)
+        self.db_time[key].observe(db_usage.seconds)
+        self.db_queries[key] += db_usage.queries
+
+    @staticmethod
+    def _render_histogram(lines, name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = f'method="{method}",route="{_label(route)}"'
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        lines = [
+            "# HELP http_requests_total Total HTTP requests by route and status",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        self._render_histogram(lines, "http_request_duration_seconds", "Request latency by route", self.latency)
+        self._render_histogram(lines, "http_request_db_seconds", "Time spent in database queries per request", self.db_time)
+        lines += [
+            "# HELP http_request_db_queries_total Database queries issued by route",
+            "# TYPE http_request_db_queries_total counter",
+        ]
+        for (method, route), count in sorted(self.db_queries.items()):
+            lines.append(f'http_request_db_queries_total{{method="{method}",route="{_label(route)}"}} {count}')
+        for collector in self.collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording count, status, latency and DB time per templated route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        db_usage = RequestDbUsage(scope)
+        status_code = 500
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if query_budget.DEBUG:
+                    message["headers"] = list(message.get("headers", [])) + query_budget.debug_headers(db_usage.queries, db_usage.seconds)
+            await send(message)
+
+        token = _request_db_usage.set(db_usage)
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.in_flight -= 1
+            _request_db_usage.reset(token)
+            route = route_path(scope)
+            metrics.record(scope["method"], route, status_code, elapsed, db_usage)
+            if db_usage.queries >= query_budget.QUERY_REPEAT_THRESHOLD:
+                query_budget.report_repeated_statements(scope["method"], route, db_usage.statement_shapes())
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_db_usage.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db_usage = _request_db_usage.get()
+    if db_usage is not None and conn.info.get("query_start"):
+        db_usage.seconds += time.perf_counter() - conn.info["query_start"].pop()
+        db_usage.queries += 1
+        db_usage.statements[statement] += 1
+
+def instrument_engine(engine):
+    """Attribute the engine's query time to the current request"""
+    engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
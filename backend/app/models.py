@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, DECIMAL, Enum, TIMESTAMP, Date
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, DECIMAL, Enum, TIMESTAMP, Date, UniqueConstraint, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
-import bcrypt
+from . import password_hashing
 from datetime import datetime
 
 class User(Base):
@@ -29,10 +29,10 @@ class User(Base):
     assigned_requests = relationship("GuestRequest", back_populates="assigned_user", lazy="dynamic")
     
     def set_password(self, password: str):
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password_hash = password_hashing.hash_password(password)
     
     def verify_password(self, password: str) -> bool:
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return password_hashing.verify_password(password, self.password_hash)
     
     def to_dict(self):
         """Convert user to dictionary (excluding password)"""
@@ -278,10 +278,10 @@ class AdminUser(Base):
     updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
 
     def set_password(self, password: str):
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password_hash = password_hashing.hash_password(password)
 
     def verify_password(self, password: str) -> bool:
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return password_hashing.verify_password(password, self.password_hash)
 
     def to_dict(self):
         return {
@@ -400,8 +400,10 @@ class Guide(Base):
     destination = relationship("Destination", back_populates="guides")
     reviews = relationship("GuideReview", back_populates="guide", cascade="all, delete-orphan", lazy="dynamic")
     
-    def to_dict(self):
-        """Convert guide to dictionary"""
+    def to_dict(self, reviews=None):
+        """Convert guide to dictionary (pass reviews to skip loading the dynamic relationship)"""
+        if reviews is None:
+            reviews = self.reviews
         return {
             "id": self.id,
             "user_id": self.user_id,
@@ -423,7 +425,7 @@ class Guide(Base):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "user": self.user.to_dict() if self.user else None,
             "destination": self.destination.to_dict() if self.destination else None,
-            "reviews": [review.to_dict() for review in self.reviews] if self.reviews else []
+            "reviews": [review.to_dict() for review in reviews]
         }
 
 
@@ -494,6 +496,7 @@ class HotelRoomType(Base):
 
 class RoomAvailability(Base):
     __tablename__ = "room_availability"
+    __table_args__ = (UniqueConstraint("hotel_id", "room_type", "date", name="unique_hotel_room_date"),)
     
     availability_id = Column(Integer, primary_key=True, index=True)
     hotel_id = Column(Integer, ForeignKey("hotels.id"), nullable=False)
@@ -523,6 +526,8 @@ class RoomAvailability(Base):
 
 class HotelBooking(Base):
     __tablename__ = "hotel_bookings"
+    # The hold sweep reads only pending bookings past their expiry from this index
+    __table_args__ = (Index("idx_booking_hold", "booking_status", "hold_expires_at"),)
     
     booking_id = Column(Integer, primary_key=True, index=True)
     hotel_id = Column(Integer, ForeignKey("hotels.id"), nullable=False)
@@ -533,6 +538,7 @@ class HotelBooking(Base):
     num_guests = Column(Integer, default=1)
     total_price = Column(DECIMAL(10, 2), nullable=False)
     booking_status = Column(Enum('pending', 'confirmed', 'checked_in', 'checked_out', 'cancelled'), default='pending')
+    hold_expires_at = Column(DateTime)  # UTC; a pending booking's rooms are released after this
     special_requests = Column(Text)
     created_at = Column(TIMESTAMP, default=func.now())
     updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
@@ -553,6 +559,7 @@ class HotelBooking(Base):
             "num_guests": self.num_guests,
             "total_price": float(self.total_price) if self.total_price else 0.0,
             "booking_status": self.booking_status,
+            "hold_expires_at": self.hold_expires_at.isoformat() if self.hold_expires_at else None,
             "special_requests": self.special_requests,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
@@ -589,3 +596,14 @@ class GuestRequest(Base):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None
         }
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    key_hash = Column(String(64), primary_key=True)  # sha256 of the caller's credentials and Idempotency-Key
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer)  # NULL while the first request is running
+    content_type = Column(String(100))
+    response_body = Column(LargeBinary)
+    created_at = Column(TIMESTAMP, default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
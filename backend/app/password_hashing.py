@@ -0,0 +1,71 @@
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+import os
+import threading
+
+# bcrypt cost factor for new hashes; existing hashes are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Worker processes for hashing; 0 hashes inline on the calling thread
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# Hash jobs allowed to be queued or running before new ones are refused
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(PASSWORD_HASH_WORKERS, 1) * 4)))
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503"""
+    pass
+
+# Worker functions (module level so they can be pickled into the process pool)
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(max(PASSWORD_HASH_MAX_PENDING, 1))
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    return _executor
+
+def _run(fn, *args):
+    """Run fn in the worker pool, blocking the caller until it finishes"""
+    if PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+    if not _pending.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing queue is full")
+    try:
+        return _get_executor().submit(fn, *args).result()
+    finally:
+        _pending.release()
+
+def hash_password(password: str) -> str:
+    """Hash a password with the configured bcrypt cost"""
+    return _run(_hashpw, password.encode('utf-8'), BCRYPT_ROUNDS).decode('utf-8')
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Check a password against a bcrypt hash"""
+    return _run(_checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+def needs_rehash(password_hash: str) -> bool:
+    """True when a hash was made with a different cost than BCRYPT_ROUNDS"""
+    # bcrypt hashes look like $2b$12$<salt+hash>
+    parts = password_hash.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return True
+    return int(parts[2]) != BCRYPT_ROUNDS
+
+def shutdown():
+    """Stop the worker processes (called on application shutdown)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,69 @@
+from typing import Optional
+from .ttl_cache import TTLCache
+import os
+
+# Authenticated-user cache settings
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+
+class Principal:
+    """Read-only snapshot of a user, safe to share across requests and sessions"""
+
+    __slots__ = ("id", "email", "name", "phone", "role", "created_at", "updated_at")
+
+    def __init__(self, id, email, name, phone, role, created_at=None, updated_at=None):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.phone = phone
+        self.role = role
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            phone=user.phone,
+            role=user.role,
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+
+    def to_dict(self):
+        """Same shape as User.to_dict (excluding password)"""
+        return {
+            'id': self.id,
+            'email': self.email,
+            'name': self.name,
+            'phone': self.phone,
+            'role': self.role,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class PrincipalCache:
+    """In-process TTL + LRU cache of principals keyed by token subject (email)"""
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_size: int = PRINCIPAL_CACHE_SIZE):
+        self._entries = TTLCache(ttl, max_size)
+
+    def get(self, subject: str) -> Optional[Principal]:
+        return self._entries.get(subject)
+
+    def put(self, principal: Principal) -> Principal:
+        return self._entries.put(principal.email, principal)
+
+    def invalidate(self, subject: str):
+        self._entries.pop(subject)
+
+    def invalidate_user(self, user_id: int):
+        """Drop the cached principal for a user id (after update, delete or status change)"""
+        self._entries.discard_where(lambda subject, principal: principal.id == user_id)
+
+    def clear(self):
+        self._entries.clear()
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,154 @@
+from collections import Counter
+from dotenv import load_dotenv
+from urllib.parse import parse_qs
+import anyio.to_thread
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+
+# On-demand request profiling for admins.
+# A request with ?__profile=1 or an "X-Profile: 1" header, sent by an admin
+# while PROFILING_ENABLED is on, is run under a sampling profiler. Instead of
+# the normal body it returns the sampled stacks in collapsed format
+# ("frame;frame;frame count" per line, ready for flamegraph.pl/speedscope),
+# with a per-category breakdown in the X-Profile-Breakdown header.
+#
+# Sync routes run on worker threads, so the sampler reads every thread's
+# stack rather than profiling one thread; samples from requests running
+# concurrently on the same process can appear in the profile.
+#
+# The sampler needs the GIL to take a sample. While a request is CPU-bound in
+# Python it gets a turn once per interpreter switch interval (5 ms by default),
+# so the effective sample rate there is the slower of the two. The switch
+# interval is process-wide and is deliberately left alone.
+
+load_dotenv()
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "1"))
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# A stack with none of these frames is an idle thread (pool worker waiting, event loop polling)
+_ACTIVE_PATHS = (_APP_DIR, f"{os.sep}fastapi{os.sep}", f"{os.sep}sqlalchemy{os.sep}", f"{os.sep}pydantic")
+# A sample counts toward the first category (in this order) with a matching frame
+_CATEGORIES = (
+    ("db_io", lambda path, name: name in ("do_execute", "do_executemany", "do_execute_no_params") or f"{os.sep}mysql{os.sep}" in path or "aiomysql" in path or "sqlite" in path),
+    ("orm_hydration", lambda path, name: f"{os.sep}sqlalchemy{os.sep}orm{os.sep}" in path),
+    ("to_dict", lambda path, name: name == "to_dict"),
+    ("pydantic", lambda path, name: f"{os.sep}pydantic" in path or f"{os.sep}fastapi{os.sep}encoders.py" in path),
+    ("app", lambda path, name: path.startswith(_APP_DIR)),
+)
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get("__name__", os.path.basename(frame.f_code.co_filename))
+    return f"{module}.{frame.f_code.co_name}"
+
+def _categorize(frames) -> str:
+    for name, matches in _CATEGORIES:
+        for frame in frames:
+            if matches(frame.f_code.co_filename, frame.f_code.co_name):
+                return name
+    return "other"
+
+class SamplingProfiler:
+    """Samples the stacks of all busy threads on a background thread"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+        self.categories = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            if not any(path in f.f_code.co_filename for f in frames for path in _ACTIVE_PATHS):
+                continue
+            self.stacks[";".join(_frame_label(f) for f in reversed(frames))] += 1
+            self.categories[_categorize(frames)] += 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def breakdown(self) -> str:
+        return ",".join(f"{name}={count}" for name, count in self.categories.most_common())
+
+def profile_requested(scope) -> bool:
+    if b"__profile=1" in scope.get("query_string", b""):
+        return parse_qs(scope["query_string"].decode()).get("__profile") == ["1"]
+    return any(name == b"x-profile" and value == b"1" for name, value in scope.get("headers", []))
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware serving a sampled profile in place of the response for authorized requests.
+
+    authorize(authorization_header) -> bool runs on a worker thread and
+    decides whether the caller may profile (the admin role check).
+    """
+
+    def __init__(self, app, authorize):
+        self.app = app
+        self.authorize = authorize
+        # One profile at a time keeps the samples attributable
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if not PROFILING_ENABLED or scope["type"] != "http" or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+        authorization = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"authorization"), "")
+        if not await anyio.to_thread.run_sync(self.authorize, authorization):
+            await self.app(scope, receive, send)
+            return
+
+        response_start = {}
+        async def discard_body(message):
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+
+        async with self._lock:
+            start = time.perf_counter()
+            with SamplingProfiler(PROFILE_SAMPLE_INTERVAL_MS / 1000) as profiler:
+                await self.app(scope, receive, discard_body)
+            elapsed = time.perf_counter() - start
+
+        logger.info("Profiled %s %s: %d samples in %.1f ms", scope["method"], scope["path"], profiler.samples, elapsed * 1000)
+        body = profiler.collapsed().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profile-status", str(response_start.get("status", 500)).encode()),
+                (b"x-profile-duration-ms", f"{elapsed * 1000:.1f}".encode()),
+                (b"x-profile-samples", str(profiler.samples).encode()),
+                (b"x-profile-breakdown", profiler.breakdown().encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
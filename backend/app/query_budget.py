@@ -0,0 +1,99 @@
+from collections import Counter
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+import os
+import re
+
+# Per-request query budgets and N+1 detection.
+# MetricsMiddleware counts every statement a request issues (see metrics.py);
+# this module turns those counts into a repeated-statement warning, the
+# X-DB-Queries debug header, and a helper for asserting budgets in tests.
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Adds X-DB-Queries / X-DB-Time-Ms to every response
+DEBUG = os.getenv("DEBUG", "False").lower() in ("1", "true", "yes")
+# A statement shape issued this many times in one request is logged as a likely N+1
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
+_WHITESPACE = re.compile(r"\s+")
+# IN lists expand to one placeholder per value; collapse them so batches of different sizes match
+_IN_LIST = re.compile(r"\bIN \((?:\s*(?:\?|%s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.I)
+_NUMBER = re.compile(r"\b\d+\b")
+
+def statement_shape(statement: str) -> str:
+    """Statement with whitespace, IN lists and inline numbers normalized"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _NUMBER.sub("N", shape)
+
+def repeated_statements(statements: Counter, threshold: int = None):
+    """(shape, count) pairs issued at least threshold times, most repeated first"""
+    threshold = threshold or QUERY_REPEAT_THRESHOLD
+    return [(shape, count) for shape, count in statements.most_common() if count >= threshold]
+
+def report_repeated_statements(method: str, route: str, statements: Counter):
+    """Log statements a request repeated often enough to be an N+1 pattern"""
+    for shape, count in repeated_statements(statements):
+        logger.warning(
+            "Possible N+1: %s %s issued the same statement %d times: %s",
+            method, route, count, shape,
+            extra={"route": route, "repeat_count": count, "statement": shape}
+        )
+
+def debug_headers(queries: int, seconds: float):
+    """Raw ASGI headers describing a request's DB usage"""
+    return [
+        (b"x-db-queries", str(queries).encode()),
+        (b"x-db-time-ms", f"{seconds * 1000:.2f}".encode()),
+    ]
+
+class QueryBudgetExceeded(AssertionError):
+    """More queries than the budget allowed"""
+    pass
+
+class QueryLog:
+    """Statements captured by count_queries()"""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def shapes(self) -> Counter:
+        return Counter(statement_shape(statement) for statement in self.statements)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries():
+    """Capture every statement run on any engine (any thread) inside the block.
+
+    For tests:
+        with count_queries() as log:
+            client.get("/hotels/by-destination/1")
+        assert log.count <= 3
+    """
+    log = QueryLog()
+    event.listen(Engine, "after_cursor_execute", log._after_cursor_execute)
+    try:
+        yield log
+    finally:
+        event.remove(Engine, "after_cursor_execute", log._after_cursor_execute)
+
+def assert_query_budget(client, method: str, path: str, max_queries: int, **kwargs):
+    """Issue a request with a test client and fail if it runs more than max_queries statements"""
+    with count_queries() as log:
+        response = client.request(method, path, **kwargs)
+    if log.count > max_queries:
+        details = "\n".join(f"  {count}x {shape}" for shape, count in log.shapes().most_common())
+        raise QueryBudgetExceeded(f"{method} {path} ran {log.count} queries (budget {max_queries}):\n{details}")
+    return response
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from . import models
+from .ttl_cache import TTLCache
+import os
+
+# Stay price quotes.
+# A stay costs the room_availability.price_per_night of each night in
+# [check_in, check_out); nights without an availability row are charged the
+# room type's base_price_per_night. Quotes are fetched in one round trip and
+# cached briefly per (hotel, room type, dates); booking creation prices the
+# nights it has locked instead of reading the cache.
+
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "30"))
+QUOTE_CACHE_SIZE = int(os.getenv("QUOTE_CACHE_SIZE", "4096"))
+# Longest stay that can be quoted
+MAX_QUOTE_NIGHTS = 365
+
+class Quote:
+    """Total price of a stay with the rate charged for each night"""
+
+    __slots__ = ("hotel_id", "room_type", "check_in", "check_out", "base_price_per_night", "nightly_rates", "total_price")
+
+    def __init__(self, hotel_id: int, room_type: str, check_in: date, check_out: date, base_price_per_night: Decimal, nightly_rates: List[tuple]):
+        self.hotel_id = hotel_id
+        self.room_type = room_type
+        self.check_in = check_in
+        self.check_out = check_out
+        self.base_price_per_night = base_price_per_night
+        # (night, price, "availability" or "base") per night of the stay
+        self.nightly_rates = nightly_rates
+        self.total_price = sum((price for _, price, _ in nightly_rates), Decimal("0"))
+
+    def to_dict(self):
+        return {
+            "hotel_id": self.hotel_id,
+            "room_type": self.room_type,
+            "check_in_date": self.check_in.isoformat(),
+            "check_out_date": self.check_out.isoformat(),
+            "nights": len(self.nightly_rates),
+            "base_price_per_night": float(self.base_price_per_night),
+            "total_price": float(self.total_price),
+            "nightly_rates": [
+                {"date": night.isoformat(), "price_per_night": float(price), "rate": rate}
+                for night, price, rate in self.nightly_rates
+            ]
+        }
+
+def price_stay(hotel_id: int, room_type: str, check_in: date, check_out: date, base_price_per_night: Decimal, rates: Dict[date, Decimal]) -> Quote:
+    """Quote from the per-night rates found (date -> price_per_night), falling back to the base price"""
+    nightly_rates = []
+    for offset in range((check_out - check_in).days):
+        night = check_in + timedelta(days=offset)
+        price = rates.get(night)
+        if price is None:
+            nightly_rates.append((night, Decimal(base_price_per_night), "base"))
+        else:
+            nightly_rates.append((night, Decimal(price), "availability"))
+    return Quote(hotel_id, room_type, check_in, check_out, Decimal(base_price_per_night), nightly_rates)
+
+def fetch_quote(db: Session, hotel_id: int, room_type: str, check_in: date, check_out: date) -> Optional[Quote]:
+    """Quote a stay in one query; None if the hotel has no such room type"""
+    availability = models.RoomAvailability
+    # The outer join returns the base price even when no night has a rate
+    # SQL: SELECT hotel_room_types.base_price_per_night, room_availability.date, room_availability.price_per_night FROM hotel_room_types LEFT OUTER JOIN room_availability ON room_availability.hotel_id = hotel_room_types.hotel_id AND room_availability.room_type = hotel_room_types.room_type_name AND room_availability.date >= ? AND room_availability.date < ? WHERE hotel_room_types.hotel_id = ? AND hotel_room_types.room_type_name = ?
+    rows = db.execute(
+        select(models.HotelRoomType.base_price_per_night, availability.date, availability.price_per_night)
+        .outerjoin(availability, and_(
+            availability.hotel_id == models.HotelRoomType.hotel_id,
+            availability.room_type == models.HotelRoomType.room_type_name,
+            availability.date >= check_in,
+            availability.date < check_out
+        ))
+        .filter(models.HotelRoomType.hotel_id == hotel_id, models.HotelRoomType.room_type_name == room_type)
+    ).all()
+    if not rows:
+        return None
+    rates = {night: price for _, night, price in rows if night is not None}
+    return price_stay(hotel_id, room_type, check_in, check_out, rows[0].base_price_per_night, rates)
+
+class QuoteCache:
+    """In-process TTL + LRU cache of quotes keyed by (hotel_id, room_type, check_in, check_out)"""
+
+    def __init__(self, ttl: float = QUOTE_CACHE_TTL, max_size: int = QUOTE_CACHE_SIZE):
+        self._entries = TTLCache(ttl, max_size)
+
+    def get(self, key: tuple) -> Optional[Quote]:
+        return self._entries.get(key)
+
+    def put(self, quote: Quote) -> Quote:
+        return self._entries.put((quote.hotel_id, quote.room_type, quote.check_in, quote.check_out), quote)
+
+    def invalidate_hotel(self, hotel_id: int):
+        """Drop a hotel's quotes (after its rates or room types change)"""
+        self._entries.discard_where(lambda key, quote: key[0] == hotel_id)
+
+    def clear(self):
+        self._entries.clear()
+
+quote_cache = QuoteCache()
+
+def get_quote(db: Session, hotel_id: int, room_type: str, check_in: date, check_out: date) -> Optional[Quote]:
+    """Cached quote for a stay; None if the hotel has no such room type"""
+    quote = quote_cache.get((hotel_id, room_type, check_in, check_out))
+    if quote is None:
+        quote = fetch_quote(db, hotel_id, room_type, check_in, check_out)
+        if quote is not None:
+            quote_cache.put(quote)
+    return quote
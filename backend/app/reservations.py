@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from sqlalchemy import and_, case, exists, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List
+from . import models, inventory_engine
+
+# Room inventory reservation.
+# A stay reserves one room on every night in [check_in, check_out). The whole
+# range is locked, checked and decremented inside the caller's transaction,
+# so the booking row and the inventory change commit (or roll back) together
+# and concurrent bookings for the same nights queue on the row locks.
+
+class RoomsUnavailable(ValueError):
+    """A night in the requested range has no inventory row or no free room"""
+    pass
+
+class BookingClosed(ValueError):
+    """The booking is cancelled and its nights are back in inventory"""
+    pass
+
+def lock_nights(db: Session, hotel_id: int, room_type: str, check_in: date, check_out: date) -> List[models.RoomAvailability]:
+    """Availability rows for the stay, locked until the transaction ends, in date order"""
+    # SQL: SELECT * FROM room_availability WHERE hotel_id = ? AND room_type = ? AND date >= ? AND date < ? ORDER BY date FOR UPDATE
+    return db.query(models.RoomAvailability).filter(
+        models.RoomAvailability.hotel_id == hotel_id,
+        models.RoomAvailability.room_type == room_type,
+        models.RoomAvailability.date >= check_in,
+        models.RoomAvailability.date < check_out
+    ).order_by(models.RoomAvailability.date).with_for_update().all()
+
+def reserve_nights(db: Session, hotel_id: int, room_type: str, check_in: date, check_out: date, rooms: int = 1) -> List[models.RoomAvailability]:
+    """Take rooms on every night of the stay, or raise RoomsUnavailable and change nothing.
+
+    Does not commit: the caller commits together with the booking, or rolls
+    back on RoomsUnavailable.
+    """
+    nights = (check_out - check_in).days
+    locked = lock_nights(db, hotel_id, room_type, check_in, check_out)
+    if len(locked) < nights:
+        stocked = {night.date for night in locked}
+        missing = next(check_in + timedelta(days=i) for i in range(nights) if check_in + timedelta(days=i) not in stocked)
+        raise RoomsUnavailable(f"No {room_type} inventory for {missing.isoformat()}")
+    full = [night.date for night in locked if night.available_rooms < rooms]
+    if full:
+        raise RoomsUnavailable(f"No {room_type} rooms available on {full[0].isoformat()}")
+
+    # The availability guard repeats the check in the UPDATE itself, so the
+    # reservation stays correct on databases that ignore FOR UPDATE (SQLite)
+    # SQL: UPDATE room_availability SET available_rooms = available_rooms - ? WHERE hotel_id = ? AND room_type = ? AND date >= ? AND date < ? AND available_rooms >= ?
+    result = db.execute(
+        update(models.RoomAvailability)
+        .where(
+            models.RoomAvailability.hotel_id == hotel_id,
+            models.RoomAvailability.room_type == room_type,
+            models.RoomAvailability.date >= check_in,
+            models.RoomAvailability.date < check_out,
+            models.RoomAvailability.available_rooms >= rooms
+        )
+        .values(available_rooms=models.RoomAvailability.available_rooms - rooms)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != nights:
+        raise RoomsUnavailable(f"No {room_type} rooms available for the whole stay")
+    # Keep the returned rows current without flushing a second UPDATE per night
+    for night in locked:
+        set_committed_value(night, "available_rooms", night.available_rooms - rooms)
+    inventory_engine.stage(db, "reserve", hotel_id, room_type, check_in, check_out, rooms)
+    return locked
+
+def release_nights(db: Session, hotel_id: int, room_type: str, check_in: date, check_out: date, rooms: int = 1) -> int:
+    """Return rooms to every night of a stay; returns the number of nights updated.
+
+    Nights already at total_rooms are left alone, so inventory never exceeds
+    capacity (e.g. for stays booked before nights were reserved). Does not commit.
+    """
+    # SQL: UPDATE room_availability SET available_rooms = available_rooms + ? WHERE hotel_id = ? AND room_type = ? AND date >= ? AND date < ? AND available_rooms + ? <= total_rooms
+    result = db.execute(
+        update(models.RoomAvailability)
+        .where(
+            models.RoomAvailability.hotel_id == hotel_id,
+            models.RoomAvailability.room_type == room_type,
+            models.RoomAvailability.date >= check_in,
+            models.RoomAvailability.date < check_out,
+            models.RoomAvailability.available_rooms + rooms <= models.RoomAvailability.total_rooms
+        )
+        .values(available_rooms=models.RoomAvailability.available_rooms + rooms)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        inventory_engine.stage(db, "release", hotel_id, room_type, check_in, check_out, rooms)
+    return result.rowcount
+
+def release_bookings(db: Session, bookings) -> int:
+    """Return one room per night to every night of each booking, for a whole batch in one statement.
+
+    bookings are rows with booking_id, hotel_id, check_in_date and
+    check_out_date. Nights are capped at total_rooms. Returns the number of
+    nights updated. Does not commit.
+    """
+    if not bookings:
+        return 0
+    availability = models.RoomAvailability
+    booking = models.HotelBooking
+    stays = and_(
+        booking.booking_id.in_([held.booking_id for held in bookings]),
+        booking.hotel_id == availability.hotel_id,
+        booking.room_type == availability.room_type,
+        booking.check_in_date <= availability.date,
+        booking.check_out_date > availability.date
+    )
+    restored = availability.available_rooms + select(func.count()).select_from(booking).where(stays).scalar_subquery()
+    # SQL: UPDATE room_availability SET available_rooms = LEAST(available_rooms + (SELECT COUNT(*) FROM hotel_bookings WHERE booking_id IN (...) AND hotel_id = room_availability.hotel_id AND room_type = room_availability.room_type AND check_in_date <= room_availability.date AND check_out_date > room_availability.date), total_rooms) WHERE hotel_id IN (...) AND date >= ? AND date < ? AND EXISTS (SELECT * FROM hotel_bookings WHERE booking_id IN (...) AND ...)
+    result = db.execute(
+        update(availability)
+        .where(
+            # Narrow the scan to the batch's hotels and dates before the per-row EXISTS
+            availability.hotel_id.in_({held.hotel_id for held in bookings}),
+            availability.date >= min(held.check_in_date for held in bookings),
+            availability.date < max(held.check_out_date for held in bookings),
+            exists().where(stays)
+        )
+        .values(available_rooms=case((restored > availability.total_rooms, availability.total_rooms), else_=restored))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,84 @@
+from sqlalchemy import inspect, text
+from typing import Dict, FrozenSet
+import os
+import threading
+import time
+
+# How long a schema snapshot is trusted before it is probed again (seconds)
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "300"))
+
+class SchemaCapabilities:
+    """Tables, columns and stored procedures present in one database"""
+
+    def __init__(self, columns: Dict[str, FrozenSet[str]], procedures: FrozenSet[str]):
+        self.columns = columns
+        self.procedures = procedures
+        self.loaded_at = time.monotonic()
+
+    def has_table(self, table: str) -> bool:
+        return table in self.columns
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in self.columns.get(table, ())
+
+    def has_procedure(self, name: str) -> bool:
+        return name.lower() in self.procedures
+
+class SchemaRegistry:
+    """Process-wide cache answering "does table X have column Y" per engine.
+
+    The schema is probed once per engine (at startup, or lazily on first use)
+    and again only after the TTL expires or invalidate() is called.
+    """
+
+    def __init__(self, ttl: float = SCHEMA_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._capabilities: Dict[str, SchemaCapabilities] = {}
+
+    def _load(self, bind) -> SchemaCapabilities:
+        inspector = inspect(bind)
+        # SQL: SELECT ... FROM information_schema.COLUMNS (columns of every table)
+        columns = {
+            table: frozenset(column["name"] for column in table_columns)
+            for (_, table), table_columns in inspector.get_multi_columns().items()
+        }
+        procedures = frozenset()
+        if bind.dialect.name == "mysql":
+            with bind.connect() as connection:
+                # SQL: SELECT ROUTINE_NAME FROM information_schema.ROUTINES WHERE ROUTINE_SCHEMA = DATABASE() AND ROUTINE_TYPE = 'PROCEDURE'
+                rows = connection.execute(text(
+                    "SELECT ROUTINE_NAME FROM information_schema.ROUTINES "
+                    "WHERE ROUTINE_SCHEMA = DATABASE() AND ROUTINE_TYPE = 'PROCEDURE'"
+                ))
+                procedures = frozenset(row[0].lower() for row in rows)
+        return SchemaCapabilities(columns, procedures)
+
+    def get(self, bind) -> SchemaCapabilities:
+        """Capabilities for the engine behind bind, probing only when stale"""
+        engine = getattr(bind, "engine", bind)
+        key = str(engine.url)
+        capabilities = self._capabilities.get(key)
+        if capabilities is None or time.monotonic() - capabilities.loaded_at > self.ttl:
+            with self._lock:
+                capabilities = self._capabilities.get(key)
+                if capabilities is None or time.monotonic() - capabilities.loaded_at > self.ttl:
+                    capabilities = self._load(engine)
+                    self._capabilities[key] = capabilities
+        return capabilities
+
+    def has_table(self, bind, table: str) -> bool:
+        return self.get(bind).has_table(table)
+
+    def has_column(self, bind, table: str, column: str) -> bool:
+        return self.get(bind).has_column(table, column)
+
+    def has_procedure(self, bind, name: str) -> bool:
+        return self.get(bind).has_procedure(name)
+
+    def invalidate(self):
+        """Forget every snapshot, e.g. after running migrations"""
+        with self._lock:
+            self._capabilities.clear()
+
+schema_registry = SchemaRegistry()
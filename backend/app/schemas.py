@@ -197,6 +197,10 @@ class Item(ItemBase):
 class HealthResponse(BaseModel):
     status: str
 
+class DatabaseHealthResponse(BaseModel):
+    status: str
+    pool: dict
+
 # Restaurant schemas
 class RestaurantBase(BaseModel):
     name: str
@@ -473,6 +477,21 @@ class RoomAvailabilityUpdate(BaseModel):
     available_rooms: Optional[int] = None
     price_per_night: Optional[float] = None
 
+class RoomInventoryRange(BaseModel):
+    room_type: str
+    start_date: str  # First night (YYYY-MM-DD)
+    end_date: str  # Last night, inclusive
+    total_rooms: int
+    price_per_night: Optional[float] = None
+    weekday_prices: Optional[List[float]] = None  # Monday..Sunday; used instead of price_per_night
+
+class RoomInventoryBulkUpsert(BaseModel):
+    ranges: List[RoomInventoryRange]
+
+class RoomInventoryBulkResult(BaseModel):
+    inserted: int
+    updated: int
+
 class RoomAvailability(BaseModel):
     availability_id: int
     hotel_id: int
@@ -512,6 +531,7 @@ class HotelBooking(BaseModel):
     num_guests: int
     total_price: float
     booking_status: str
+    hold_expires_at: Optional[str] = None
     special_requests: Optional[str] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
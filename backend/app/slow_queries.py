@@ -0,0 +1,148 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from logging.handlers import RotatingFileHandler
+from sqlalchemy import event
+from typing import List, Optional
+from .logging_config import JsonLinesFormatter
+from . import metrics
+import logging
+import os
+import sys
+import threading
+import time
+
+# Slow-query recorder.
+# Statements slower than SLOW_QUERY_THRESHOLD_MS are captured with their
+# parameters, the route and app function that issued them, and the EXPLAIN
+# plan. The plan is fetched on a separate connection by a background thread,
+# so the slow request is not delayed further. Captures go to a rotating
+# JSON-lines file and are kept in memory for GET /admin/slow-queries.
+
+load_dotenv()
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() in ("1", "true", "yes")
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "logs/slow_queries.jsonl")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", "200"))  # Captures kept for the admin endpoint
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_SKIP_FILES = {os.path.abspath(__file__), os.path.join(_APP_DIR, "metrics.py")}
+# Only read-only statements are explained; EXPLAIN of a write is not worth the risk
+_EXPLAINABLE = ("select", "with")
+_MAX_PARAMETER_LENGTH = 500
+
+def _origin() -> Optional[str]:
+    """module.function:line of the innermost app frame that issued the statement"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_APP_DIR) and filename not in _SKIP_FILES:
+            module = frame.f_globals.get("__name__", "").rpartition(".")[2]
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    # Async engines run the statement in a greenlet that does not see the caller's frames
+    return None
+
+def _format_parameters(parameters) -> str:
+    text = repr(parameters)
+    if len(text) > _MAX_PARAMETER_LENGTH:
+        text = text[:_MAX_PARAMETER_LENGTH] + "..."
+    return text
+
+class SlowQueryRecorder:
+    """Captures slow statements from the engines it is attached to"""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS):
+        self.threshold = threshold_ms / 1000
+        self.recent = deque(maxlen=SLOW_QUERY_BUFFER)
+        self._lock = threading.Lock()
+        self._explaining = threading.local()
+        # One worker: EXPLAINs are queued rather than competing with requests for connections
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._file_handler = None
+
+    def attach(self, engine):
+        """Time every statement run on engine (sync engines only: EXPLAIN reuses the engine)"""
+        if not event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        if elapsed < self.threshold or getattr(self._explaining, "active", False):
+            return
+        capture = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": statement,
+            "parameters": _format_parameters(parameters),
+            "route": metrics.current_route(),
+            "function": _origin(),
+            "plan": None,
+        }
+        explain = SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip().lower().startswith(_EXPLAINABLE)
+        self._executor.submit(self._record, conn.engine, capture, parameters if explain else None)
+
+    def _explain(self, engine, statement: str, parameters) -> List[dict]:
+        """Plan rows for statement, fetched on a fresh connection"""
+        prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+        self._explaining.active = True
+        try:
+            with engine.connect() as conn:
+                result = conn.exec_driver_sql(f"{prefix} {statement}", parameters)
+                columns = list(result.keys())
+                return [dict(zip(columns, row)) for row in result]
+        finally:
+            self._explaining.active = False
+
+    def _record(self, engine, capture: dict, parameters):
+        if parameters is not None:
+            try:
+                capture["plan"] = self._explain(engine, capture["statement"], parameters)
+            except Exception as e:
+                capture["plan_error"] = str(e)
+        with self._lock:
+            self.recent.append(capture)
+        logger.warning("Slow query (%.2f ms) from %s %s", capture["duration_ms"], capture["route"], capture["function"])
+        self._write(capture)
+
+    def _write(self, capture: dict):
+        if not SLOW_QUERY_LOG_FILE:
+            return
+        if self._file_handler is None:
+            directory = os.path.dirname(SLOW_QUERY_LOG_FILE)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file_handler = RotatingFileHandler(
+                SLOW_QUERY_LOG_FILE, maxBytes=SLOW_QUERY_LOG_MAX_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8"
+            )
+            self._file_handler.setFormatter(JsonLinesFormatter())
+        record = logger.makeRecord(logger.name, logging.WARNING, __file__, 0, "Slow query (%.2f ms)", (capture["duration_ms"],), None, extra=capture)
+        self._file_handler.handle(record)
+
+    def captures(self, limit: int = 50) -> List[dict]:
+        """Most recent captures first"""
+        with self._lock:
+            return list(reversed(self.recent))[:limit]
+
+    def shutdown(self):
+        """Finish pending EXPLAINs and close the log file (recording continues with a new worker)"""
+        executor, self._executor = self._executor, ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        executor.shutdown(wait=True)
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
+
+slow_query_recorder = SlowQueryRecorder()
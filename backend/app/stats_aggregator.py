@@ -0,0 +1,192 @@
+from collections import Counter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from . import dashboard_stats, models
+from .dashboard_stats import ROLE_COLUMNS, statistics_snapshot
+from .database import SessionLocal, ReadSessionLocal
+import anyio.to_thread
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often pending deltas are written to admin_statistics (seconds)
+STATS_FLUSH_INTERVAL = float(os.getenv("STATS_FLUSH_INTERVAL", "5"))
+
+# How often admin_statistics is fully recounted to correct drift (seconds)
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+
+# How often the background loop wakes up to check what is due (seconds)
+STATS_JOB_TICK = 1.0
+
+def _rating(value) -> float:
+    return float(value) if value is not None else 0.0
+
+def _rating_delta(deltas: Counter, rating, sign: int):
+    # AVG() ignores NULL ratings, so they count towards neither the sum nor the count
+    if rating is not None:
+        deltas["rating_sum"] += sign * float(rating)
+        deltas["rated_destinations"] += sign
+
+def _user_delta(deltas: Counter, role, sign: int):
+    deltas["total_users"] += sign
+    if role in ROLE_COLUMNS:
+        deltas[ROLE_COLUMNS[role]] += sign
+
+def _object_delta(deltas: Counter, obj, sign: int):
+    """Count an inserted (sign=1) or deleted (sign=-1) row"""
+    if isinstance(obj, models.User):
+        _user_delta(deltas, obj.role, sign)
+    elif isinstance(obj, models.Destination):
+        deltas["total_destinations"] += sign
+        _rating_delta(deltas, obj.rating, sign)
+    elif isinstance(obj, models.BlogPost):
+        deltas["total_blog_posts"] += sign
+    elif isinstance(obj, models.Review):
+        deltas["total_reviews"] += sign
+
+def _update_delta(deltas: Counter, obj):
+    """Count role changes on users and rating changes on destinations"""
+    if isinstance(obj, models.User):
+        history = inspect(obj).attrs.role.history
+        if history.has_changes():
+            for role in history.deleted:
+                _user_delta(deltas, role, -1)
+            for role in history.added:
+                _user_delta(deltas, role, 1)
+    elif isinstance(obj, models.Destination):
+        history = inspect(obj).attrs.rating.history
+        if history.has_changes():
+            for rating in history.deleted:
+                _rating_delta(deltas, rating, -1)
+            for rating in history.added:
+                _rating_delta(deltas, rating, 1)
+
+class StatsAggregator:
+    """Collects admin_statistics deltas from committed writes and applies them in batches.
+
+    Deltas are gathered per session on flush and only handed over once the
+    transaction commits, so rolled-back writes never reach the counters.
+    Writes made outside the ORM (stored procedures, bulk statements) are not
+    seen here and are corrected by the periodic reconcile().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+
+    def add(self, deltas: Counter):
+        with self._lock:
+            self._pending.update(deltas)
+
+    def take(self) -> Counter:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        # Keep negative deltas (deletes); drop the ones that cancelled out
+        return Counter({column: delta for column, delta in pending.items() if delta})
+
+    def flush(self, db: Session) -> bool:
+        """Apply pending deltas to admin_statistics in one locked read-modify-write"""
+        deltas = self.take()
+        if not deltas:
+            return False
+        try:
+            # SQL: SELECT * FROM admin_statistics LIMIT 1 FOR UPDATE
+            stats = db.query(models.AdminStatistics).with_for_update().first()
+            if not stats:
+                # No baseline to add to yet; a full recount covers these deltas
+                db.rollback()
+                self.reconcile(db)
+                return True
+            rating_sum = deltas.pop("rating_sum", 0.0)
+            rated_delta = deltas.pop("rated_destinations", 0)
+            if rating_sum or rated_delta:
+                # The stored average is over the rated destinations before these deltas
+                # SQL: SELECT COUNT(rating) FROM destinations
+                rated = dashboard_stats.count_rated_destinations(db)
+                previous_sum = _rating(stats.average_rating) * max(rated - rated_delta, 0)
+                stats.average_rating = round((previous_sum + rating_sum) / rated, 2) if rated else 0.0
+            # SQL: UPDATE admin_statistics SET total_users = ?, travelers = ?, ..., average_rating = ? WHERE id = ?
+            for column, delta in deltas.items():
+                setattr(stats, column, max((getattr(stats, column) or 0) + int(delta), 0))
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            self.add(deltas)
+            logger.warning("Failed to flush admin statistics deltas: %s", e)
+            return False
+
+    def reconcile(self, db: Session):
+        """Recount admin_statistics from scratch, replacing anything pending"""
+        # Deltas committed so far are part of the recount
+        self.take()
+        return dashboard_stats.store_statistics(db, dashboard_stats.compute_statistics(db))
+
+stats_aggregator = StatsAggregator()
+
+@event.listens_for(Session, "after_flush")
+def _collect_stats_deltas(session, flush_context):
+    # Session state still reflects the pre-flush changes here
+    deltas = session.info.setdefault("stats_deltas", Counter())
+    for obj in session.new:
+        _object_delta(deltas, obj, 1)
+    for obj in session.deleted:
+        _object_delta(deltas, obj, -1)
+    for obj in session.dirty:
+        _update_delta(deltas, obj)
+
+@event.listens_for(Session, "after_commit")
+def _publish_stats_deltas(session):
+    deltas = session.info.pop("stats_deltas", None)
+    if deltas:
+        stats_aggregator.add(deltas)
+        statistics_snapshot.mark_dirty()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stats_deltas(session):
+    session.info.pop("stats_deltas", None)
+
+def flush_pending_statistics():
+    db = SessionLocal()
+    try:
+        return stats_aggregator.flush(db)
+    finally:
+        db.close()
+
+def reconcile_statistics():
+    db = SessionLocal()
+    try:
+        stats_aggregator.reconcile(db)
+        logger.info("Admin statistics reconciled")
+    except Exception as e:
+        logger.warning("Failed to reconcile admin statistics: %s", e)
+    finally:
+        db.close()
+
+def refresh_statistics_snapshot():
+    db = ReadSessionLocal()
+    try:
+        statistics_snapshot.refresh(db)
+    except Exception as e:
+        logger.warning("Failed to refresh statistics snapshot: %s", e)
+    finally:
+        db.close()
+
+async def run_statistics_jobs():
+    """Background loop: flush deltas, recount periodically and keep the statistics snapshot fresh"""
+    last_flush = last_reconcile = time.monotonic()
+    while True:
+        await asyncio.sleep(STATS_JOB_TICK)
+        now = time.monotonic()
+        if now - last_reconcile >= STATS_RECONCILE_INTERVAL:
+            await anyio.to_thread.run_sync(reconcile_statistics)
+            last_reconcile = last_flush = now
+        elif now - last_flush >= STATS_FLUSH_INTERVAL:
+            await anyio.to_thread.run_sync(flush_pending_statistics)
+            last_flush = now
+        if statistics_snapshot.needs_refresh():
+            await anyio.to_thread.run_sync(refresh_statistics_snapshot)
@@ -0,0 +1,113 @@
+"""Concurrent bookings: threads racing crud.create_hotel_booking over overlapping stays, then an inventory audit"""
+from .common import print_table, use_scratch_database
+
+use_scratch_database("concurrent_bookings")
+
+import logging
+import random
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, text
+
+from app import crud, inventory_engine, models, reservations
+from app.database import SessionLocal, engine
+
+ROOMS = 3
+INVENTORY_DAYS = 60
+START = date.today() + timedelta(days=1)
+
+def seed(db):
+    db.execute(insert(models.User), [{"email": f"traveler{i}@bench.test", "name": f"Traveler {i}", "role": "traveler", "password_hash": "x"} for i in range(10)])
+    db.execute(insert(models.Destination), [{"destination_id": "d0", "name": "Destination", "city": "City", "country": "Country", "image": "image.jpg"}])
+    db.execute(insert(models.Hotel), [{"name": "Hotel", "owner_id": 1, "destination_id": 1}])
+    db.execute(insert(models.HotelRoomType), [{"hotel_id": 1, "room_type_name": "Double", "base_price_per_night": Decimal("100"), "max_guests": 2, "total_rooms": ROOMS}])
+    db.execute(insert(models.RoomAvailability), [
+        {"hotel_id": 1, "room_type": "Double", "date": START + timedelta(days=i), "total_rooms": ROOMS, "available_rooms": ROOMS, "price_per_night": Decimal("100")}
+        for i in range(INVENTORY_DAYS)
+    ])
+    db.commit()
+
+def reset():
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+        inventory_engine.inventory_engine.load(db)
+    finally:
+        db.close()
+
+def race(stays):
+    """Book every (offset, nights) stay on its own thread and session, all released at once"""
+    outcomes = {"booked": 0, "refused": 0, "errors": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(stays))
+
+    def attempt(index, offset, nights):
+        check_in = START + timedelta(days=offset)
+        booking = {"hotel_id": 1, "traveler_id": 1 + index % 10, "room_type": "Double", "num_guests": 1,
+                   "check_in_date": check_in.isoformat(), "check_out_date": (check_in + timedelta(days=nights)).isoformat()}
+        db = SessionLocal()
+        barrier.wait()
+        try:
+            crud.create_hotel_booking(db, booking)
+            outcome = "booked"
+        except reservations.RoomsUnavailable:
+            outcome = "refused"
+        except Exception:
+            outcome = "errors"
+        finally:
+            db.close()
+        with lock:
+            outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=attempt, args=(index, *stay)) for index, stay in enumerate(stays)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes, time.perf_counter() - start
+
+def audit(db):
+    """(nights over capacity, nights where available_rooms disagrees with the bookings, nights below zero)"""
+    rows = db.execute(text("""
+        SELECT ra.total_rooms, ra.available_rooms, COUNT(hb.booking_id) AS booked
+        FROM room_availability ra
+        LEFT JOIN hotel_bookings hb ON hb.hotel_id = ra.hotel_id AND hb.room_type = ra.room_type
+            AND hb.check_in_date <= ra.date AND hb.check_out_date > ra.date AND hb.booking_status != 'cancelled'
+        GROUP BY ra.hotel_id, ra.room_type, ra.date, ra.total_rooms, ra.available_rooms
+    """)).all()
+    overbooked = sum(1 for total, available, booked in rows if booked > total)
+    mismatched = sum(1 for total, available, booked in rows if available != total - booked)
+    negative = sum(1 for total, available, booked in rows if available < 0)
+    return overbooked, mismatched, negative
+
+def main():
+    # Refused bookings are expected here; keep their error logs off the terminal
+    logging.getLogger("app.crud").setLevel(logging.CRITICAL)
+    random.seed(17)
+    scenarios = (
+        ("100 threads, same night", [(0, 1)] * 100),
+        ("40 threads, 5 overlapping 7-night stays", [(2 * (i % 5), 7) for i in range(40)]),
+        ("200 threads, random 1-14 night stays", [(random.randint(0, 30), random.randint(1, 14)) for _ in range(200)]),
+    )
+    table = []
+    for name, stays in scenarios:
+        reset()
+        outcomes, seconds = race(stays)
+        db = SessionLocal()
+        try:
+            overbooked, mismatched, negative = audit(db)
+        finally:
+            db.close()
+        table.append((name, outcomes["booked"], outcomes["refused"], outcomes["errors"], f"{seconds:.2f}",
+                      f"{len(stays) / seconds:.0f}", overbooked, mismatched, negative))
+    print_table(("scenario", "booked", "refused", "errors", "seconds", "attempts/s",
+                 "overbooked nights", "mismatched nights", "negative nights"), table)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Admin statistics: queries and time per call, per-count queries vs the shared two-query aggregation"""
+from .common import print_table, time_per_call, use_scratch_database
+
+use_scratch_database("dashboard_stats")
+
+import random
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from app import dashboard_stats, models
+from app.database import SessionLocal, engine
+from app.query_budget import count_queries
+
+ROLES = ["traveler", "guide", "restaurant_owner", "hotel_owner", "admin"]
+
+def seed(db, users: int):
+    random.seed(8)
+    db.execute(insert(models.User), [
+        {"email": f"user{i}@bench.test", "name": f"User {i}", "role": random.choice(ROLES), "password_hash": "x"}
+        for i in range(users)
+    ])
+    destinations = max(users // 20, 1)
+    db.execute(insert(models.Destination), [
+        {"destination_id": f"d{i}", "name": f"Destination {i}", "city": "City", "country": "Country", "image": "image.jpg",
+         "rating": Decimal(random.randint(10, 50)) / 10, "reviews_count": 0}
+        for i in range(destinations)
+    ])
+    db.execute(insert(models.BlogPost), [
+        {"title": f"Post {i}", "content": "Notes", "author_id": 1 + i % users} for i in range(users // 5)
+    ])
+    db.execute(insert(models.Review), [
+        {"destination_id": 1 + i % destinations, "user_id": 1 + i % users, "rating": 4, "comment": "Fine"} for i in range(users // 2)
+    ])
+    db.commit()
+
+def per_count_statistics(db) -> dict:
+    """The statistics as computed before the shared module: one COUNT per figure, ratings averaged in Python"""
+    users = db.query(models.User)
+    ratings = db.query(models.Destination.rating).all()
+    return {
+        "total_users": users.count(),
+        **{column: users.filter(models.User.role == role).count() for role, column in dashboard_stats.ROLE_COLUMNS.items()},
+        "total_destinations": db.query(models.Destination).count(),
+        "total_blog_posts": db.query(models.BlogPost).count(),
+        "average_rating": float(sum(rating for rating, in ratings if rating is not None) / len(ratings)) if ratings else 0.0,
+        "total_reviews": db.query(models.Review).count(),
+    }
+
+def main():
+    rows = []
+    for users in (1000, 10000, 100000):
+        models.Base.metadata.drop_all(bind=engine)
+        models.Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            seed(db, users)
+            shared = dashboard_stats.compute_statistics(db)
+            legacy = per_count_statistics(db)
+            assert {key: shared[key] for key in legacy if key != "average_rating"} == {key: value for key, value in legacy.items() if key != "average_rating"}
+            assert abs(shared["average_rating"] - legacy["average_rating"]) < 1e-6
+            for name, compute in (("per-count", per_count_statistics), ("shared", dashboard_stats.compute_statistics)):
+                with count_queries() as log:
+                    compute(db)
+                rows.append((users, name, log.count, f"{time_per_call(lambda: compute(db), repeat=30):.2f}"))
+        finally:
+            db.close()
+    print_table(("users", "implementation", "queries/call", "ms/call"), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Availability reads: SQL over room_availability vs the in-memory NumPy inventory engine, 1k hotels x 365 days"""
+from .common import print_table, time_per_call, use_scratch_database
+
+use_scratch_database("inventory_engine")
+
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from app import async_crud, models
+from app.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+from app.inventory_engine import inventory_engine
+
+HOTELS = 1000
+DESTINATIONS = 20
+DAYS = 365
+ROOM_TYPES = (("Double", 2), ("Family", 4))
+TODAY = date.today()
+
+def seed(db):
+    random.seed(21)
+    db.execute(insert(models.User), [{"email": "owner@bench.test", "name": "Owner", "role": "hotel_owner", "password_hash": "x"}])
+    db.execute(insert(models.Destination), [
+        {"destination_id": f"d{i}", "name": f"Destination {i}", "city": "City", "country": "Country", "image": "image.jpg"}
+        for i in range(DESTINATIONS)
+    ])
+    db.execute(insert(models.Hotel), [{"name": f"Hotel {i}", "owner_id": 1, "destination_id": 1 + i % DESTINATIONS} for i in range(HOTELS)])
+    db.execute(insert(models.HotelRoomType), [
+        {"hotel_id": hotel_id, "room_type_name": name, "base_price_per_night": Decimal("100"), "max_guests": guests, "total_rooms": 5}
+        for hotel_id in range(1, HOTELS + 1) for name, guests in ROOM_TYPES
+    ])
+    for hotel_id in range(1, HOTELS + 1):
+        db.execute(insert(models.RoomAvailability), [
+            {"hotel_id": hotel_id, "room_type": name, "date": TODAY + timedelta(days=offset), "total_rooms": 5,
+             "available_rooms": random.choice((0, 1, 3, 5, 5, 5, 5, 5)), "price_per_night": Decimal(random.randint(8000, 30000)) / 100}
+            for name, _ in ROOM_TYPES for offset in range(DAYS)
+        ])
+    db.commit()
+
+def main():
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    loop = asyncio.new_event_loop()
+    try:
+        seed(db)
+        start = time.perf_counter()
+        inventory_engine.load(db)
+        load_seconds = time.perf_counter() - start
+        calendar = inventory_engine.calendar
+        array_mb = (calendar.available.nbytes + calendar.total.nbytes + calendar.prices.nbytes) / 2 ** 20
+        print(f"{HOTELS} hotels x {len(ROOM_TYPES)} room types x {DAYS} days: engine load {load_seconds:.2f} s, {array_mb:.1f} MB of arrays\n")
+
+        async def sql_search(check_in, check_out):
+            async with AsyncSessionLocal() as session:
+                return await async_crud.search_destination_availability(session, "d3", check_in, check_out, limit=20)
+
+        async def engine_search(check_in, check_out):
+            matches = inventory_engine.search("d3", check_in, check_out, limit=20)
+            async with AsyncSessionLocal() as session:
+                return await async_crud.add_hotel_details(session, matches)
+
+        table = []
+        for nights in (1, 7, 30, 90):
+            check_in = TODAY + timedelta(days=30)
+            check_out = check_in + timedelta(days=nights)
+            expected = loop.run_until_complete(sql_search(check_in, check_out))
+            actual = loop.run_until_complete(engine_search(check_in, check_out))
+            assert [(row["hotel_id"], row["room_type"]) for row in actual] == [(row["hotel_id"], row["room_type"]) for row in expected]
+            sql_ms = time_per_call(lambda: loop.run_until_complete(sql_search(check_in, check_out)), repeat=30, warmup=2)
+            engine_ms = time_per_call(lambda: inventory_engine.search("d3", check_in, check_out, limit=20), repeat=500)
+            details_ms = time_per_call(lambda: loop.run_until_complete(engine_search(check_in, check_out)), repeat=30, warmup=2)
+            table.append((f"destination search ({HOTELS // DESTINATIONS} hotels)", nights, f"{sql_ms:.3f}", f"{engine_ms:.4f}",
+                          f"{details_ms:.3f}", f"{sql_ms / details_ms:.1f}x"))
+        print_table(("read", "nights", "SQL ms", "engine ms", "engine + hotel query ms", "speedup"), table)
+    finally:
+        db.close()
+        loop.run_until_complete(async_engine.dispose())
+        loop.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""List endpoint serialization: per-row cost of FastAPI's response_model path vs the fast_json path"""
+from .common import print_table, time_per_call, use_scratch_database
+
+use_scratch_database("list_serialization")
+
+import asyncio
+from decimal import Decimal
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+from sqlalchemy import insert
+
+from app import crud, fast_json, loading, models, schemas
+from app.database import SessionLocal, async_engine, engine
+from app.main import app
+
+SIZES = (100, 1000, 10000)
+
+def seed(db, rows: int):
+    db.execute(insert(models.User), [{"email": "owner@bench.test", "name": "Owner", "role": "hotel_owner", "password_hash": "x"}])
+    destinations = max(rows // 10, 1)
+    db.execute(insert(models.Destination), [
+        {"destination_id": f"d{i}", "name": f"Destination {i}", "city": "City", "country": "Country", "image": "image.jpg",
+         "about": "About " * 20, "rating": Decimal("4.25"), "reviews_count": 12}
+        for i in range(rows)
+    ])
+    common = {"owner_id": 1, "description": "Description " * 10, "address": "1 Main St", "phone": "555-0100",
+              "website": "https://example.com", "image": "image.jpg", "rating": Decimal("4.50"), "price_range": "$$"}
+    db.execute(insert(models.Hotel), [{**common, "name": f"Hotel {i}", "destination_id": 1 + i % destinations, "amenities": "Pool, Spa"} for i in range(rows)])
+    db.execute(insert(models.Restaurant), [{**common, "name": f"Restaurant {i}", "destination_id": 1 + i % destinations, "cuisine_type": "Local"} for i in range(rows)])
+    db.commit()
+
+def response_model_encoder(response_model):
+    """FastAPI's default path: validate against response_model (if any), jsonable_encoder, stdlib json"""
+    field = create_response_field(name="response", type_=response_model) if response_model else None
+    loop = asyncio.new_event_loop()
+    def encode(rows):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=rows, is_coroutine=True))
+        return JSONResponse(content).body
+    return encode
+
+def main():
+    client = TestClient(app)
+    endpoints = (
+        ("/destinations", None, lambda db, n: [row.to_dict() for row in db.query(models.Destination).limit(n)], fast_json.json_response),
+        ("/hotels", List[schemas.Hotel], lambda db, n: loading.serialize(db, crud.get_hotels(db, limit=n)), fast_json.HOTEL_LIST.response),
+        ("/restaurants", List[schemas.Restaurant], lambda db, n: crud.get_restaurants(db, limit=n), fast_json.RESTAURANT_LIST.response),
+    )
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed(db, max(SIZES))
+    table = []
+    try:
+        for path, response_model, load, fast in endpoints:
+            default = response_model_encoder(response_model)
+            for rows in SIZES:
+                serialized = load(db, rows)
+                assert len(serialized) == rows
+                repeat = max(2000 // rows, 5)
+                default_ms = time_per_call(lambda: default(serialized), repeat=repeat)
+                fast_ms = time_per_call(lambda: fast(serialized).body, repeat=repeat)
+                request_ms = time_per_call(lambda: client.get(path, params={"limit": rows}), repeat=max(repeat // 2, 3), warmup=1)
+                table.append((path, rows, f"{default_ms / rows * 1000:.2f}", f"{fast_ms / rows * 1000:.2f}",
+                              f"{default_ms / fast_ms:.1f}x", f"{request_ms / rows * 1000:.1f}"))
+    finally:
+        db.close()
+        asyncio.run(async_engine.dispose())
+    print_table(("endpoint", "rows", "response_model us/row", "fast_json us/row", "speedup", "full GET us/row"), table)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Per-call logging overhead on former print() hot paths: synchronous stdout writes vs the queued, level-gated loggers"""
+from .common import print_table, time_per_call, use_scratch_database
+
+use_scratch_database("logging")
+
+import logging
+import os
+import tempfile
+from logging.handlers import QueueListener
+
+from sqlalchemy import insert
+
+from app import crud, logging_config, models
+from app.database import SessionLocal, engine
+
+REVIEWS = 100
+RESTAURANTS = 100
+
+class RecordCounter(logging.Filter):
+    def __init__(self):
+        super().__init__()
+        self.records = 0
+
+    def filter(self, record):
+        self.records += 1
+        return True
+
+def seed(db):
+    db.execute(insert(models.User), [{"email": f"user{i}@bench.test", "name": f"User {i}", "role": "traveler", "password_hash": "x"} for i in range(REVIEWS)])
+    db.execute(insert(models.Destination), [{"destination_id": "d0", "name": "Destination", "city": "City", "country": "Country", "image": "image.jpg"}])
+    db.execute(insert(models.Review), [{"destination_id": 1, "user_id": 1 + i, "rating": 4, "comment": "Fine " * 10} for i in range(REVIEWS)])
+    db.execute(insert(models.Restaurant), [{"name": f"Restaurant {i}", "owner_id": 1, "destination_id": 1, "description": "Food " * 20} for i in range(RESTAURANTS)])
+    db.commit()
+
+def configure(mode: str, sink_path: str):
+    """Route the app loggers the way each mode does; returns (counter, listener)"""
+    app_logger = logging.getLogger("app")
+    app_logger.handlers.clear()
+    app_logger.propagate = False
+    counter = RecordCounter()
+    if mode == "print":
+        # What the print() calls did: format and write every line synchronously on the request thread
+        handler = logging.StreamHandler(open(sink_path, "w", buffering=1))
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.addFilter(counter)
+        app_logger.addHandler(handler)
+        app_logger.setLevel(logging.DEBUG)
+        return counter, None
+    queue_handler = logging_config.RecordQueueHandler(logging_config._queue)
+    queue_handler.addFilter(counter)
+    app_logger.addHandler(queue_handler)
+    app_logger.setLevel(logging.DEBUG if mode == "queue, DEBUG" else logging.INFO)
+    sink = logging.FileHandler(sink_path, encoding="utf-8")
+    sink.setFormatter(logging_config.JsonLinesFormatter())
+    listener = QueueListener(logging_config._queue, sink)
+    listener.start()
+    return counter, listener
+
+def main():
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed(db)
+    calls = (
+        (f"get_reviews_by_destination ({REVIEWS} reviews)", lambda: crud.get_reviews_by_destination(db, destination_id=1)),
+        (f"get_restaurants_by_owner_with_filters ({RESTAURANTS} rows)", lambda: crud.get_restaurants_by_owner_with_filters(db, owner_id=1)),
+    )
+    sink_dir = tempfile.mkdtemp(prefix="travel-bench-logs-")
+    table = []
+    try:
+        for name, call in calls:
+            baseline = None
+            for mode in ("print", "queue, DEBUG", "queue, INFO"):
+                counter, listener = configure(mode, os.path.join(sink_dir, "sink.log"))
+                call()
+                records = counter.records
+                ms = time_per_call(call, repeat=300)
+                if listener is not None:
+                    listener.stop()
+                baseline = baseline or ms
+                table.append((name, mode, records, f"{ms:.3f}", f"{baseline - ms:+.3f}"))
+    finally:
+        db.close()
+    print_table(("call", "logging", "records/call", "ms/call", "saved vs print"), table)
+
+if __name__ == "__main__":
+    main()
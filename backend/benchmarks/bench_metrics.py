@@ -0,0 +1,75 @@
+"""Cost of MetricsMiddleware per request and of the DB timing hooks per query"""
+from .common import print_table, time_per_call, use_scratch_database
+
+use_scratch_database("metrics")
+
+import asyncio
+import copy
+
+from sqlalchemy import event, text
+
+from app import metrics as metrics_module
+from app.database import engine
+from app.main import app
+from app.metrics import MetricsMiddleware, RequestDbUsage, metrics
+
+REQUESTS = 2000
+
+def without_metrics(asgi_app):
+    """Copy of the app whose middleware stack leaves out MetricsMiddleware"""
+    bare = copy.copy(asgi_app)
+    bare.user_middleware = [middleware for middleware in asgi_app.user_middleware if middleware.cls is not MetricsMiddleware]
+    bare.middleware_stack = None
+    return bare
+
+def request_loop(asgi_app, path: str, query_string: bytes = b""):
+    """Coroutine function running REQUESTS GETs of path straight through the ASGI app"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def run():
+        for _ in range(REQUESTS):
+            scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+                     "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query_string,
+                     "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80)}
+            await asgi_app(scope, receive, send)
+    return run
+
+def query_loop(queries: int = 2000):
+    with engine.connect() as connection:
+        for _ in range(queries):
+            connection.execute(text("SELECT 1")).scalar()
+
+def main():
+    loop = asyncio.new_event_loop()
+    bare = without_metrics(app)
+    table = []
+    for path in ("/health", "/metrics", "/hotels/1"):
+        bare_ms = time_per_call(lambda: loop.run_until_complete(request_loop(bare, path)()), repeat=7, warmup=1) / REQUESTS
+        full_ms = time_per_call(lambda: loop.run_until_complete(request_loop(app, path)()), repeat=7, warmup=1) / REQUESTS
+        table.append((f"GET {path}", f"{bare_ms * 1000:.1f}", f"{full_ms * 1000:.1f}", f"{(full_ms - bare_ms) * 1000:+.1f}"))
+    print_table(("request", "without us", "with MetricsMiddleware us", "overhead us"), table)
+
+    # The cursor hooks stay registered on the engine; inside a request they also time every statement
+    token = metrics_module._request_db_usage.set(RequestDbUsage())
+    try:
+        hooked_ms = time_per_call(query_loop, repeat=7, warmup=1) / 2000
+        event.remove(engine, "before_cursor_execute", metrics_module._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", metrics_module._after_cursor_execute)
+        plain_ms = time_per_call(query_loop, repeat=7, warmup=1) / 2000
+    finally:
+        metrics_module.instrument_engine(engine)
+        metrics_module._request_db_usage.reset(token)
+    print()
+    print_table(("SELECT 1", "without hooks us", "with hooks us", "overhead us"),
+                [("per query", f"{plain_ms * 1000:.1f}", f"{hooked_ms * 1000:.1f}", f"{(hooked_ms - plain_ms) * 1000:+.1f}")])
+
+    render_ms = time_per_call(metrics.render, repeat=200)
+    print(f"\n/metrics render with {len(metrics.latency)} routes recorded: {render_ms:.3f} ms")
+    loop.close()
+
+if __name__ == "__main__":
+    main()
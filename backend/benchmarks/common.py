@@ -0,0 +1,35 @@
+import os
+import statistics
+import tempfile
+import time
+
+# Benchmark helpers.
+# Each benchmark runs against its own scratch SQLite database (or BENCH_DATABASE_URL)
+# and is run from backend/ as a module, e.g. python -m benchmarks.bench_dashboard_stats
+
+def use_scratch_database(name: str) -> str:
+    """Point the app at a fresh database; call before importing anything from app"""
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        path = os.path.join(tempfile.mkdtemp(prefix="travel-bench-"), f"{name}.db")
+        url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("SLOW_QUERY_LOG_FILE", "")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    return url
+
+def time_per_call(fn, repeat: int = 200, warmup: int = 5) -> float:
+    """Median wall time of fn() in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def print_table(headers, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in (headers, *rows):
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Point the app at a throwaway SQLite database before anything imports it
+TEST_DIR = tempfile.mkdtemp(prefix="travel-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'primary.db')}"
+os.environ.setdefault("SLOW_QUERY_LOG_FILE", "")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Any query issued while serializing to_dict() output fails the test
+os.environ["LAZY_LOAD_GUARD"] = "True"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import dashboard_stats, idempotency, inventory_engine, models, password_hashing, quotes
+from app.database import SessionLocal, async_engine, engine
+from app.main import app, create_access_token
+from app.principal_cache import principal_cache
+from app.stats_aggregator import stats_aggregator
+
+# Seeded catalog: hotels 1-4 (hotel 1 and 3 in destination d0, 2 and 4 in d1), all owned by
+# owner@test.com, each with 3 Double rooms and 1 Suite stocked for INVENTORY_DAYS from today
+INVENTORY_DAYS = 60
+DOUBLE_ROOMS = 3
+# Every seeded user's password is "password"; hashed once since bcrypt is deliberately slow
+PASSWORD_HASH = password_hashing.hash_password("password")
+
+def seed(db):
+    """Users, destinations, hotels and room inventory shared by the tests"""
+    users = {}
+    for email, role in [("admin@test.com", "admin"), ("traveler@test.com", "traveler"), ("owner@test.com", "hotel_owner"),
+                        ("guide@test.com", "guide"), ("chef@test.com", "restaurant_owner")]:
+        user = models.User(email=email, name=email.split("@")[0].title(), role=role, password_hash=PASSWORD_HASH)
+        db.add(user)
+        users[role] = user
+    db.flush()
+    destinations = []
+    for i in range(3):
+        destination = models.Destination(destination_id=f"d{i}", name=f"Destination {i}", city="City", country="Country",
+                                         image="image.jpg", rating=Decimal("4.5") - i, reviews_count=1)
+        db.add(destination)
+        destinations.append(destination)
+    db.flush()
+    for i in range(4):
+        db.add(models.Hotel(name=f"Hotel {i}", owner_id=users["hotel_owner"].id, destination_id=destinations[i % 2].id, rating=Decimal("4.0")))
+        db.add(models.Restaurant(name=f"Restaurant {i}", owner_id=users["restaurant_owner"].id, destination_id=destinations[0].id))
+    db.add(models.Guide(user_id=users["guide"].id, destination_id=destinations[0].id))
+    db.flush()
+    today = date.today()
+    for hotel_id in range(1, 5):
+        db.add(models.HotelRoomType(hotel_id=hotel_id, room_type_name="Double", base_price_per_night=Decimal("100"), max_guests=2, total_rooms=DOUBLE_ROOMS))
+        db.add(models.HotelRoomType(hotel_id=hotel_id, room_type_name="Suite", base_price_per_night=Decimal("250"), max_guests=4, total_rooms=1))
+        for offset in range(INVENTORY_DAYS):
+            night = today + timedelta(days=offset)
+            db.add(models.RoomAvailability(hotel_id=hotel_id, room_type="Double", date=night, total_rooms=DOUBLE_ROOMS, available_rooms=DOUBLE_ROOMS,
+                                           price_per_night=Decimal("120") if night.weekday() >= 5 else Decimal("100")))
+            db.add(models.RoomAvailability(hotel_id=hotel_id, room_type="Suite", date=night, total_rooms=1, available_rooms=1, price_per_night=Decimal("250")))
+    db.add(models.Review(destination_id=destinations[0].id, user_id=users["traveler"].id, rating=5, comment="Lovely"))
+    db.add(models.BlogPost(title="Trip", content="Notes", author_id=users["traveler"].id, destination_id=destinations[0].id))
+    db.commit()
+
+def reset_caches():
+    """Forget everything the app keeps in process between requests"""
+    principal_cache.clear()
+    quotes.quote_cache.clear()
+    idempotency.idempotency_store.clear()
+    dashboard_stats.statistics_snapshot._data = None
+    stats_aggregator.take()
+
+@pytest.fixture(autouse=True)
+def database():
+    """Fresh schema and seed data for every test"""
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+        reset_caches()
+        inventory_engine.inventory_engine.load(db)
+    finally:
+        db.close()
+    yield
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture(scope="session")
+def client():
+    # Not entered as a context manager, so the lifespan's background jobs never start
+    yield TestClient(app)
+    # Close the pooled aiosqlite connections, whose worker threads would keep pytest from exiting
+    asyncio.run(async_engine.dispose())
+
+def auth_headers(email: str) -> dict:
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.email == email).first()
+        token = create_access_token({"sub": user.email, "role": user.role}, timedelta(minutes=30))
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def traveler():
+    return auth_headers("traveler@test.com")
+
+@pytest.fixture
+def owner():
+    return auth_headers("owner@test.com")
+
+@pytest.fixture
+def admin():
+    return auth_headers("admin@test.com")
+
+def book(client, headers, hotel_id=1, room_type="Double", check_in=None, nights=2, **extra):
+    """POST a booking starting check_in (default: in two days); returns the response"""
+    check_in = check_in or date.today() + timedelta(days=2)
+    payload = {"room_type": room_type, "check_in_date": check_in.isoformat(),
+               "check_out_date": (check_in + timedelta(days=nights)).isoformat(), "num_guests": 1, **extra}
+    return client.post(f"/hotels/{hotel_id}/book", headers=headers, json=payload)
+
+def nights_available(db, hotel_id, room_type, check_in, nights):
+    """available_rooms for each night of a stay, in date order"""
+    rows = db.query(models.RoomAvailability).filter(
+        models.RoomAvailability.hotel_id == hotel_id,
+        models.RoomAvailability.room_type == room_type,
+        models.RoomAvailability.date >= check_in,
+        models.RoomAvailability.date < check_in + timedelta(days=nights)
+    ).order_by(models.RoomAvailability.date).all()
+    return [row.available_rooms for row in rows]
@@ -0,0 +1,88 @@
+from datetime import date, datetime, timedelta
+
+from app import booking_holds, crud, models
+from conftest import DOUBLE_ROOMS, book, nights_available
+
+CHECK_IN = date.today() + timedelta(days=2)
+
+def _booking_id(response):
+    assert response.status_code == 200, response.text
+    return response.json()["booking"]["booking_id"]
+
+def test_pending_booking_holds_rooms_until_expiry(client, traveler, db):
+    booking_id = _booking_id(book(client, traveler, check_in=CHECK_IN))
+    booking = db.get(models.HotelBooking, booking_id)
+    assert booking.booking_status == "pending"
+    assert booking.hold_expires_at > datetime.utcnow()
+    assert nights_available(db, 1, "Double", CHECK_IN, 2) == [DOUBLE_ROOMS - 1] * 2
+
+def test_sweep_releases_expired_holds(client, traveler, db):
+    booking_id = _booking_id(book(client, traveler, check_in=CHECK_IN))
+
+    assert booking_holds.expire_holds(db, now=datetime.utcnow() + timedelta(seconds=booking_holds.BOOKING_HOLD_TTL + 1)) == 1
+    db.expire_all()
+    assert db.get(models.HotelBooking, booking_id).booking_status == "cancelled"
+    assert nights_available(db, 1, "Double", CHECK_IN, 2) == [DOUBLE_ROOMS] * 2
+
+def test_confirming_after_sweep_is_rejected(client, traveler, owner, db):
+    booking_id = _booking_id(book(client, traveler, check_in=CHECK_IN))
+    booking_holds.expire_holds(db, now=datetime.utcnow() + timedelta(seconds=booking_holds.BOOKING_HOLD_TTL + 1))
+
+    response = client.put(f"/bookings/{booking_id}", headers=owner, json={"booking_status": "confirmed"})
+    assert response.status_code == 409
+    db.expire_all()
+    assert db.get(models.HotelBooking, booking_id).booking_status == "cancelled"
+    assert nights_available(db, 1, "Double", CHECK_IN, 2) == [DOUBLE_ROOMS] * 2
+
+def test_confirming_expired_hold_before_sweep_is_rejected(client, traveler, owner, db):
+    booking_id = _booking_id(book(client, traveler, check_in=CHECK_IN))
+    db.get(models.HotelBooking, booking_id).hold_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    response = client.put(f"/bookings/{booking_id}", headers=owner, json={"booking_status": "confirmed"})
+    assert response.status_code == 409
+
+def test_confirming_keeps_rooms_past_expiry(client, traveler, owner, db):
+    booking_id = _booking_id(book(client, traveler, check_in=CHECK_IN))
+    response = client.put(f"/bookings/{booking_id}", headers=owner, json={"booking_status": "confirmed"})
+    assert response.status_code == 200
+    assert response.json()["booking"]["hold_expires_at"] is None
+
+    assert booking_holds.expire_holds(db, now=datetime.utcnow() + timedelta(seconds=booking_holds.BOOKING_HOLD_TTL + 1)) == 0
+    assert nights_available(db, 1, "Double", CHECK_IN, 2) == [DOUBLE_ROOMS - 1] * 2
+
+def test_confirmed_booking_cannot_return_to_pending(client, traveler, owner, db):
+    booking_id = _booking_id(book(client, traveler, check_in=CHECK_IN))
+    assert client.put(f"/bookings/{booking_id}", headers=owner, json={"booking_status": "confirmed"}).status_code == 200
+
+    response = client.put(f"/bookings/{booking_id}", headers=owner, json={"booking_status": "pending"})
+    assert response.status_code == 409
+    db.expire_all()
+    assert db.get(models.HotelBooking, booking_id).booking_status == "confirmed"
+    assert nights_available(db, 1, "Double", CHECK_IN, 2) == [DOUBLE_ROOMS - 1] * 2
+
+def test_cancelling_through_update_releases_nights(client, traveler, owner, db):
+    booking_id = _booking_id(book(client, traveler, check_in=CHECK_IN))
+
+    response = client.put(f"/bookings/{booking_id}", headers=traveler, json={"booking_status": "cancelled"})
+    assert response.status_code == 200
+    assert response.json()["booking"]["booking_status"] == "cancelled"
+    assert nights_available(db, 1, "Double", CHECK_IN, 2) == [DOUBLE_ROOMS] * 2
+
+    # Cancelling again, either way, does not add the rooms back twice
+    assert client.post(f"/bookings/{booking_id}/cancel", headers=traveler).status_code == 200
+    assert client.put(f"/bookings/{booking_id}", headers=traveler, json={"booking_status": "cancelled"}).status_code == 200
+    db.expire_all()
+    assert nights_available(db, 1, "Double", CHECK_IN, 2) == [DOUBLE_ROOMS] * 2
+
+    statistics = crud.get_hotel_booking_statistics(db, 1, CHECK_IN, CHECK_IN + timedelta(days=2))
+    assert statistics["cancelled_bookings"] == 1
+    assert statistics["occupancy_rate"] == 0
+
+def test_cancelled_booking_cannot_be_revived(client, traveler, owner):
+    booking_id = _booking_id(book(client, traveler, check_in=CHECK_IN))
+    assert client.post(f"/bookings/{booking_id}/cancel", headers=traveler).status_code == 200
+
+    for status in ("pending", "confirmed", "checked_in"):
+        response = client.put(f"/bookings/{booking_id}", headers=owner, json={"booking_status": status})
+        assert response.status_code == 409, status
@@ -0,0 +1,87 @@
+import random
+import threading
+from datetime import date, timedelta
+
+from sqlalchemy import func
+
+from app import crud, models, reservations
+from app.database import SessionLocal
+from conftest import DOUBLE_ROOMS, INVENTORY_DAYS
+
+START = date.today() + timedelta(days=1)
+
+def race(stays, room_type="Double"):
+    """Book every (offset, nights) stay on its own thread and session at once; returns outcome counts"""
+    outcomes = {"booked": 0, "refused": 0, "errors": []}
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(stays))
+
+    def attempt(offset, nights):
+        check_in = START + timedelta(days=offset)
+        booking = {"hotel_id": 1, "traveler_id": 2, "room_type": room_type, "num_guests": 1,
+                   "check_in_date": check_in.isoformat(), "check_out_date": (check_in + timedelta(days=nights)).isoformat()}
+        db = SessionLocal()
+        barrier.wait()
+        try:
+            crud.create_hotel_booking(db, booking)
+            with lock:
+                outcomes["booked"] += 1
+        except reservations.RoomsUnavailable:
+            with lock:
+                outcomes["refused"] += 1
+        except Exception as e:
+            with lock:
+                outcomes["errors"].append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=attempt, args=stay) for stay in stays]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+def assert_inventory_consistent(db, room_type="Double"):
+    """Per night: available_rooms >= 0, bookings <= total_rooms and available_rooms == total_rooms - bookings"""
+    bookings = db.query(models.HotelBooking).filter(
+        models.HotelBooking.hotel_id == 1,
+        models.HotelBooking.room_type == room_type,
+        models.HotelBooking.booking_status != "cancelled"
+    ).all()
+    nights = db.query(models.RoomAvailability).filter(
+        models.RoomAvailability.hotel_id == 1,
+        models.RoomAvailability.room_type == room_type
+    ).all()
+    for night in nights:
+        booked = sum(1 for booking in bookings if booking.check_in_date <= night.date < booking.check_out_date)
+        assert night.available_rooms >= 0, night.date
+        assert booked <= night.total_rooms, night.date
+        assert night.available_rooms == night.total_rooms - booked, night.date
+
+def booking_count(db):
+    return db.query(func.count(models.HotelBooking.booking_id)).scalar()
+
+def test_last_room_goes_to_exactly_one_thread(db):
+    outcomes = race([(0, 1)] * 30, room_type="Suite")
+    assert outcomes["errors"] == []
+    assert (outcomes["booked"], outcomes["refused"]) == (1, 29)
+    assert booking_count(db) == 1
+    assert_inventory_consistent(db, room_type="Suite")
+
+def test_overlapping_stays_never_overbook(db):
+    outcomes = race([(2 * (i % 5), 7) for i in range(40)])
+    assert outcomes["errors"] == []
+    assert outcomes["booked"] + outcomes["refused"] == 40
+    assert DOUBLE_ROOMS <= outcomes["booked"] <= 2 * DOUBLE_ROOMS
+    assert booking_count(db) == outcomes["booked"]
+    assert_inventory_consistent(db)
+
+def test_random_stays_never_overbook(db):
+    rng = random.Random(17)
+    stays = [(rng.randint(0, INVENTORY_DAYS - 20), rng.randint(1, 14)) for _ in range(60)]
+    outcomes = race(stays)
+    assert outcomes["errors"] == []
+    assert outcomes["booked"] >= DOUBLE_ROOMS
+    assert booking_count(db) == outcomes["booked"]
+    assert_inventory_consistent(db)
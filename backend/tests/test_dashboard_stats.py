@@ -0,0 +1,42 @@
+from app import crud, dashboard_stats
+from app.query_budget import count_queries
+
+SEEDED_STATISTICS = {
+    "total_users": 5, "travelers": 1, "guides": 1, "restaurant_owners": 1, "hotel_owners": 1, "admins": 1,
+    "total_destinations": 3, "total_blog_posts": 1, "average_rating": 3.5, "total_reviews": 1,
+}
+
+def test_compute_statistics_takes_two_queries(db):
+    with count_queries() as log:
+        statistics = dashboard_stats.compute_statistics(db)
+    assert log.count == 2
+    assert {key: statistics[key] for key in SEEDED_STATISTICS} == SEEDED_STATISTICS
+
+def test_crud_statistics_use_the_shared_aggregation(db):
+    with count_queries() as log:
+        users = crud.get_user_statistics(db)
+    assert log.count == 1
+    assert users["total_users"] == 5
+
+    with count_queries() as log:
+        statistics = crud.get_admin_statistics(db)
+    assert log.count == 2
+    assert statistics["destinations"] == 3 and statistics["average_rating"] == 3.5
+
+def test_admin_endpoints_share_one_snapshot(client, admin):
+    with count_queries() as log:
+        first = client.get("/admin/statistics", headers=admin)
+    assert first.status_code == 200
+    assert log.count <= 2
+    assert {key: first.json()[key] for key in SEEDED_STATISTICS} == SEEDED_STATISTICS
+
+    # Every other statistics endpoint is served from the same snapshot without querying
+    with count_queries() as log:
+        for path in ("/admin/statistics/simple", "/admin/users/statistics", "/admin/dashboard/stats"):
+            response = client.get(path, headers=admin)
+            assert response.status_code == 200, path
+            assert response.json()["total_users"] == 5
+    assert log.count == 0
+
+def test_statistics_require_admin(client, traveler):
+    assert client.get("/admin/statistics", headers=traveler).status_code == 403
@@ -0,0 +1,23 @@
+from sqlalchemy import text
+
+from app import database
+
+def test_file_databases_get_the_configured_pool():
+    options = database._engine_options("sqlite:///pool.db")
+    assert (options["pool_size"], options["max_overflow"]) == (database.DB_POOL_SIZE, database.DB_MAX_OVERFLOW)
+    assert options["pool_timeout"] == database.DB_POOL_TIMEOUT
+    assert type(database.engine.pool).__name__ == "MeteredQueuePool"
+
+def test_in_memory_sqlite_keeps_its_single_connection():
+    assert database._engine_options("sqlite://") == {}
+
+def test_health_db_reports_pool_usage(client, db):
+    db.execute(text("SELECT 1"))
+    db.close()
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    pool = response.json()["pool"]
+    assert pool["pool_class"] == "MeteredQueuePool"
+    assert pool["pool_size"] == database.DB_POOL_SIZE
+    assert pool["checked_out"] == 0
+    assert pool["checkouts"] >= 1 and pool["checkout_timeouts"] == 0
@@ -0,0 +1,23 @@
+import asyncio
+import json
+from typing import List
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import crud, fast_json, loading, schemas
+
+def _response_model_output(response_model, rows):
+    field = create_response_field(name="response", type_=response_model)
+    return asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=True))
+
+def test_list_serializers_match_response_model(db):
+    hotels = loading.serialize(db, crud.get_hotels(db))
+    restaurants = crud.get_restaurants(db)
+    assert json.loads(fast_json.HOTEL_LIST.dump(hotels)) == _response_model_output(List[schemas.Hotel], hotels)
+    assert json.loads(fast_json.RESTAURANT_LIST.dump(restaurants)) == _response_model_output(List[schemas.Restaurant], restaurants)
+
+def test_default_response_encodes_decimals(client):
+    response = client.get("/hotels/1/quote", params={"room_type": "Suite", "check_in": "2999-01-01", "check_out": "2999-01-02"})
+    assert response.status_code == 200, response.text
+    assert response.json()["total_price"] == 250.0
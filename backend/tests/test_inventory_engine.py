@@ -0,0 +1,91 @@
+import asyncio
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app import async_crud, models
+from app.database import AsyncSessionLocal, async_engine
+from app.inventory_engine import inventory_engine
+from conftest import DOUBLE_ROOMS, book
+
+TODAY = date.today()
+ROOM_TYPES = [("Double", 2), ("Family", 4), ("Single", 1)]
+
+@pytest.fixture
+def varied_inventory(db):
+    """Extra d0 hotels with sold-out, missing and tied nights, an inactive hotel and an inactive room type"""
+    rng = random.Random(21)
+    for i in range(12):
+        hotel = models.Hotel(name=f"Varied {i}", owner_id=3, destination_id=1, is_active=i != 5)
+        db.add(hotel)
+        db.flush()
+        for name, guests in ROOM_TYPES:
+            db.add(models.HotelRoomType(hotel_id=hotel.id, room_type_name=name, base_price_per_night=Decimal("80"),
+                                        max_guests=guests, total_rooms=2, is_active=(i, name) != (7, "Family")))
+            for offset in range(40):
+                if rng.random() < 0.03:
+                    continue  # No inventory row for this night
+                available = rng.choice([0, 1, 2, 2, 2])
+                price = Decimal(rng.choice(["79.99", "80.00", "95.50", "120.25"]))
+                db.add(models.RoomAvailability(hotel_id=hotel.id, room_type=name, date=TODAY + timedelta(days=offset),
+                                               total_rooms=2, available_rooms=available, price_per_night=price))
+    db.commit()
+    inventory_engine.load(db)
+
+def sql_search(*args, **kwargs):
+    async def run():
+        try:
+            async with AsyncSessionLocal() as session:
+                return await async_crud.search_destination_availability(session, *args, **kwargs)
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(run())
+
+def engine_search(*args, **kwargs):
+    matches = inventory_engine.search(*args, **kwargs)
+    assert matches is not None
+    async def run():
+        try:
+            async with AsyncSessionLocal() as session:
+                return await async_crud.add_hotel_details(session, matches)
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(run())
+
+def comparable(results):
+    return [
+        (row["hotel_id"], row["hotel_name"], row["room_type"], row["max_guests"], row["nights"], row["rooms_available"],
+         round(float(row["min_price_per_night"]), 2), round(float(row["total_price"]), 2))
+        for row in results
+    ]
+
+STAYS = [(1, 2), (3, 7), (10, 1), (0, 14), (25, 15)]
+
+@pytest.mark.parametrize("start,nights", STAYS)
+def test_search_matches_sql(varied_inventory, start, nights):
+    check_in = TODAY + timedelta(days=start)
+    check_out = check_in + timedelta(days=nights)
+    for sort in ("price_asc", "price_desc"):
+        for guests in (1, 2, 3):
+            for skip, limit in ((0, 100), (0, 5), (5, 5)):
+                expected = comparable(sql_search("d0", check_in, check_out, guests=guests, sort=sort, skip=skip, limit=limit))
+                actual = comparable(engine_search("d0", check_in, check_out, guests=guests, sort=sort, skip=skip, limit=limit))
+                assert actual == expected, (sort, guests, skip, limit)
+
+def test_search_covers_some_matches(varied_inventory):
+    assert len(sql_search("d0", TODAY + timedelta(days=1), TODAY + timedelta(days=3), limit=100)) > 10
+
+def test_engine_follows_committed_bookings(client, traveler):
+    check_in = TODAY + timedelta(days=3)
+    for _ in range(2):
+        assert book(client, traveler, check_in=check_in, nights=4).status_code == 200
+    # Refused bookings roll back without touching the engine
+    assert book(client, traveler, hotel_id=1, room_type="Suite", check_in=check_in).status_code == 200
+    assert book(client, traveler, hotel_id=1, room_type="Suite", check_in=check_in).status_code == 409
+    expected = comparable(sql_search("d0", check_in, check_in + timedelta(days=4), limit=100))
+    actual = comparable(engine_search("d0", check_in, check_in + timedelta(days=4), limit=100))
+    assert actual == expected
+    hotel_1 = {row[2]: row[5] for row in actual if row[0] == 1}
+    assert hotel_1 == {"Double": DOUBLE_ROOMS - 2}
@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+
+from conftest import DOUBLE_ROOMS, INVENTORY_DAYS, book, nights_available
+
+def test_bulk_upsert_keeps_booked_rooms(client, traveler, owner, db):
+    check_in = date.today() + timedelta(days=2)
+    assert book(client, traveler, check_in=check_in).status_code == 200
+
+    end = date.today() + timedelta(days=INVENTORY_DAYS + 9)
+    response = client.post("/hotels/1/inventory", headers=owner, json={"ranges": [{
+        "room_type": "Double", "start_date": date.today().isoformat(), "end_date": end.isoformat(),
+        "total_rooms": DOUBLE_ROOMS + 2, "weekday_prices": [90, 90, 90, 90, 110, 130, 130]
+    }]})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"inserted": 10, "updated": INVENTORY_DAYS}
+
+    # Existing nights grow by the added rooms and keep the one already booked
+    assert nights_available(db, 1, "Double", check_in, 2) == [DOUBLE_ROOMS + 1] * 2
+    assert nights_available(db, 1, "Double", end, 1) == [DOUBLE_ROOMS + 2]
+
+def test_bulk_upsert_rejects_bad_ranges(client, owner):
+    today = date.today()
+    for inventory_range in (
+        {"room_type": "Double", "start_date": today.isoformat(), "end_date": (today - timedelta(days=1)).isoformat(), "total_rooms": 1, "price_per_night": 100},
+        {"room_type": "Double", "start_date": today.isoformat(), "end_date": today.isoformat(), "total_rooms": 1, "weekday_prices": [100]},
+        {"room_type": "Double", "start_date": today.isoformat(), "end_date": today.isoformat(), "total_rooms": 1},
+    ):
+        assert client.post("/hotels/1/inventory", headers=owner, json={"ranges": [inventory_range]}).status_code == 400
@@ -0,0 +1,83 @@
+import pytest
+
+from app import crud, loading, models
+from app.database import SessionLocal
+
+@pytest.fixture(autouse=True)
+def guide_review(database):
+    db = SessionLocal()
+    try:
+        db.add(models.GuideReview(guide_id=1, traveler_id=2, rating=5, review_text="Great tour"))
+        db.commit()
+    finally:
+        db.close()
+
+def test_guard_is_on_for_the_suite():
+    assert loading.LAZY_LOAD_GUARD
+
+def test_guard_rejects_lazy_loads(db):
+    hotels = db.query(models.Hotel).all()
+    with pytest.raises(loading.LazyLoadError):
+        loading.serialize(db, hotels)
+
+# Functions that serialize under the guard themselves
+SERIALIZING = [
+    ("get_restaurants", lambda db: crud.get_restaurants(db)),
+    ("get_restaurants_by_owner", lambda db: crud.get_restaurants_by_owner(db, owner_id=5)),
+    ("get_restaurants_by_owner_with_filters", lambda db: crud.get_restaurants_by_owner_with_filters(db, owner_id=5)),
+    ("get_restaurants_by_destination", lambda db: crud.get_restaurants_by_destination(db, destination_id=1)),
+    ("get_hotels_by_destination", lambda db: crud.get_hotels_by_destination(db, destination_id=1)),
+    ("get_reviews_by_destination", lambda db: crud.get_reviews_by_destination(db, destination_id=1)),
+    ("get_guides_by_destination", lambda db: crud.get_guides_by_destination(db, destination_id=1)),
+    ("get_guides", lambda db: crud.get_guides(db)),
+    ("get_guide", lambda db: [crud.get_guide(db, guide_id=1)]),
+    ("get_guide_by_user_id", lambda db: [crud.get_guide_by_user_id(db, user_id=4)]),
+    ("get_guide_reviews", lambda db: crud.get_guide_reviews(db, guide_id=1)),
+    ("get_restaurant", lambda db: [crud.get_restaurant(db, restaurant_id=1)]),
+]
+
+@pytest.mark.parametrize("name,call", SERIALIZING, ids=[name for name, _ in SERIALIZING])
+def test_listings_serialize_without_lazy_loads(db, name, call):
+    rows = call(db)
+    assert rows and all(rows), name
+
+def test_guide_serialization_includes_batch_loaded_reviews(db):
+    guide = crud.get_guide(db, guide_id=1)
+    assert [review["traveler"]["email"] for review in guide["reviews"]] == ["traveler@test.com"]
+
+# Functions returning ORM rows that callers pass to to_dict()
+RETURNING_ROWS = [
+    ("get_hotel", lambda db: [crud.get_hotel(db, hotel_id=1)]),
+    ("get_hotels", lambda db: crud.get_hotels(db)),
+    ("get_hotels_by_owner", lambda db: crud.get_hotels_by_owner(db, owner_id=3)),
+    ("get_hotels_by_owner_with_destinations", lambda db: crud.get_hotels_by_owner_with_destinations(db, owner_id=3)),
+    ("search_hotels_by_owner", lambda db: crud.search_hotels_by_owner(db, owner_id=3)),
+]
+
+@pytest.mark.parametrize("name,call", RETURNING_ROWS, ids=[name for name, _ in RETURNING_ROWS])
+def test_loading_plans_cover_to_dict(db, name, call):
+    rows = call(db)
+    assert rows, name
+    serialized = loading.serialize(db, rows)
+    assert all(row["destination"] for row in serialized)
+
+@pytest.mark.parametrize("path", [
+    "/hotels", "/hotels/1", "/restaurants", "/restaurants/1", "/guides/1", "/guides/1/reviews",
+    "/hotels/by-destination/1", "/restaurants/by-destination/1", "/guides/by-destination/1", "/destinations/d0/reviews",
+])
+def test_listing_endpoints_serialize_without_lazy_loads(client, path):
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+    assert response.json()
+
+def test_rows_that_fail_to_serialize_fall_back_to_basic_fields(db, monkeypatch):
+    def broken(hotel):
+        raise ValueError("broken row")
+    monkeypatch.setattr(models.Hotel, "to_dict", broken)
+    hotels = crud.get_hotels_by_destination(db, destination_id=1)
+    assert [hotel["name"] for hotel in hotels] == ["Hotel 0", "Hotel 2"]
+
+def test_guard_errors_are_not_swallowed_by_the_fallbacks(db, monkeypatch):
+    monkeypatch.setattr(loading, "HOTEL_PLAN", ())
+    with pytest.raises(loading.LazyLoadError):
+        crud.get_hotels_by_destination(db, destination_id=1)
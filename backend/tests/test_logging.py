@@ -0,0 +1,41 @@
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from app import logging_config
+
+def test_queued_records_become_json_lines(tmp_path):
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("app.tests.logging")
+    logger.handlers = [logging_config.RecordQueueHandler(records)]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    sink = logging.FileHandler(tmp_path / "app.jsonl", encoding="utf-8")
+    sink.setFormatter(logging_config.JsonLinesFormatter())
+    listener = QueueListener(records, sink)
+    listener.start()
+    try:
+        logger.debug("skipped %s", "entirely")
+        logger.info("booked %s nights", 3, extra={"hotel_id": 7})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        listener.stop()
+        sink.close()
+
+    lines = [json.loads(line) for line in (tmp_path / "app.jsonl").read_text().splitlines()]
+    assert [line["message"] for line in lines] == ["booked 3 nights", "failed"]
+    assert lines[0]["level"] == "INFO" and lines[0]["hotel_id"] == 7 and lines[0]["logger"] == "app.tests.logging"
+    assert "ValueError: boom" in lines[1]["exception"]
+
+def test_disabled_debug_arguments_are_never_formatted():
+    class Expensive:
+        def __str__(self):
+            raise AssertionError("formatted although DEBUG is off")
+
+    logger = logging.getLogger("app.tests.lazy")
+    logger.setLevel(logging.INFO)
+    logger.debug("value: %s", Expensive())
@@ -0,0 +1,14 @@
+from app.metrics import metrics
+
+def test_requests_are_recorded_under_the_route_template(client):
+    before = metrics.requests.get(("GET", "/hotels/{hotel_id}", "200"), 0)
+    assert client.get("/hotels/1").status_code == 200
+    assert client.get("/hotels/2").status_code == 200
+    assert metrics.requests[("GET", "/hotels/{hotel_id}", "200")] == before + 2
+    assert metrics.db_queries[("GET", "/hotels/{hotel_id}")] > 0
+
+def test_metrics_endpoint_renders_prometheus_text(client):
+    client.get("/health")
+    body = client.get("/metrics").text
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in body
@@ -0,0 +1,29 @@
+import sys
+import time
+
+from app.profiling import SamplingProfiler
+from app.query_budget import statement_shape
+
+def busy(seconds):
+    """CPU-bound work inside app code, which the sampler counts as an active stack"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        statement_shape("SELECT * FROM hotels WHERE id IN (1, 2, 3) AND rating > 4")
+
+def test_profiler_samples_without_touching_the_switch_interval():
+    interval = sys.getswitchinterval()
+    with SamplingProfiler(0.001) as profiler:
+        assert sys.getswitchinterval() == interval
+        busy(0.2)
+    assert sys.getswitchinterval() == interval
+    # At the default 5 ms switch interval 200 ms of CPU-bound work still gets sampled
+    assert "app.query_budget.statement_shape" in profiler.collapsed()
+    assert profiler.samples >= 10
+
+def test_overlapping_profilers_leave_the_interpreter_as_found():
+    interval = sys.getswitchinterval()
+    first = SamplingProfiler(0.001).__enter__()
+    second = SamplingProfiler(0.002).__enter__()
+    first.__exit__(None, None, None)
+    second.__exit__(None, None, None)
+    assert sys.getswitchinterval() == interval
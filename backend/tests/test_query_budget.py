@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import models
+from app.query_budget import QueryBudgetExceeded, assert_query_budget
+from conftest import PASSWORD_HASH, book
+
+# Queries each hot endpoint may issue, independent of how many rows it returns.
+# Owner endpoints include the one user lookup that fills the principal cache.
+BUDGETS = [
+    ("/hotels", 2),
+    ("/hotels/1", 2),
+    ("/hotels/by-destination/1", 2),
+    ("/destinations", 1),
+    ("/destinations/d0", 1),
+    ("/restaurants", 2),
+    ("/restaurants/by-destination/1", 2),
+    ("/guides/by-destination/1", 2),
+    ("/hotel-owner/hotels", 3),
+    ("/hotel-owner/statistics", 3),
+    ("/hotels/1/booking-statistics", 3),
+]
+
+def grow(db, copies=20):
+    """More of every row type the budgeted endpoints return"""
+    for i in range(copies):
+        db.add(models.Destination(destination_id=f"extra{i}", name=f"Extra {i}", city="City", country="Country", image="image.jpg"))
+        db.add(models.Hotel(name=f"Extra hotel {i}", owner_id=3, destination_id=1))
+        db.add(models.Restaurant(name=f"Extra restaurant {i}", owner_id=5, destination_id=1))
+        guide = models.User(email=f"guide{i}@test.com", name=f"Guide {i}", role="guide", password_hash=PASSWORD_HASH)
+        db.add(guide)
+        db.flush()
+        db.add(models.Guide(user_id=guide.id, destination_id=1))
+        db.add(models.BlogPost(title=f"Post {i}", content="Notes", author_id=2, destination_id=1))
+    db.commit()
+
+@pytest.mark.parametrize("path,budget", BUDGETS, ids=[path for path, _ in BUDGETS])
+def test_hot_endpoints_stay_within_budget(client, owner, db, path, budget):
+    assert assert_query_budget(client, "GET", path, budget, headers=owner).status_code == 200
+
+@pytest.mark.parametrize("path,budget", BUDGETS, ids=[path for path, _ in BUDGETS])
+def test_budgets_do_not_grow_with_rows(client, owner, traveler, db, path, budget):
+    grow(db)
+    for day in range(5):
+        assert book(client, traveler, check_in=date.today() + timedelta(days=2 + 2 * day)).status_code == 200
+    response = assert_query_budget(client, "GET", path, budget, headers=owner, params={"limit": 100})
+    assert response.status_code == 200
+
+def test_dashboard_overview_budget(client, admin, db):
+    grow(db)
+    # Snapshot refresh (2) plus recent users, destinations and blog posts
+    response = assert_query_budget(client, "GET", "/admin/dashboard/overview", 5, headers=admin)
+    assert response.status_code == 200
+    assert len(response.json()["recent_destinations"]) == 5
+    # With the snapshot warm only the three recent-row queries remain
+    assert_query_budget(client, "GET", "/admin/dashboard/overview", 3, headers=admin)
+
+def test_statistics_endpoints_are_served_from_the_snapshot(client, admin):
+    assert_query_budget(client, "GET", "/admin/statistics", 2, headers=admin)
+    for path in ("/admin/statistics", "/admin/statistics/simple", "/admin/users/statistics", "/admin/dashboard/stats"):
+        assert assert_query_budget(client, "GET", path, 0, headers=admin).status_code == 200
+
+def test_exceeding_the_budget_lists_the_statements(client):
+    with pytest.raises(QueryBudgetExceeded, match="ran 2 queries \\(budget 1\\)"):
+        assert_query_budget(client, "GET", "/hotels", 1)
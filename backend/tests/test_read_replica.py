@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import models
+from app.database import ReadSessionLocal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter, since the engines are built from the environment at import time
+ROUTING_SCRIPT = """
+import asyncio
+import json
+from datetime import timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.database import SessionLocal, ReadSessionLocal, async_engine, async_read_engine, engine, read_engine
+from app.main import app, create_access_token
+
+assert read_engine is not engine
+models.Base.metadata.create_all(bind=read_engine)
+
+def add_destination(session_factory, destination_id, name):
+    db = session_factory()
+    db.add(models.Destination(destination_id=destination_id, name=name, city="City", country="Country", image="image.jpg"))
+    db.commit()
+    db.close()
+
+def names(session_factory):
+    db = session_factory()
+    try:
+        return sorted(row.name for row in db.query(models.Destination))
+    finally:
+        db.close()
+
+add_destination(SessionLocal, "primary", "On primary")
+add_destination(sessionmaker(bind=read_engine), "replica", "On replica")
+replica = sessionmaker(bind=read_engine)()
+replica.add(models.Hotel(name="Replica hotel", owner_id=1, destination_id=1))
+replica.commit()
+replica.close()
+
+# The author exists only on the primary, so authenticating and writing must both happen there
+primary = SessionLocal()
+author = models.User(email="author@test.com", name="Author", role="traveler", password_hash="x")
+primary.add(author)
+primary.commit()
+primary.close()
+
+client = TestClient(app)
+token = create_access_token({"sub": "author@test.com", "role": "traveler"}, timedelta(minutes=5))
+created = client.post("/blog-posts", headers={"Authorization": f"Bearer {token}"}, json={"title": "Written", "content": "On primary"})
+
+def blog_titles(session_factory):
+    db = session_factory()
+    try:
+        return [row.title for row in db.query(models.BlogPost)]
+    finally:
+        db.close()
+
+print(json.dumps({
+    "async_catalog": [row["name"] for row in client.get("/destinations").json()],
+    "sync_catalog": [row["name"] for row in client.get("/hotels").json()],
+    "created": created.status_code,
+    "primary_posts": blog_titles(SessionLocal),
+    "replica_posts": blog_titles(ReadSessionLocal),
+    "primary_destinations": names(SessionLocal),
+}))
+
+# Close the pooled aiosqlite connections, whose worker threads would keep the interpreter alive
+asyncio.run(async_engine.dispose())
+asyncio.run(async_read_engine.dispose())
+"""
+
+def test_catalog_reads_go_to_replica_and_writes_to_primary(tmp_path):
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{tmp_path / 'primary.db'}",
+               READ_DATABASE_URL=f"sqlite:///{tmp_path / 'replica.db'}",
+               LOG_LEVEL="WARNING", SLOW_QUERY_LOG_FILE="")
+    env.pop("ASYNC_DATABASE_URL", None)
+    env.pop("ASYNC_READ_DATABASE_URL", None)
+    result = subprocess.run([sys.executable, "-c", ROUTING_SCRIPT], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    routed = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # GET /destinations (async) and GET /hotels (sync) read the replica
+    assert routed["async_catalog"] == ["On replica"]
+    assert routed["sync_catalog"] == ["Replica hotel"]
+    assert routed["primary_destinations"] == ["On primary"]
+    # POST /blog-posts writes the primary
+    assert routed["created"] == 201
+    assert routed["primary_posts"] == ["Written"]
+    assert routed["replica_posts"] == []
+
+def test_read_session_refuses_writes():
+    db = ReadSessionLocal()
+    try:
+        db.add(models.Destination(destination_id="nope", name="Nope", city="City", country="Country", image="image.jpg"))
+        with pytest.raises(RuntimeError):
+            db.flush()
+    finally:
+        db.rollback()
+        db.close()
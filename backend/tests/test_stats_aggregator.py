@@ -0,0 +1,35 @@
+from collections import Counter
+from decimal import Decimal
+
+from app import dashboard_stats, models
+from app.stats_aggregator import _object_delta, stats_aggregator
+
+def stored(db):
+    db.expire_all()
+    return db.query(models.AdminStatistics).one()
+
+def test_null_ratings_are_left_out_of_the_average():
+    deltas = Counter()
+    _object_delta(deltas, models.Destination(destination_id="x", rating=None), 1)
+    assert deltas == Counter({"total_destinations": 1})
+    _object_delta(deltas, models.Destination(destination_id="y", rating=Decimal("4.0")), 1)
+    assert (deltas["rating_sum"], deltas["rated_destinations"]) == (4.0, 1)
+
+def test_reconcile_stores_the_recount(db):
+    stats_aggregator.reconcile(db)
+    assert (stored(db).total_destinations, float(stored(db).average_rating)) == (3, 3.5)
+
+def test_incremental_average_matches_the_recount(db):
+    stats_aggregator.reconcile(db)
+    db.add(models.Destination(destination_id="d3", name="D3", city="City", country="Country", image="image.jpg", rating=Decimal("5.0")))
+    db.query(models.Destination).filter_by(destination_id="d2").one().rating = Decimal("4.5")
+    db.commit()
+    assert stats_aggregator.flush(db)
+    recount = dashboard_stats.compute_statistics(db)
+    assert stored(db).total_destinations == recount["total_destinations"] == 4
+    assert float(stored(db).average_rating) == round(recount["average_rating"], 2) == 4.38
+
+    db.delete(db.query(models.Destination).filter_by(destination_id="d3").one())
+    db.commit()
+    assert stats_aggregator.flush(db)
+    assert float(stored(db).average_rating) == round(dashboard_stats.compute_statistics(db)["average_rating"], 2)
@@ -0,0 +1,27 @@
+from app.ttl_cache import TTLCache
+
+def test_entries_expire_after_their_ttl():
+    cache = TTLCache(ttl=60, max_size=10)
+    cache.put("kept", 1)
+    cache.put("expired", 2, ttl=0)
+    assert cache.get("kept") == 1
+    assert cache.get("expired") is None
+    assert len(cache) == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+def test_discard_where_drops_matching_entries():
+    cache = TTLCache(ttl=60, max_size=10)
+    for hotel_id in (1, 1, 2):
+        cache.put((hotel_id, len(cache)), hotel_id)
+    cache.discard_where(lambda key, value: key[0] == 1)
+    assert len(cache) == 1
+    cache.pop((2, 2))
+    assert len(cache) == 0
@@ -25,43 +25,35 @@ DELIMITER $$
 --
 -- Procedures
 --
-CREATE DEFINER=`root`@`localhost` PROCEDURE `UpdateAdminStatistics` ()   BEGIN
-    DECLARE user_count INT;
-    DECLARE dest_count INT;
-    DECLARE blog_count INT;
-    DECLARE avg_rating DECIMAL(3,2);
-    DECLARE review_count INT;
-    
-    -- Count total users
-    SELECT COUNT(*) INTO user_count FROM users;
-    
-    -- Count users by role
-    UPDATE admin_statistics SET
-        total_users = user_count,
-        travelers = (SELECT COUNT(*) FROM users WHERE role = 'traveler'),
-        guides = (SELECT COUNT(*) FROM users WHERE role = 'guide'),
-        restaurant_owners = (SELECT COUNT(*) FROM users WHERE role = 'restaurant_owner'),
-        hotel_owners = (SELECT COUNT(*) FROM users WHERE role = 'hotel_owner'),
-        admins = (SELECT COUNT(*) FROM users WHERE role = 'admin');
-    
-    -- Count destinations
-    SELECT COUNT(*) INTO dest_count FROM destinations;
-    UPDATE admin_statistics SET total_destinations = dest_count;
-    
-    -- Count blog posts
-    SELECT COUNT(*) INTO blog_count FROM blog_posts;
-    UPDATE admin_statistics SET total_blog_posts = blog_count;
-    
-    -- Calculate average rating
-    SELECT COALESCE(AVG(rating), 0.0) INTO avg_rating FROM destinations WHERE rating IS NOT NULL;
-    UPDATE admin_statistics SET average_rating = avg_rating;
-    
-    -- Count reviews
-    SELECT COUNT(*) INTO review_count FROM reviews;
-    UPDATE admin_statistics SET total_reviews = review_count;
-    
-    -- Update timestamp
-    UPDATE admin_statistics SET last_updated = CURRENT_TIMESTAMP;
+CREATE DEFINER=`root`@`localhost` PROCEDURE `UpdateAdminStatistics` ()   BEGIN
+    -- Role counts in one pass over users, other totals in one multi-subquery row
+    UPDATE admin_statistics
+    CROSS JOIN (
+        SELECT COUNT(*) AS total_users,
+               COALESCE(SUM(role = 'traveler'), 0) AS travelers,
+               COALESCE(SUM(role = 'guide'), 0) AS guides,
+               COALESCE(SUM(role = 'restaurant_owner'), 0) AS restaurant_owners,
+               COALESCE(SUM(role = 'hotel_owner'), 0) AS hotel_owners,
+               COALESCE(SUM(role = 'admin'), 0) AS admins
+        FROM users
+    ) AS user_counts
+    CROSS JOIN (
+        SELECT (SELECT COUNT(*) FROM destinations) AS total_destinations,
+               (SELECT COUNT(*) FROM blog_posts) AS total_blog_posts,
+               (SELECT COALESCE(AVG(rating), 0.0) FROM destinations) AS average_rating,
+               (SELECT COUNT(*) FROM reviews) AS total_reviews
+    ) AS content_totals
+    SET admin_statistics.total_users = user_counts.total_users,
+        admin_statistics.travelers = user_counts.travelers,
+        admin_statistics.guides = user_counts.guides,
+        admin_statistics.restaurant_owners = user_counts.restaurant_owners,
+        admin_statistics.hotel_owners = user_counts.hotel_owners,
+        admin_statistics.admins = user_counts.admins,
+        admin_statistics.total_destinations = content_totals.total_destinations,
+        admin_statistics.total_blog_posts = content_totals.total_blog_posts,
+        admin_statistics.average_rating = content_totals.average_rating,
+        admin_statistics.total_reviews = content_totals.total_reviews,
+        admin_statistics.last_updated = CURRENT_TIMESTAMP;
 END$$
 
 DELIMITER ;
@@ -354,6 +346,7 @@ CREATE TABLE `hotel_bookings` (
   `num_guests` int(11) DEFAULT 1,
   `total_price` decimal(10,2) NOT NULL,
   `booking_status` enum('pending','confirmed','checked_in','checked_out','cancelled') DEFAULT 'pending',
+  `hold_expires_at` datetime DEFAULT NULL,
   `special_requests` text DEFAULT NULL,
   `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
   `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp()
@@ -399,6 +392,22 @@ INSERT INTO `hotel_room_types` (`room_type_id`, `hotel_id`, `room_type_name`, `d
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `idempotency_keys`
+--
+
+CREATE TABLE `idempotency_keys` (
+  `key_hash` varchar(64) NOT NULL,
+  `request_hash` varchar(64) NOT NULL,
+  `status_code` int(11) DEFAULT NULL,
+  `content_type` varchar(100) DEFAULT NULL,
+  `response_body` blob DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `expires_at` datetime NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=latin1 COLLATE=latin1_swedish_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `items`
 --
@@ -830,6 +839,7 @@ ALTER TABLE `hotel_bookings`
   ADD KEY `idx_hotel_id` (`hotel_id`),
   ADD KEY `idx_traveler_id` (`traveler_id`),
   ADD KEY `idx_booking_status` (`booking_status`),
+  ADD KEY `idx_booking_hold` (`booking_status`,`hold_expires_at`),
   ADD KEY `idx_check_in_date` (`check_in_date`),
   ADD KEY `idx_check_out_date` (`check_out_date`);
 
@@ -842,6 +852,13 @@ ALTER TABLE `hotel_room_types`
   ADD KEY `idx_room_type_name` (`room_type_name`),
   ADD KEY `idx_is_active` (`is_active`);
 
+--
+-- Indexes for table `idempotency_keys`
+--
+ALTER TABLE `idempotency_keys`
+  ADD PRIMARY KEY (`key_hash`),
+  ADD KEY `idx_expires_at` (`expires_at`);
+
 --
 -- Indexes for table `items`
 --